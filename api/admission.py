@@ -0,0 +1,34 @@
+"""Request guards admitting imports through the per-token scheduler."""
+from __future__ import annotations
+
+from fastapi import Header, HTTPException, status
+
+from services.admission import IMPORT_ADMISSION, Admission, AdmissionRejectedError
+
+
+def upload_token(token: str | None = Header(default=None, alias="X-Upload-Token")) -> str | None:
+    """Return the caller's upload token; imports without one share a queue."""
+    if token is None or not token.strip():
+        return None
+    return token.strip()
+
+
+def request_size(content_length: int | None = Header(default=None, alias="Content-Length")) -> int:
+    return max(content_length or 0, 0)
+
+
+def admit_import(token: str | None, nbytes: int) -> Admission:
+    """Wait for an import slot, or answer ``429`` with ``Retry-After``.
+
+    Blocks while the import is queued, so async endpoints call it through
+    the thread pool; ``IMPORT_ADMISSION_MAX_QUEUED`` bounds how many threads
+    wait here at once.
+    """
+    try:
+        return IMPORT_ADMISSION.admit(token, nbytes)
+    except AdmissionRejectedError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
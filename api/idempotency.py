@@ -0,0 +1,103 @@
+"""``Idempotency-Key`` handling shared by endpoints that create resources."""
+from __future__ import annotations
+
+import json
+from typing import Any, Awaitable, Callable
+
+from fastapi import Header, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from services.idempotency import (
+    IdempotencyClaim,
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+    StoredResponse,
+    abandon_request,
+    begin_request,
+    complete_request,
+)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+_MAX_KEY_LENGTH = 255
+
+
+def idempotency_key(key: str | None = Header(default=None, alias="Idempotency-Key")) -> str | None:
+    """Return the request's idempotency key, if it sent one."""
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > _MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1 to {_MAX_KEY_LENGTH} characters.",
+        )
+    return key
+
+
+def idempotency_scope(route: str, token: str | None) -> str:
+    """Keys are only unique per route and upload token."""
+    return f"{route} {token or ''}"
+
+
+def _replay(stored: StoredResponse) -> Response:
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+async def claim_key(scope: str, key: str, request_hash: str) -> IdempotencyClaim | Response:
+    """Claim *key* for this request, or return the replayed earlier response.
+
+    Waits (in the thread pool) while a request with the same key is still
+    running; reusing a key for another body is a ``422``.
+    """
+    try:
+        outcome = await run_in_threadpool(begin_request, scope, key, request_hash)
+    except IdempotencyConflictError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    except IdempotencyInProgressError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc),
+            headers={"Retry-After": "1"},
+        ) from exc
+    if isinstance(outcome, StoredResponse):
+        return _replay(outcome)
+    return outcome
+
+
+async def store_response(claim: IdempotencyClaim, status_code: int, body: str) -> None:
+    await run_in_threadpool(complete_request, claim, status_code=status_code, body=body)
+
+
+async def release_key(claim: IdempotencyClaim) -> None:
+    await run_in_threadpool(abandon_request, claim)
+
+
+async def run_idempotent(
+    scope: str,
+    key: str,
+    request_hash: str,
+    produce: Callable[[], Awaitable[tuple[int, BaseModel | dict[str, Any]]]],
+) -> Response:
+    """Run *produce* once per key and body; retries get the stored response.
+
+    Failed requests, including ``HTTPException`` answers, release the key
+    so that a retry runs again.
+    """
+    claimed = await claim_key(scope, key, request_hash)
+    if isinstance(claimed, Response):
+        return claimed
+
+    try:
+        status_code, payload = await produce()
+    except BaseException:
+        await release_key(claimed)
+        raise
+    body = payload.json(by_alias=True) if isinstance(payload, BaseModel) else json.dumps(payload)
+    await store_response(claimed, status_code, body)
+    return Response(content=body, status_code=status_code, media_type="application/json")
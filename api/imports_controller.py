@@ -1,26 +1,64 @@
 """Endpoints for managing import jobs and history."""
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Iterable
-
-from fastapi import APIRouter, HTTPException, Query, status
+import asyncio
+from datetime import date, datetime
+from functools import lru_cache
+import io
+import json
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Iterable, Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from repositories import CoverageRegionCreate
 from services import (
+    ImportDelta,
     ImportErrorDetail,
     ImportHistory,
     ImportJobEvent,
+    ImportJobNotFoundError,
     ImportJobRecord,
+    ImportJobStateError,
+    ImportStats,
     ImportSummary,
+    UnknownImportTargetError,
+    cancel_import,
+    dry_run_import,
+    fetch_import_stats,
     import_coverage_regions,
-    list_import_jobs,
+    import_file,
+    import_rows,
+    resume_import,
+)
+from services.history_json import render_import_history
+from services.idempotency import request_digest
+from services.parser import UnsupportedExtensionError
+from services.progress import PROGRESS, ImportProgress, fetch_import_progress
+from services.profiling import (
+    fetch_import_profile,
+    import_coverage_regions_profiled,
+    render_profile_text,
 )
 
+from .admission import admit_import, request_size, upload_token
+from .idempotency import idempotency_key, idempotency_scope, run_idempotent
+from .security import is_admin, require_admin
+from .upload_controller import resolve_upload
+
 
 router = APIRouter(prefix="/imports", tags=["imports"])
 
+# Watchers look at the in-memory snapshot at most this often; updates in
+# between are coalesced into the next event.
+_PROGRESS_INTERVAL_SECONDS = 0.25
+# Jobs of other worker processes are followed through the database instead.
+_PROGRESS_DB_INTERVAL_SECONDS = 1.0
+_PROGRESS_HEARTBEAT_SECONDS = 15.0
+
 
 class ImportRecordPayload(BaseModel):
     code: str = Field(..., min_length=1, max_length=255)
@@ -35,6 +73,19 @@ class ImportRecordPayload(BaseModel):
 class ImportRequest(BaseModel):
     source_filename: str | None = Field(default=None, max_length=255, alias="sourceFilename")
     records: list[ImportRecordPayload] = Field(default_factory=list)
+    mode: Literal["insert", "delta"] = "insert"
+    remove_missing: bool = Field(default=False, alias="removeMissing")
+    upload_id: str | None = Field(default=None, max_length=64, alias="uploadId")
+
+    class Config:
+        allow_population_by_field_name = True
+
+
+class ImportRowsRequest(BaseModel):
+    source_filename: str | None = Field(default=None, max_length=255, alias="sourceFilename")
+    rows: list[dict[str, Any]] = Field(default_factory=list)
+    mode: Literal["insert", "upsert"] = "insert"
+    starting_row: int = Field(default=1, ge=1, alias="startingRow")
 
     class Config:
         allow_population_by_field_name = True
@@ -43,6 +94,7 @@ class ImportRequest(BaseModel):
 class ImportErrorResponse(BaseModel):
     row_number: int | None = Field(default=None, alias="rowNumber")
     code: str | None = None
+    field: str | None = None
     message: str
 
     class Config:
@@ -50,7 +102,7 @@ class ImportErrorResponse(BaseModel):
 
     @classmethod
     def from_domain(cls, error: ImportErrorDetail) -> "ImportErrorResponse":
-        return cls(row_number=error.row_number, code=error.code, message=error.message)
+        return cls(row_number=error.row_number, code=error.code, field=error.field, message=error.message)
 
 
 class ImportEventResponse(BaseModel):
@@ -77,6 +129,7 @@ class ImportJobResponse(BaseModel):
     completed_at: datetime | None = Field(default=None, alias="completedAt")
     errors: list[ImportErrorResponse]
     events: list[ImportEventResponse]
+    timings: dict[str, float] = Field(default_factory=dict)
 
     class Config:
         allow_population_by_field_name = True
@@ -94,6 +147,7 @@ class ImportJobResponse(BaseModel):
             completed_at=record.completed_at,
             errors=[ImportErrorResponse.from_domain(error) for error in record.errors],
             events=[ImportEventResponse.from_domain(event) for event in record.events],
+            timings=record.timings,
         )
 
 
@@ -116,11 +170,25 @@ class ImportHistoryResponse(BaseModel):
         )
 
 
+class ImportDeltaResponse(BaseModel):
+    added: int
+    changed: int
+    unchanged: int
+    removed: int
+
+    @classmethod
+    def from_domain(cls, delta: ImportDelta) -> "ImportDeltaResponse":
+        return cls(added=delta.added, changed=delta.changed, unchanged=delta.unchanged, removed=delta.removed)
+
+
 class ImportResponse(BaseModel):
-    job_id: int = Field(alias="jobId")
+    job_id: int | None = Field(default=None, alias="jobId")
     success_count: int = Field(alias="successCount")
     failure_count: int = Field(alias="failureCount")
     errors: list[ImportErrorResponse]
+    delta: ImportDeltaResponse | None = None
+    dry_run: bool = Field(default=False, alias="dryRun")
+    status: str = "completed"
 
     class Config:
         allow_population_by_field_name = True
@@ -132,6 +200,90 @@ class ImportResponse(BaseModel):
             success_count=summary.success_count,
             failure_count=summary.failure_count,
             errors=[ImportErrorResponse.from_domain(error) for error in summary.errors],
+            delta=ImportDeltaResponse.from_domain(summary.delta) if summary.delta else None,
+            dry_run=summary.dry_run,
+            status=summary.status,
+        )
+
+
+class DailyImportStatsResponse(BaseModel):
+    day: date
+    jobs: int
+    completed_jobs: int = Field(alias="completedJobs")
+    failed_jobs: int = Field(alias="failedJobs")
+    cancelled_jobs: int = Field(alias="cancelledJobs")
+    total_rows: int = Field(alias="totalRows")
+    success_rows: int = Field(alias="successRows")
+    failure_rows: int = Field(alias="failureRows")
+    average_duration_ms: float = Field(alias="averageDurationMs")
+    p95_duration_ms: float | None = Field(default=None, alias="p95DurationMs")
+
+    class Config:
+        allow_population_by_field_name = True
+
+
+class SourceImportStatsResponse(BaseModel):
+    source_filename: str | None = Field(default=None, alias="sourceFilename")
+    jobs: int
+    failed_jobs: int = Field(alias="failedJobs")
+    total_rows: int = Field(alias="totalRows")
+    failure_rows: int = Field(alias="failureRows")
+    failure_rate: float = Field(alias="failureRate")
+
+    class Config:
+        allow_population_by_field_name = True
+
+
+class ImportStatsResponse(BaseModel):
+    first_day: date = Field(alias="from")
+    last_day: date = Field(alias="to")
+    jobs: int
+    total_rows: int = Field(alias="totalRows")
+    failure_rows: int = Field(alias="failureRows")
+    failure_rate: float = Field(alias="failureRate")
+    p95_duration_ms: float | None = Field(default=None, alias="p95DurationMs")
+    days: list[DailyImportStatsResponse]
+    sources: list[SourceImportStatsResponse]
+
+    class Config:
+        allow_population_by_field_name = True
+
+    @classmethod
+    def from_domain(cls, stats: ImportStats) -> "ImportStatsResponse":
+        return cls(
+            first_day=stats.first_day,
+            last_day=stats.last_day,
+            jobs=stats.jobs,
+            total_rows=stats.total_rows,
+            failure_rows=stats.failure_rows,
+            failure_rate=round(stats.failure_rate, 6),
+            p95_duration_ms=stats.p95_duration_ms,
+            days=[
+                DailyImportStatsResponse(
+                    day=day.day,
+                    jobs=day.jobs,
+                    completed_jobs=day.completed_jobs,
+                    failed_jobs=day.failed_jobs,
+                    cancelled_jobs=day.cancelled_jobs,
+                    total_rows=day.total_rows,
+                    success_rows=day.success_rows,
+                    failure_rows=day.failure_rows,
+                    average_duration_ms=day.average_duration_ms,
+                    p95_duration_ms=day.p95_duration_ms,
+                )
+                for day in stats.days
+            ],
+            sources=[
+                SourceImportStatsResponse(
+                    source_filename=source.source,
+                    jobs=source.jobs,
+                    failed_jobs=source.failed_jobs,
+                    total_rows=source.total_rows,
+                    failure_rows=source.failure_rows,
+                    failure_rate=round(source.failure_rate, 6),
+                )
+                for source in stats.sources
+            ],
         )
 
 
@@ -147,22 +299,253 @@ def _to_domain_records(payloads: Iterable[ImportRecordPayload]) -> list[Coverage
     ]
 
 
+def _profiling_requested(
+    profile: bool = Query(False),
+    profile_header: str | None = Header(default=None, alias="X-Profile-Import"),
+    admin_token: str | None = Header(default=None, alias="X-Admin-Token"),
+) -> bool:
+    """Return whether this request opted into profiling (admins only)."""
+    requested = profile or (profile_header or "").strip().lower() in {"1", "true", "yes"}
+    if requested and not is_admin(admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Profiling imports requires admin privileges.",
+        )
+    return requested
+
+
+async def _run_submit_import(
+    request: ImportRequest,
+    *,
+    dry_run: bool,
+    profile: bool,
+    token: str | None,
+    nbytes: int,
+) -> tuple[int, ImportResponse]:
+    records = _to_domain_records(request.records)
+    # Imports block on the database; run them off the event loop so other
+    # requests, progress streams and admission rejections are still served.
+    if dry_run:
+        # Nothing is created, so a dry run answers 200 rather than 201.
+        summary = await run_in_threadpool(
+            dry_run_import,
+            records,
+            mode=request.mode,
+            remove_missing=request.remove_missing,
+            cache_key=request.upload_id,
+        )
+        return status.HTTP_200_OK, ImportResponse.from_summary(summary)
+
+    run_import = import_coverage_regions_profiled if profile else import_coverage_regions
+    with await run_in_threadpool(admit_import, token, nbytes):
+        summary = await run_in_threadpool(
+            run_import,
+            records,
+            source=request.source_filename,
+            mode=request.mode,
+            remove_missing=request.remove_missing,
+        )
+    return status.HTTP_201_CREATED, ImportResponse.from_summary(summary)
+
+
 @router.post("/", response_model=ImportResponse, status_code=status.HTTP_201_CREATED)
-async def submit_import(request: ImportRequest) -> ImportResponse:
+async def submit_import(
+    request: ImportRequest,
+    response: Response,
+    dry_run: bool = Query(False, alias="dryRun"),
+    profile: bool = Depends(_profiling_requested),
+    token: str | None = Depends(upload_token),
+    nbytes: int = Depends(request_size),
+    key: str | None = Depends(idempotency_key),
+) -> ImportResponse | Response:
+    """Import records; retries with the same ``Idempotency-Key`` replay the first answer."""
     if not request.records:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="records must not be empty")
+    if dry_run and profile:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dry runs cannot be profiled.",
+        )
 
-    summary = import_coverage_regions(
-        _to_domain_records(request.records),
-        source=request.source_filename,
-    )
+    def run() -> Awaitable[tuple[int, ImportResponse]]:
+        return _run_submit_import(request, dry_run=dry_run, profile=profile, token=token, nbytes=nbytes)
+
+    if key is None:
+        response.status_code, result = await run()
+        return result
+    digest = request_digest(request.dict(by_alias=True), {"dryRun": dry_run, "profile": profile})
+    return await run_idempotent(idempotency_scope("POST /imports", token), key, digest, run)
+
+
+@router.post("/targets/{target_name}", response_model=ImportResponse, status_code=status.HTTP_201_CREATED)
+def submit_target_import(
+    target_name: str,
+    request: ImportRowsRequest,
+    token: str | None = Depends(upload_token),
+    nbytes: int = Depends(request_size),
+) -> ImportResponse:
+    if not request.rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="rows must not be empty")
+
+    try:
+        with admit_import(token, nbytes):
+            summary = import_rows(
+                target_name,
+                request.rows,
+                source=request.source_filename,
+                mode=request.mode,
+                starting_row=request.starting_row,
+            )
+    except UnknownImportTargetError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    return ImportResponse.from_summary(summary)
+
+
+@router.post("/files/{file_id}", response_model=ImportResponse, status_code=status.HTTP_201_CREATED)
+def submit_file_import(
+    file_id: str,
+    target: str = Query("coverage_regions"),
+    mode: Literal["insert", "upsert"] = Query("insert"),
+    token: str | None = Depends(upload_token),
+) -> ImportResponse:
+    """Import an uploaded sheet, parsing and validating it in the same pass."""
+    upload = resolve_upload(file_id)
+    size = upload.stat().st_size if isinstance(upload, Path) else upload.size
+    try:
+        with admit_import(token, size):
+            if isinstance(upload, Path):
+                with upload.open("rb") as handle:
+                    summary = import_file(target, handle, filename=upload.name, mode=mode)
+            else:
+                summary = import_file(
+                    target,
+                    io.BytesIO(upload.content),
+                    filename=upload.filename,
+                    mode=mode,
+                )
+    except UnknownImportTargetError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except UnsupportedExtensionError as exc:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc)) from exc
+    return ImportResponse.from_summary(summary)
+
+
+@router.post("/{job_id}/cancel", status_code=status.HTTP_202_ACCEPTED)
+def request_import_cancellation(job_id: int) -> dict[str, str]:
+    try:
+        cancel_import(job_id)
+    except ImportJobNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except ImportJobStateError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    # The job stops at its next batch boundary.
+    return {"status": "cancelling"}
+
+
+@router.post("/{job_id}/resume", response_model=ImportResponse)
+def resume_import_job(
+    job_id: int,
+    request: ImportRequest,
+    token: str | None = Depends(upload_token),
+    nbytes: int = Depends(request_size),
+) -> ImportResponse:
+    if not request.records:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="records must not be empty")
+
+    try:
+        with admit_import(token, nbytes):
+            summary = resume_import(job_id, _to_domain_records(request.records))
+    except ImportJobNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except ImportJobStateError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
     return ImportResponse.from_summary(summary)
 
 
 @router.get("/", response_model=ImportHistoryResponse)
-async def list_import_history(
+def list_import_history(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100, alias="pageSize"),
-) -> ImportHistoryResponse:
-    history = list_import_jobs(page=page, page_size=page_size)
-    return ImportHistoryResponse.from_domain(history)
+) -> Response:
+    # Rendered straight from the rows; the model above documents the shape.
+    # A sync handler, so the database read runs in the threadpool.
+    return Response(
+        content=render_import_history(page=page, page_size=page_size),
+        media_type="application/json",
+    )
+
+
+@router.get("/stats", response_model=ImportStatsResponse)
+def get_import_stats(
+    first_day: date | None = Query(None, alias="from"),
+    last_day: date | None = Query(None, alias="to"),
+    source_limit: int = Query(20, ge=1, le=100, alias="sourceLimit"),
+) -> ImportStatsResponse:
+    """Rows per day, failure rate per source file and p95 duration, from the rollups."""
+    try:
+        stats = fetch_import_stats(first_day=first_day, last_day=last_day, source_limit=source_limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return ImportStatsResponse.from_domain(stats)
+
+
+@router.get("/{job_id}/profile", dependencies=[Depends(require_admin)])
+async def download_import_profile(
+    job_id: int,
+    format: str = Query("pstats", pattern="^(pstats|text)$"),
+) -> Response:
+    content = fetch_import_profile(job_id)
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profile recorded for this job")
+
+    if format == "text":
+        return Response(content=render_profile_text(content), media_type="text/plain; charset=utf-8")
+    return Response(
+        content=content,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="import-job-{job_id}.prof"'},
+    )
+
+
+@lru_cache(maxsize=1024)
+def _progress_event(progress: ImportProgress) -> bytes:
+    # Snapshots are immutable and shared, so every watcher of a job reuses
+    # the same encoded event.
+    return f"event: progress\ndata: {json.dumps(progress.to_dict())}\n\n".encode("utf-8")
+
+
+async def _progress_events(job_id: int, progress: ImportProgress) -> AsyncIterator[bytes]:
+    loop = asyncio.get_running_loop()
+    last_version: int | None = None
+    last_sent = loop.time()
+    while True:
+        if progress.version != last_version:
+            yield _progress_event(progress)
+            last_version = progress.version
+            last_sent = loop.time()
+        elif loop.time() - last_sent >= _PROGRESS_HEARTBEAT_SECONDS:
+            yield b": keep-alive\n\n"
+            last_sent = loop.time()
+        if progress.finished:
+            return
+
+        live = PROGRESS.get(job_id)
+        if live is not None:
+            await asyncio.sleep(_PROGRESS_INTERVAL_SECONDS)
+            progress = PROGRESS.get(job_id) or live
+        else:
+            await asyncio.sleep(_PROGRESS_DB_INTERVAL_SECONDS)
+            progress = await run_in_threadpool(fetch_import_progress, job_id) or progress
+
+
+@router.get("/{job_id}/progress")
+async def stream_import_progress(job_id: int) -> StreamingResponse:
+    progress = await run_in_threadpool(fetch_import_progress, job_id)
+    if progress is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+
+    return StreamingResponse(
+        _progress_events(job_id, progress),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,41 @@
+"""Prometheus metrics endpoint and request instrumentation."""
+from __future__ import annotations
+
+import time
+from typing import Awaitable, Callable
+
+from fastapi import APIRouter, Request, Response
+
+from metrics import HTTP_REQUEST_DURATION, REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def record_request_metrics(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]],
+) -> Response:
+    """Observe request latency labelled by route template, not raw path."""
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status_code),
+        )
+        REGISTRY.flush()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Expose all metrics in the Prometheus text format."""
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,92 @@
+"""Endpoints for reading coverage regions back out."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from services import Region, list_regions
+from services.export import iter_regions_export
+
+router = APIRouter(prefix="/regions", tags=["regions"])
+
+_EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+class RegionResponse(BaseModel):
+    code: str
+    name: str
+    description: str | None = None
+    updated_at: datetime = Field(alias="updatedAt")
+
+    class Config:
+        allow_population_by_field_name = True
+
+    @classmethod
+    def from_domain(cls, region: Region) -> "RegionResponse":
+        return cls(
+            code=region.code,
+            name=region.name,
+            description=region.description,
+            updated_at=region.updated_at,
+        )
+
+
+class RegionListResponse(BaseModel):
+    items: list[RegionResponse]
+    next_cursor: str | None = Field(default=None, alias="nextCursor")
+
+    class Config:
+        allow_population_by_field_name = True
+
+
+def _parse_if_none_match(header: str | None) -> set[str]:
+    if not header:
+        return set()
+    # If-None-Match uses the weak comparison: W/"x" matches "x".
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+@router.get("/", response_model=RegionListResponse)
+def list_region_page(
+    response: Response,
+    after: str | None = Query(None, max_length=255),
+    prefix: str | None = Query(None, min_length=1, max_length=255),
+    limit: int = Query(100, ge=1, le=500),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+) -> RegionListResponse | Response:
+    page = list_regions(
+        after=after,
+        prefix=prefix,
+        limit=limit,
+        if_none_match=_parse_if_none_match(if_none_match),
+    )
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+    if page.items is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return RegionListResponse(
+        items=[RegionResponse.from_domain(item) for item in page.items],
+        next_cursor=page.next_cursor,
+    )
+
+
+@router.get("/export")
+def export_regions(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    prefix: str | None = Query(None, min_length=1, max_length=255),
+    since: datetime | None = Query(None),
+) -> StreamingResponse:
+    # A sync generator: Starlette iterates it in the threadpool, one
+    # fetchmany batch per chunk, so the event loop is never blocked.
+    return StreamingResponse(
+        iter_regions_export(format, prefix=prefix, since=since),
+        media_type=_EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="coverage_regions.{format}"'},
+    )
@@ -0,0 +1,26 @@
+"""Shared request guards for privileged endpoints."""
+from __future__ import annotations
+
+import os
+import secrets
+
+from fastapi import Header, HTTPException, status
+
+ADMIN_TOKEN_ENV = "ADMIN_TOKEN"
+
+
+def is_admin(token: str | None) -> bool:
+    """Return whether *token* matches the configured admin token."""
+    expected = os.getenv(ADMIN_TOKEN_ENV)
+    if not expected or not token:
+        return False
+    return secrets.compare_digest(token.encode("utf-8"), expected.encode("utf-8"))
+
+
+def require_admin(admin_token: str | None = Header(default=None, alias="X-Admin-Token")) -> None:
+    """Reject the request unless it carries the admin token."""
+    if not is_admin(admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges are required.",
+        )
@@ -1,11 +1,25 @@
 """Upload controller for handling sheet import uploads."""
 from __future__ import annotations
 
+import hashlib
+import io
+import json
+import os
 from pathlib import Path
-import tempfile
+import re
+from typing import BinaryIO
 import uuid
 
-from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+
+from services import ColumnProfile, SheetPreview, preview_sheet, preview_stream
+from services.parser import UnsupportedExtensionError
+from services.idempotency import IdempotencyClaim, request_digest
+from services.upload_store import TEMP_ROOT, SpooledUpload, UploadSpool
+
+from .idempotency import claim_key, idempotency_key, idempotency_scope, release_key, store_response
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
@@ -15,8 +29,67 @@ SUPPORTED_TYPES = {
     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": ".xlsx",
 }
 MAX_FILE_SIZE_BYTES = 5 * 1024 * 1024  # 5 MiB
-_TEMP_ROOT = Path(tempfile.gettempdir()) / "sheet-import-demo"
+# Uploads up to this size are kept in memory and never written to disk.  The
+# spool is per process, so it is off by default behind several workers.
+_DEFAULT_SPOOL_THRESHOLD_BYTES = 0 if os.getenv("METRICS_MULTIPROC_DIR") else 256 * 1024
+SPOOL_THRESHOLD_BYTES = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_BYTES", str(_DEFAULT_SPOOL_THRESHOLD_BYTES)))
+SPOOL_CAPACITY_BYTES = int(os.getenv("UPLOAD_SPOOL_CAPACITY_BYTES", str(64 * 1024 * 1024)))
+_READ_CHUNK_BYTES = 1024 * 1024
+_WRITE_BUFFER_BYTES = 4 * 1024 * 1024
+_TEMP_ROOT = TEMP_ROOT
 _TEMP_ROOT.mkdir(parents=True, exist_ok=True)
+_FILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+_SPOOL = UploadSpool(SPOOL_CAPACITY_BYTES)
+
+
+class ColumnProfileResponse(BaseModel):
+    name: str
+    inferred_type: str = Field(alias="inferredType")
+    null_ratio: float = Field(alias="nullRatio")
+    sample_size: int = Field(alias="sampleSize")
+
+    class Config:
+        allow_population_by_field_name = True
+
+    @classmethod
+    def from_domain(cls, column: ColumnProfile) -> "ColumnProfileResponse":
+        return cls(
+            name=column.name,
+            inferred_type=column.inferred_type,
+            null_ratio=column.null_ratio,
+            sample_size=column.sample_size,
+        )
+
+
+class SheetPreviewResponse(BaseModel):
+    file_id: str = Field(alias="fileId")
+    header: list[str]
+    rows: list[dict]
+    columns: list[ColumnProfileResponse]
+    rows_scanned: int = Field(alias="rowsScanned")
+    bytes_read: int = Field(alias="bytesRead")
+    total_bytes: int = Field(alias="totalBytes")
+    estimated_total_rows: int = Field(alias="estimatedTotalRows")
+    is_exact: bool = Field(alias="isExact")
+    encoding: str | None = None
+
+    class Config:
+        allow_population_by_field_name = True
+
+    @classmethod
+    def from_domain(cls, file_id: str, preview: SheetPreview) -> "SheetPreviewResponse":
+        return cls(
+            file_id=file_id,
+            header=list(preview.header),
+            rows=list(preview.rows),
+            columns=[ColumnProfileResponse.from_domain(column) for column in preview.columns],
+            rows_scanned=preview.rows_scanned,
+            bytes_read=preview.bytes_read,
+            total_bytes=preview.total_bytes,
+            estimated_total_rows=preview.estimated_total_rows,
+            is_exact=preview.is_exact,
+            encoding=preview.encoding,
+        )
 
 
 def _validate_headers(
@@ -64,39 +137,170 @@ def _validate_file_metadata(upload: UploadFile) -> Path:
     return destination
 
 
+def _find_upload_path(file_id: str) -> Path | None:
+    for suffix in SUPPORTED_TYPES.values():
+        candidate = _TEMP_ROOT / f"{file_id}{suffix}"
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def resolve_upload(file_id: str) -> SpooledUpload | Path:
+    """Return the spooled content or stored path for *file_id* or raise ``404``."""
+    if _FILE_ID_PATTERN.match(file_id):
+        spooled = _SPOOL.get(file_id)
+        if spooled is not None:
+            return spooled
+        path = _find_upload_path(file_id)
+        if path is not None:
+            return path
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Uploaded file not found.",
+    )
+
+
+def _persist_spooled(upload: SpooledUpload) -> None:
+    """Write an evicted in-memory upload to disk atomically."""
+    destination = _TEMP_ROOT / f"{upload.file_id}{upload.suffix}"
+    staging = destination.with_name(f"{destination.name}.{uuid.uuid4().hex}.part")
+    staging.write_bytes(upload.content)
+    os.replace(staging, destination)
+
+
+async def _spool(upload: SpooledUpload) -> None:
+    for victim in _SPOOL.overflow(upload.size):
+        await run_in_threadpool(_persist_spooled, victim)
+        _SPOOL.discard(victim.file_id)
+    _SPOOL.put(upload)
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def upload_sheet(
     file: UploadFile = File(...),
     _: None = Depends(_validate_headers),
+    upload_token: str = Header(..., alias="X-Upload-Token"),
+    key: str | None = Depends(idempotency_key),
 ):
-    """Handle sheet uploads and persist them to a temporary location."""
+    """Handle sheet uploads, spooling small files in memory.
+
+    Files up to ``SPOOL_THRESHOLD_BYTES`` stay in memory.  Larger files are
+    written through a large buffer with every disk write offloaded to the
+    thread pool so slow volumes never block the event loop.  A retry with
+    the same ``Idempotency-Key`` and file gets the first upload's answer
+    and its copy is discarded.
+    """
     destination_path = _validate_file_metadata(file)
 
     total_bytes = 0
+    pending = bytearray()
+    buffer: BinaryIO | None = None
+    digest = hashlib.blake2b(digest_size=16) if key is not None else None
     try:
-        with destination_path.open("wb") as buffer:
-            while True:
-                chunk = await file.read(1024 * 1024)
-                if not chunk:
-                    break
-                total_bytes += len(chunk)
-                if total_bytes > MAX_FILE_SIZE_BYTES:
-                    raise HTTPException(
-                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                        detail="Uploaded file exceeds the maximum allowed size.",
-                    )
-                buffer.write(chunk)
-    except HTTPException:
-        if destination_path.exists():
+        while True:
+            chunk = await file.read(_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            if digest is not None:
+                digest.update(chunk)
+            total_bytes += len(chunk)
+            if total_bytes > MAX_FILE_SIZE_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Uploaded file exceeds the maximum allowed size.",
+                )
+            if buffer is None:
+                pending += chunk
+                if len(pending) <= SPOOL_THRESHOLD_BYTES:
+                    continue
+                buffer = await run_in_threadpool(
+                    destination_path.open, "wb", buffering=_WRITE_BUFFER_BYTES
+                )
+                chunk = bytes(pending)
+                pending.clear()
+            await run_in_threadpool(buffer.write, chunk)
+        if buffer is not None:
+            await run_in_threadpool(buffer.close)
+    except BaseException:
+        if buffer is not None:
+            await run_in_threadpool(buffer.close)
             destination_path.unlink(missing_ok=True)
         raise
     finally:
         await file.close()
 
-    return {
+    in_memory = buffer is None
+    claim: IdempotencyClaim | None = None
+    if key is not None:
+        try:
+            claimed = await claim_key(
+                idempotency_scope("POST /uploads", upload_token.strip()),
+                key,
+                request_digest(file.filename, file.content_type, digest.hexdigest()),
+            )
+        except BaseException:
+            destination_path.unlink(missing_ok=True)
+            raise
+        if not isinstance(claimed, IdempotencyClaim):
+            destination_path.unlink(missing_ok=True)
+            return claimed
+        claim = claimed
+
+    try:
+        if in_memory:
+            await _spool(
+                SpooledUpload(
+                    file_id=destination_path.stem,
+                    filename=file.filename,
+                    suffix=destination_path.suffix,
+                    content=bytes(pending),
+                )
+            )
+    except BaseException:
+        if claim is not None:
+            await release_key(claim)
+        raise
+
+    result = {
         "fileId": destination_path.stem,
         "filename": file.filename,
         "contentType": file.content_type,
         "size": total_bytes,
-        "temporaryPath": str(destination_path),
+        "storage": "memory" if in_memory else "disk",
+        "temporaryPath": None if in_memory else str(destination_path),
     }
+    if claim is not None:
+        await store_response(claim, status.HTTP_201_CREATED, json.dumps(result))
+    return result
+
+
+@router.get("/{file_id}/preview", response_model=SheetPreviewResponse)
+def preview_upload(
+    file_id: str,
+    limit: int = Query(200, ge=1, le=1000),
+    sample_size: int = Query(1000, ge=1, le=10000, alias="sampleSize"),
+) -> SheetPreviewResponse:
+    """Return the header, leading rows and inferred column types of an upload."""
+    upload = resolve_upload(file_id)
+    try:
+        if isinstance(upload, SpooledUpload):
+            preview = preview_stream(
+                io.BytesIO(upload.content),
+                filename=upload.filename,
+                total_bytes=upload.size,
+                limit=limit,
+                sample_size=sample_size,
+            )
+        else:
+            preview = preview_sheet(upload, limit=limit, sample_size=sample_size)
+    except UnsupportedExtensionError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(exc),
+        ) from exc
+    except (ValueError, UnicodeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Uploaded file could not be parsed: {exc}",
+        ) from exc
+    return SheetPreviewResponse.from_domain(file_id, preview)
@@ -0,0 +1,6 @@
+"""Local performance benchmarks for the demo backend.
+
+Benchmarks are plain scripts rather than tests so they never slow down the
+regular ``pytest`` run.  Execute them from the repository root, e.g.
+``python -m benchmarks.upload_throughput``.
+"""
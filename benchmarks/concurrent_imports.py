@@ -0,0 +1,91 @@
+"""Throughput and tail latency of concurrent imports.
+
+Runs ``--importers`` threads that each submit ``--jobs`` imports of
+``--rows`` fresh rows, first with one transaction per write (the behaviour
+before the group-commit writer, ``IMPORT_GROUP_COMMIT=0``) and then through
+the group-commit writer::
+
+    python -m benchmarks.concurrent_imports --importers 20 --jobs 10 --rows 500
+"""
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import statistics
+import tempfile
+import time
+
+from database import configure_database, get_database_url, initialize_database
+from repositories import CoverageRegionCreate
+from services import import_coverage_regions
+import writer
+
+
+def _records(importer: int, job: int, rows: int) -> list[CoverageRegionCreate]:
+    prefix = f"CN-{importer:02d}{job:04d}"
+    return [
+        CoverageRegionCreate(code=f"{prefix}-{row:05d}", name=f"区域{row}", description="重点客户", row_number=row + 2)
+        for row in range(rows)
+    ]
+
+
+def _importer(importer: int, jobs: int, rows: int) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    failures = 0
+    for job in range(jobs):
+        records = _records(importer, job, rows)
+        started = time.perf_counter()
+        try:
+            import_coverage_regions(records, source=f"importer-{importer}.csv")
+        except Exception:  # noqa: BLE001 - e.g. "database is locked"
+            failures += 1
+        latencies.append(time.perf_counter() - started)
+    return latencies, failures
+
+
+def _run(importers: int, jobs: int, rows: int) -> dict[str, float]:
+    with ThreadPoolExecutor(max_workers=importers) as pool:
+        started = time.perf_counter()
+        outcomes = list(pool.map(lambda index: _importer(index, jobs, rows), range(importers)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for samples, _ in outcomes for latency in samples)
+    failures = sum(failed for _, failed in outcomes)
+    return {
+        "seconds": elapsed,
+        "rows_per_second": (importers * jobs - failures) * rows / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+        "failures": failures,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--importers", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=10, help="imports per importer")
+    parser.add_argument("--rows", type=int, default=500, help="rows per import")
+    args = parser.parse_args()
+
+    previous_url = get_database_url()
+    enabled = writer.GROUP_COMMIT_ENABLED
+    try:
+        for label, group_commit in (("per-transaction", False), ("group-commit", True)):
+            with tempfile.TemporaryDirectory(prefix="sheet-import-load-") as directory:
+                configure_database(f"sqlite:///{Path(directory) / 'load.db'}")
+                initialize_database()
+                writer.GROUP_COMMIT_ENABLED = group_commit
+                result = _run(args.importers, args.jobs, args.rows)
+            print(
+                f"{label:>16}: {result['rows_per_second']:10,.0f} rows/s "
+                f"p50={result['p50_ms']:.1f}ms p99={result['p99_ms']:.1f}ms "
+                f"failures={result['failures']}"
+            )
+    finally:
+        writer.GROUP_COMMIT_ENABLED = enabled
+        configure_database(previous_url)
+
+
+if __name__ == "__main__":
+    main()
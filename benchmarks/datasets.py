@@ -0,0 +1,71 @@
+"""Deterministic synthetic coverage-region sheets for benchmarks.
+
+Generated sheets mimic real uploads: Chinese names and descriptions, a small
+share of codes repeated from earlier rows and a small share of invalid rows
+(blank code or blank name).
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import random
+from typing import Iterator
+
+from repositories import CoverageRegionCreate
+
+STANDARD_SIZES = (10_000, 100_000, 1_000_000)
+
+_PROVINCES = ("北京", "上海", "广东", "四川", "湖北", "浙江", "江苏", "山东", "河南", "陕西")
+_REGIONS = ("华北大区", "华东大区", "华南大区", "西南大区", "华中大区", "西北大区")
+
+
+def generate_rows(
+    count: int,
+    *,
+    seed: int = 20240501,
+    duplicate_ratio: float = 0.02,
+    invalid_ratio: float = 0.01,
+) -> Iterator[dict[str, str]]:
+    """Yield *count* sheet rows as ``code``/``name``/``description`` dicts."""
+
+    rng = random.Random(seed)
+    for index in range(count):
+        roll = rng.random()
+        if index and roll < duplicate_ratio:
+            code = f"CN-{rng.randrange(index):07d}"
+        else:
+            code = f"CN-{index:07d}"
+        province = _PROVINCES[index % len(_PROVINCES)]
+        name = f"{_REGIONS[index % len(_REGIONS)]}·{province}{index}"
+        description = f"重点客户数量 {rng.randrange(1, 500)}"
+        if duplicate_ratio <= roll < duplicate_ratio + invalid_ratio:
+            if rng.random() < 0.5:
+                code = ""
+            else:
+                name = ""
+        yield {"code": code, "name": name, "description": description}
+
+
+def to_csv_bytes(rows: Iterator[dict[str, str]], *, encoding: str = "utf-8") -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=("code", "name", "description"), lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode(encoding)
+
+
+def to_json_bytes(rows: Iterator[dict[str, str]]) -> bytes:
+    return json.dumps(list(rows), ensure_ascii=False).encode("utf-8")
+
+
+def to_records(rows: Iterator[dict[str, str]], *, starting_row: int = 2) -> list[CoverageRegionCreate]:
+    return [
+        CoverageRegionCreate(
+            code=row["code"],
+            name=row["name"],
+            description=row["description"],
+            row_number=row_number,
+        )
+        for row_number, row in enumerate(rows, start=starting_row)
+    ]
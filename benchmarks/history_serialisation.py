@@ -0,0 +1,107 @@
+"""History page serialisation: response models versus direct JSON rendering.
+
+Seeds a database with finished jobs and times building one 100-job
+``GET /imports`` body through each path::
+
+    python -m benchmarks.history_serialisation --jobs 2000 --errors 200
+
+``models`` is the previous path (repository rows -> domain records ->
+response models -> ``JSONResponse``) and needs FastAPI installed; ``domain``
+stops after the domain records and is a lower bound for it; ``direct`` is
+:func:`services.history_json.render_import_history`.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import statistics
+import tempfile
+import time
+from typing import Callable
+
+from database import configure_database, initialize_database, session_scope
+from repositories import ImportLogRepository
+from services import list_import_jobs
+from services.history_json import render_import_history
+
+
+def _seed(jobs: int, errors_per_job: int) -> None:
+    errors = [
+        {"message": "Region code already exists in database.", "rowNumber": row, "code": f"CN-{row:07d}"}
+        for row in range(2, errors_per_job + 2)
+    ]
+    with session_scope() as session:
+        repository = ImportLogRepository(session)
+        for index in range(jobs):
+            job_id = repository.create_job(f"sheet-{index}.csv", 1000)
+            for step in range(4):
+                repository.append_event(job_id, f"Stage {step} finished")
+            repository.finalise_job(
+                job_id,
+                success_count=1000 - len(errors),
+                failure_count=len(errors),
+                errors=errors,
+                status="completed",
+            )
+            repository.record_timings(job_id, {"normalise": 1.5, "lookup": 0.25, "insert": 12.0})
+
+
+def _models_path(page: int, page_size: int) -> Callable[[], bytes] | None:
+    try:
+        from fastapi.encoders import jsonable_encoder
+        from fastapi.responses import JSONResponse
+
+        from api.imports_controller import ImportHistoryResponse
+    except ImportError:
+        return None
+
+    def run() -> bytes:
+        history = list_import_jobs(page=page, page_size=page_size)
+        response = ImportHistoryResponse.from_domain(history)
+        return JSONResponse(jsonable_encoder(response, by_alias=True)).body
+
+    return run
+
+
+def _time(run: Callable[[], object], repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--errors", type=int, default=200, help="errors stored per job")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="sheet-import-bench-") as directory:
+        configure_database(f"sqlite:///{Path(directory) / 'bench.db'}")
+        initialize_database()
+        _seed(args.jobs, args.errors)
+        page = args.jobs // args.page_size // 2 or 1
+
+        paths: dict[str, Callable[[], object] | None] = {
+            "models": _models_path(page, args.page_size),
+            "domain": lambda: list_import_jobs(page=page, page_size=args.page_size),
+            "direct": lambda: render_import_history(page=page, page_size=args.page_size),
+        }
+        print(f"== {args.page_size}-job page, {args.errors} errors per job")
+        for name, run in paths.items():
+            if run is None:
+                print(f"  {name:<8} skipped (FastAPI is not installed)")
+                continue
+            samples = _time(run, args.repeat)
+            print(
+                f"  {name:<8} median {statistics.median(samples) * 1000:8.2f} ms"
+                f"  min {min(samples) * 1000:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""History page latency while imports are committing.
+
+Background threads import continuously while the main thread pages through
+``list_import_jobs``.  The run is repeated with history reads going through
+the read/write ``session_scope`` path and through the read-only pool::
+
+    python -m benchmarks.history_under_load --importers 4 --seconds 10
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import statistics
+import tempfile
+import threading
+import time
+
+import database
+from database import configure_database, get_database_url, initialize_database
+from repositories import CoverageRegionCreate
+from services import import_coverage_regions, list_import_jobs
+from services import import_service
+
+
+def _import_loop(importer: int, rows: int, stop: threading.Event) -> None:
+    job = 0
+    while not stop.is_set():
+        records = [
+            CoverageRegionCreate(code=f"CN-{importer:02d}-{job:05d}-{row:05d}", name=f"区域{row}", row_number=row + 2)
+            for row in range(rows)
+        ]
+        import_coverage_regions(records, source=f"load-{importer}.csv")
+        job += 1
+
+
+def _measure(importers: int, rows: int, seconds: float) -> dict[str, float]:
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=_import_loop, args=(index, rows, stop), daemon=True) for index in range(importers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    latencies: list[float] = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        list_import_jobs(page=1, page_size=20)
+        latencies.append(time.perf_counter() - started)
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--importers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=2000, help="rows per import")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    previous_url = get_database_url()
+    try:
+        for label, scope in (("session_scope", database.session_scope), ("read_scope", database.read_scope)):
+            with tempfile.TemporaryDirectory(prefix="sheet-import-history-") as directory:
+                configure_database(f"sqlite:///{Path(directory) / 'history.db'}")
+                initialize_database()
+                import_service.read_scope = scope
+                result = _measure(args.importers, args.rows, args.seconds)
+            print(
+                f"{label:>14}: {result['requests']:6d} pages "
+                f"p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms"
+            )
+    finally:
+        import_service.read_scope = database.read_scope
+        configure_database(previous_url)
+
+
+if __name__ == "__main__":
+    main()
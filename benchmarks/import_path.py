@@ -0,0 +1,241 @@
+"""Reproducible benchmark of the whole import path.
+
+Every stage runs against a fresh SQLite database in a temporary directory::
+
+    python -m benchmarks.import_path --sizes 10000 100000
+    python -m benchmarks.import_path --sizes 10000 --save      # record baseline
+    python -m benchmarks.import_path --sizes 10000 --check     # fail on regression
+
+Baselines are stored as JSON under ``benchmarks/baselines``.  They are
+machine specific, so record them on the machine that runs ``--check``.
+"""
+from __future__ import annotations
+
+import argparse
+from contextlib import contextmanager
+import io
+import json
+from pathlib import Path
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Iterator
+
+from benchmarks import datasets
+from database import configure_database, get_database_url, initialize_database, session_scope
+from repositories import CoverageRegionRepository, ImportLogRepository
+from services import import_coverage_regions, import_file, list_import_jobs
+from services.import_service import _normalise_records
+from services.parser import parse_data
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_THRESHOLD = 0.25
+
+
+def _required(value: object) -> str | None:
+    return None if str(value or "").strip() else "Value is required"
+
+
+_SCHEMA = {"code": _required, "name": _required}
+
+
+@contextmanager
+def _fresh_database() -> Iterator[None]:
+    previous = get_database_url()
+    with tempfile.TemporaryDirectory(prefix="sheet-import-bench-") as directory:
+        configure_database(f"sqlite:///{Path(directory) / 'bench.db'}")
+        initialize_database()
+        try:
+            yield
+        finally:
+            configure_database(previous)
+
+
+def _time(
+    run: Callable[[], object],
+    *,
+    repeat: int,
+    setup: Callable[[], object] | None = None,
+) -> list[float]:
+    samples: list[float] = []
+    for _ in range(repeat):
+        with _fresh_database():
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _seed_regions(records, *, every: int = 2) -> None:
+    with session_scope() as session:
+        CoverageRegionRepository(session).bulk_insert(records[::every])
+
+
+def _seed_history(jobs: int) -> None:
+    errors = [
+        {"message": "Region code already exists in database.", "rowNumber": row, "code": f"CN-{row:07d}"}
+        for row in range(2, 52)
+    ]
+    with session_scope() as session:
+        repository = ImportLogRepository(session)
+        for index in range(jobs):
+            job_id = repository.create_job(f"sheet-{index}.csv", 1000)
+            for step in range(4):
+                repository.append_event(job_id, f"Stage {step} finished")
+            repository.finalise_job(
+                job_id,
+                success_count=950,
+                failure_count=len(errors),
+                errors=errors,
+                status="completed",
+            )
+
+
+def run_suite(size: int, *, repeat: int, history_jobs: int) -> dict[str, dict[str, float]]:
+    rows = list(datasets.generate_rows(size))
+    csv_bytes = datasets.to_csv_bytes(iter(rows))
+    json_bytes = datasets.to_json_bytes(iter(rows))
+    records = datasets.to_records(iter(rows))
+    normalised, _ = _normalise_records(records)
+    codes = [record.code for record in normalised]
+
+    def fetch_existing() -> None:
+        with session_scope() as session:
+            CoverageRegionRepository(session).fetch_existing_codes(codes)
+
+    def bulk_insert() -> None:
+        with session_scope() as session:
+            CoverageRegionRepository(session).bulk_insert(normalised)
+
+    stages: dict[str, tuple[list[float], int]] = {
+        "parse_data_csv": (
+            _time(lambda: parse_data(csv_bytes, filename="bench.csv", schema=_SCHEMA), repeat=repeat),
+            size,
+        ),
+        "parse_data_json": (
+            _time(lambda: parse_data(json_bytes, filename="bench.json", schema=_SCHEMA), repeat=repeat),
+            size,
+        ),
+        "normalise_records": (_time(lambda: _normalise_records(records), repeat=repeat), size),
+        "fetch_existing_codes": (
+            _time(fetch_existing, repeat=repeat, setup=lambda: _seed_regions(normalised)),
+            len(codes),
+        ),
+        "bulk_insert": (_time(bulk_insert, repeat=repeat), len(normalised)),
+        "import_coverage_regions": (
+            _time(lambda: import_coverage_regions(records, source="bench.csv"), repeat=repeat),
+            size,
+        ),
+        # Parse, validate, normalise and insert fused into one pass over the file.
+        "import_file_csv": (
+            _time(lambda: import_file("coverage_regions", io.BytesIO(csv_bytes), filename="bench.csv"), repeat=repeat),
+            size,
+        ),
+        "list_import_jobs": (
+            _time(
+                lambda: list_import_jobs(page=history_jobs // 40 or 1, page_size=20),
+                repeat=repeat,
+                setup=lambda: _seed_history(history_jobs),
+            ),
+            20,
+        ),
+    }
+
+    results: dict[str, dict[str, float]] = {}
+    for name, (samples, items) in stages.items():
+        median = statistics.median(samples)
+        results[name] = {
+            "median_s": round(median, 6),
+            "min_s": round(min(samples), 6),
+            "items_per_s": round(items / median, 1) if median else 0.0,
+        }
+    return results
+
+
+def _baseline_path(size: int) -> Path:
+    return BASELINE_DIR / f"import_path-{size}.json"
+
+
+def _environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def compare(
+    current: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    *,
+    threshold: float,
+) -> list[str]:
+    """Return a description of every stage slower than the baseline allows.
+
+    The best-of-``repeat`` time is compared because it is the sample least
+    affected by unrelated load on the machine.
+    """
+
+    regressions: list[str] = []
+    for name, result in current.items():
+        reference = baseline.get(name)
+        if reference is None or not reference.get("min_s"):
+            continue
+        ratio = result["min_s"] / reference["min_s"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {result['min_s']:.4f}s vs baseline {reference['min_s']:.4f}s (+{(ratio - 1):.0%})"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[datasets.STANDARD_SIZES[0]])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--history-jobs", type=int, default=5000)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail when slower than the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    exit_code = 0
+    for size in args.sizes:
+        results = run_suite(size, repeat=args.repeat, history_jobs=args.history_jobs)
+        print(f"== {size} rows")
+        for name, result in results.items():
+            print(f"  {name:<26} {result['median_s']:>9.4f}s  {result['items_per_s']:>12,.0f}/s")
+
+        path = _baseline_path(size)
+        if args.check:
+            if not path.exists():
+                print(f"  no baseline at {path}; run with --save first")
+                exit_code = 1
+            else:
+                baseline = json.loads(path.read_text(encoding="utf-8"))
+                regressions = compare(results, baseline["results"], threshold=args.threshold)
+                for line in regressions:
+                    print(f"  REGRESSION {line}")
+                exit_code = exit_code or int(bool(regressions))
+        if args.save:
+            BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+            payload = {
+                "size": size,
+                "repeat": args.repeat,
+                "history_jobs": args.history_jobs,
+                "environment": _environment(),
+                "results": results,
+            }
+            path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+            print(f"  baseline written to {path}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Aggregate upload throughput with many parallel clients.
+
+Runs the ``/uploads`` endpoint in-process through ``httpx.ASGITransport`` and
+compares the spooled configuration against one that forces every upload to
+disk (``SPOOL_THRESHOLD_BYTES = 0``)::
+
+    python -m benchmarks.upload_throughput --clients 50 --uploads 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from api import upload_controller
+from main import app
+
+_HEADERS = {"X-Upload-Token": "benchmark"}
+
+
+def _payload(size: int) -> bytes:
+    line = "CN-110000,华北大区·北京,重点客户数量 120\n".encode("utf-8")
+    body = b"code,name,description\n" + line * (size // len(line) + 1)
+    return body[:size]
+
+
+async def _client(client: httpx.AsyncClient, body: bytes, uploads: int, latencies: list[float]) -> None:
+    for _ in range(uploads):
+        started = time.perf_counter()
+        response = await client.post(
+            "/uploads/",
+            headers=_HEADERS,
+            files={"file": ("sheet.csv", body, "text/csv")},
+        )
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def _run(clients: int, uploads: int, size: int) -> dict[str, float]:
+    body = _payload(size)
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(_client(client, body, uploads, latencies) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    total_bytes = clients * uploads * size
+    ordered = sorted(latencies)
+    return {
+        "seconds": elapsed,
+        "uploads_per_second": len(latencies) / elapsed,
+        "mib_per_second": total_bytes / elapsed / (1024 * 1024),
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[int(len(ordered) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--uploads", type=int, default=20, help="uploads per client")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8 * 1024, 128 * 1024, 2 * 1024 * 1024])
+    args = parser.parse_args()
+
+    spool_threshold = upload_controller.SPOOL_THRESHOLD_BYTES
+    for size in args.sizes:
+        for label, threshold in (("disk", 0), ("spooled", spool_threshold)):
+            upload_controller.SPOOL_THRESHOLD_BYTES = threshold
+            result = asyncio.run(_run(args.clients, args.uploads, size))
+            print(
+                f"{label:>8} size={size:>8}B clients={args.clients} "
+                f"{result['uploads_per_second']:8.1f} uploads/s "
+                f"{result['mib_per_second']:7.2f} MiB/s "
+                f"p50={result['p50_ms']:.1f}ms p99={result['p99_ms']:.1f}ms"
+            )
+    upload_controller.SPOOL_THRESHOLD_BYTES = spool_threshold
+
+
+if __name__ == "__main__":
+    main()
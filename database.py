@@ -4,8 +4,14 @@ from __future__ import annotations
 from contextlib import contextmanager
 import os
 from pathlib import Path
+import queue
 import sqlite3
+import threading
+import time
 from typing import Iterator
+from urllib.parse import quote
+
+from metrics import DB_CONNECTION_ACQUIRE, SQLITE_BUSY_RETRIES
 
 
 def _resolve_database_target(url: str) -> str:
@@ -21,6 +27,15 @@ def _resolve_database_target(url: str) -> str:
 
 _DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sheet_import.db")
 _TARGET = _resolve_database_target(_DATABASE_URL)
+_BUSY_RETRY_ATTEMPTS = 3
+_BUSY_RETRY_DELAY_SECONDS = 0.05
+_READ_POOL_SIZE = int(os.getenv("DATABASE_READ_POOL_SIZE", "4"))
+# How long a read waits for a pooled connection before giving up.
+_READ_TIMEOUT_SECONDS = float(os.getenv("DATABASE_READ_TIMEOUT_SECONDS", "10"))
+
+
+class ReadPoolExhaustedError(RuntimeError):
+    """Raised when no pooled read connection frees up in time."""
 
 
 def configure_database(url: str) -> None:
@@ -37,15 +52,56 @@ def get_database_url() -> str:
     return _DATABASE_URL
 
 
+def get_database_path() -> Path | None:
+    """Return the database file path, or ``None`` for in-memory databases."""
+
+    return None if _TARGET == ":memory:" else Path(_TARGET)
+
+
+def _is_busy(exc: sqlite3.OperationalError) -> bool:
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+def commit_with_retry(connection: sqlite3.Connection, statement: str | None = None) -> None:
+    """Commit, retrying a few times while another connection holds the lock.
+
+    ``statement`` replaces ``connection.commit()`` for connections managing
+    their transactions explicitly (``isolation_level=None``).
+    """
+
+    for attempt in range(_BUSY_RETRY_ATTEMPTS + 1):
+        try:
+            if statement is None:
+                connection.commit()
+            else:
+                connection.execute(statement)
+            return
+        except sqlite3.OperationalError as exc:
+            if attempt == _BUSY_RETRY_ATTEMPTS or not _is_busy(exc):
+                raise
+            SQLITE_BUSY_RETRIES.inc()
+            time.sleep(_BUSY_RETRY_DELAY_SECONDS * (attempt + 1))
+
+
+def connect(**kwargs) -> sqlite3.Connection:
+    """Open a new connection to the configured database."""
+
+    started = time.perf_counter()
+    connection = sqlite3.connect(_TARGET, **kwargs)
+    DB_CONNECTION_ACQUIRE.observe(time.perf_counter() - started)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
 @contextmanager
 def session_scope() -> Iterator[sqlite3.Connection]:
     """Provide a transaction scope using a SQLite connection."""
 
-    connection = sqlite3.connect(_TARGET)
-    connection.row_factory = sqlite3.Row
+    connection = connect()
     try:
         yield connection
-        connection.commit()
+        commit_with_retry(connection)
     except Exception:
         connection.rollback()
         raise
@@ -53,11 +109,131 @@ def session_scope() -> Iterator[sqlite3.Connection]:
         connection.close()
 
 
+_INITIALIZED_URLS: set[str] = set()
+
+
+class _ReadOnlyPool:
+    """Bounded pool of ``mode=ro`` connections to one database file."""
+
+    def __init__(self, target: str, size: int):
+        self._uri = f"file:{quote(str(Path(target).resolve()))}?mode=ro"
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def open(self) -> sqlite3.Connection:
+        """Open a connection that does not count against the pool."""
+
+        connection = sqlite3.connect(self._uri, uri=True, isolation_level=None, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def acquire(self, timeout: float | None = None) -> sqlite3.Connection:
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=timeout):
+            raise ReadPoolExhaustedError(f"No database read connection became free within {timeout:g}s.")
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                connection = self.open()
+            except BaseException:
+                self._slots.release()
+                raise
+        DB_CONNECTION_ACQUIRE.observe(time.perf_counter() - started)
+        return connection
+
+    def release(self, connection: sqlite3.Connection, *, broken: bool = False) -> None:
+        if broken:
+            connection.close()
+        else:
+            self._idle.put(connection)
+        self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_READ_POOL: _ReadOnlyPool | None = None
+_READ_POOL_URL: str | None = None
+_READ_POOL_LOCK = threading.Lock()
+
+
+def _read_pool() -> _ReadOnlyPool | None:
+    global _READ_POOL, _READ_POOL_URL
+    if _TARGET == ":memory:":
+        return None
+    with _READ_POOL_LOCK:
+        if _READ_POOL is None or _READ_POOL_URL != _DATABASE_URL:
+            if _READ_POOL is not None:
+                _READ_POOL.close()
+            _READ_POOL = _ReadOnlyPool(_TARGET, _READ_POOL_SIZE)
+            _READ_POOL_URL = _DATABASE_URL
+        return _READ_POOL
+
+
+@contextmanager
+def read_scope(*, dedicated: bool = False) -> Iterator[sqlite3.Connection]:
+    """Provide a read-only connection holding one consistent snapshot.
+
+    Connections come from a pool opened with ``mode=ro``; in WAL mode they
+    never take the write lock, so history and region reads are not blocked
+    by an import that is committing.  Every statement in the block reads
+    from the same snapshot.  Waiting longer than
+    ``DATABASE_READ_TIMEOUT_SECONDS`` for a pooled connection raises
+    :class:`ReadPoolExhaustedError`.  Long-lived readers such as streamed
+    downloads pass ``dedicated=True`` to open their own connection instead
+    of holding a pool slot.  In-memory databases fall back to
+    :func:`session_scope`.
+    """
+
+    pool = _read_pool()
+    if pool is None:
+        with session_scope() as connection:
+            yield connection
+        return
+
+    connection = pool.open() if dedicated else pool.acquire(_READ_TIMEOUT_SECONDS)
+    broken = False
+    try:
+        connection.execute("BEGIN")
+        yield connection
+    except sqlite3.Error:
+        broken = True
+        raise
+    finally:
+        if connection.in_transaction:
+            try:
+                connection.execute("ROLLBACK")
+            except sqlite3.Error:
+                broken = True
+        if dedicated:
+            connection.close()
+        else:
+            pool.release(connection, broken=broken)
+
+
 def initialize_database() -> None:
-    """Apply pending migrations to the configured database."""
+    """Apply pending migrations to the configured database.
+
+    Migrations run once per database URL and process; later calls return
+    immediately instead of opening a connection that competes for locks.
+    """
 
     from migrations import run_all
 
+    if _DATABASE_URL in _INITIALIZED_URLS and _TARGET != ":memory:":
+        return
     with session_scope() as conn:
+        # Only takes effect while the file is still empty; lets the retention
+        # job hand freed pages back in small incremental_vacuum steps.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        if _TARGET != ":memory:":
+            # WAL lets read_scope() readers and the writer work concurrently.
+            conn.execute("PRAGMA journal_mode=WAL")
         run_all(conn)
+    _INITIALIZED_URLS.add(_DATABASE_URL)
 
@@ -1,14 +1,60 @@
 """Application entry point for the sheet import demo API."""
 from __future__ import annotations
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 
 from api.imports_controller import router as imports_router
+from api.metrics_controller import record_request_metrics, router as metrics_router
+from api.regions_controller import router as regions_router
 from api.upload_controller import router as upload_router
+from database import ReadPoolExhaustedError
+from metrics import REGISTRY
+from services.retention import RetentionWorker, policy_from_env
 
 app = FastAPI(title="Sheet Import Demo API")
+app.middleware("http")(record_request_metrics)
 app.include_router(upload_router)
 app.include_router(imports_router)
+app.include_router(regions_router)
+app.include_router(metrics_router)
+
+_retention_policy = policy_from_env()
+_retention_worker = RetentionWorker(_retention_policy) if _retention_policy.interval_seconds > 0 else None
+
+
+@app.exception_handler(ReadPoolExhaustedError)
+async def read_pool_exhausted(request: Request, exc: ReadPoolExhaustedError) -> JSONResponse:
+    """Every read connection is busy; ask the client to retry shortly."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.on_event("startup")
+def start_retention_worker() -> None:
+    """Archive and compact old import history in the background."""
+    if _retention_worker is not None:
+        _retention_worker.start()
+
+
+@app.on_event("shutdown")
+def stop_retention_worker() -> None:
+    if _retention_worker is not None:
+        _retention_worker.stop()
+
+
+@app.on_event("startup")
+def start_metrics_flusher() -> None:
+    """Publish this worker's metrics even while it serves no requests."""
+    REGISTRY.start_flushing()
+
+
+@app.on_event("shutdown")
+def stop_metrics_flusher() -> None:
+    REGISTRY.stop_flushing()
 
 
 @app.get("/health")
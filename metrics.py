@@ -0,0 +1,284 @@
+"""Minimal in-process metrics registry with Prometheus text exposition.
+
+Metrics are plain counters and histograms guarded by one short lock each, so
+recording a sample costs a dictionary update.  With several uvicorn workers
+set ``METRICS_MULTIPROC_DIR`` to a directory shared by the workers: each
+process periodically publishes a snapshot there and ``/metrics`` sums the
+snapshots of all processes, so a scrape served by any worker reports totals.
+Snapshots are published after requests, by a background flusher (so samples
+recorded by idle workers' background jobs still arrive) and at shutdown.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Iterable, Sequence
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_FLUSH_INTERVAL_SECONDS = float(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", "5"))
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (+Inf last), sum.
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][position] += 1
+            entry[1][0] += value
+
+    def snapshot(self) -> dict[LabelValues, list[float]]:
+        """Return ``[bucket counts..., +Inf count, sum]`` per label set."""
+
+        with self._lock:
+            return {key: [*counts, total[0]] for key, (counts, total) in self._values.items()}
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self, multiproc_dir: str | None = None):
+        self._metrics: dict[str, _Metric] = {}
+        self._multiproc_dir = Path(multiproc_dir) if multiproc_dir else None
+        self._last_flush = 0.0
+        self._flusher: threading.Thread | None = None
+        self._stop_flushing = threading.Event()
+        # Requests and the flusher share one staging file per process.
+        self._flush_lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def _snapshot(self) -> dict[str, dict[str, object]]:
+        return {
+            name: {
+                "samples": [[list(key), value] for key, value in metric.snapshot().items()],  # type: ignore[attr-defined]
+            }
+            for name, metric in self._metrics.items()
+        }
+
+    def flush(self, *, force: bool = False) -> None:
+        """Publish this process's snapshot when running multi-process."""
+
+        if self._multiproc_dir is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < _FLUSH_INTERVAL_SECONDS:
+            return
+        self._last_flush = now
+        with self._flush_lock:
+            self._multiproc_dir.mkdir(parents=True, exist_ok=True)
+            target = self._multiproc_dir / f"metrics-{os.getpid()}.json"
+            staging = target.with_suffix(".tmp")
+            staging.write_text(json.dumps(self._snapshot()), encoding="utf-8")
+            os.replace(staging, target)
+
+    def start_flushing(self) -> None:
+        """Publish snapshots every flush interval from a daemon thread."""
+
+        if self._multiproc_dir is None or self._flusher is not None:
+            return
+        self._stop_flushing.clear()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="metrics-flusher", daemon=True)
+        self._flusher.start()
+
+    def stop_flushing(self) -> None:
+        """Stop the flusher and publish a final snapshot."""
+
+        self._stop_flushing.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush(force=True)
+
+    def _flush_periodically(self) -> None:
+        while not self._stop_flushing.wait(_FLUSH_INTERVAL_SECONDS):
+            try:
+                self.flush(force=True)
+            except OSError:
+                continue  # The shared directory is unavailable; retry next interval.
+
+    def _collect(self) -> dict[str, dict[LabelValues, object]]:
+        if self._multiproc_dir is None:
+            return {name: metric.snapshot() for name, metric in self._metrics.items()}  # type: ignore[attr-defined]
+
+        self.flush(force=True)
+        merged: dict[str, dict[LabelValues, object]] = {name: {} for name in self._metrics}
+        for path in sorted(self._multiproc_dir.glob("metrics-*.json")):
+            try:
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue  # A worker is replacing its file; use the next scrape.
+            for name, payload in snapshot.items():
+                if name not in merged:
+                    continue
+                for key, value in payload["samples"]:
+                    key = tuple(key)
+                    current = merged[name].get(key)
+                    if current is None:
+                        merged[name][key] = value
+                    elif isinstance(value, list):
+                        merged[name][key] = [a + b for a, b in zip(current, value)]  # type: ignore[arg-type]
+                    else:
+                        merged[name][key] = current + value  # type: ignore[operator]
+        return merged
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+
+        lines: list[str] = []
+        collected = self._collect()
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(collected[name].items()):
+                if isinstance(metric, Histogram):
+                    lines.extend(_render_histogram(metric, key, value))  # type: ignore[arg-type]
+                else:
+                    lines.append(f"{name}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(metric: Histogram, key: LabelValues, value: list[float]) -> Iterable[str]:
+    *counts, total = value
+    cumulative = 0
+    for bound, count in zip((*metric.buckets, float("inf")), counts):
+        cumulative += count
+        le = f'le="{_format_value(bound)}"'
+        yield f"{metric.name}_bucket{_format_labels(metric.labelnames, key, le)} {int(cumulative)}"
+    labels = _format_labels(metric.labelnames, key)
+    yield f"{metric.name}_sum{labels} {_format_value(total)}"
+    yield f"{metric.name}_count{labels} {int(cumulative)}"
+
+
+REGISTRY = Registry(os.getenv("METRICS_MULTIPROC_DIR"))
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+IMPORT_ROWS_IMPORTED = REGISTRY.counter(
+    "import_rows_imported_total",
+    "Rows inserted by import jobs.",
+)
+IMPORT_ROWS_REJECTED = REGISTRY.counter(
+    "import_rows_rejected_total",
+    "Rows rejected by import jobs (validation, duplicates or existing codes).",
+)
+IMPORT_DURATION = REGISTRY.histogram(
+    "import_duration_seconds",
+    "Wall-clock duration of import jobs.",
+    ("status",),
+)
+DB_CONNECTION_ACQUIRE = REGISTRY.histogram(
+    "db_connection_acquire_seconds",
+    "Time spent opening a SQLite connection.",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0),
+)
+SQLITE_BUSY_RETRIES = REGISTRY.counter(
+    "sqlite_busy_retries_total",
+    "Commits retried because the database was locked.",
+)
+IMPORT_ADMISSION_WAIT = REGISTRY.histogram(
+    "import_admission_wait_seconds",
+    "Time imports waited for a slot, by priority.",
+    ("priority",),
+)
+IMPORT_ADMISSION_REJECTED = REGISTRY.counter(
+    "import_admission_rejected_total",
+    "Imports turned away because their upload token's queue was full.",
+    ("priority",),
+)
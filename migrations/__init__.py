@@ -3,7 +3,22 @@ from __future__ import annotations
 
 import sqlite3
 
-from . import v0001_create_coverage_regions, v0002_create_import_logs
+from . import (
+    v0001_create_coverage_regions,
+    v0002_create_import_logs,
+    v0003_create_import_job_timings,
+    v0004_create_import_job_profiles,
+    v0005_add_coverage_region_content_hash,
+    v0006_create_table_versions,
+    v0007_index_import_jobs_created_at,
+    v0008_add_import_job_checkpoints,
+    v0009_add_import_job_archival,
+    v0010_add_import_job_target,
+    v0011_create_idempotency_keys,
+    v0012_create_import_stats_rollups,
+    v0013_sequence_import_job_pending_errors,
+    v0014_backfill_import_error_field,
+)
 
 
 def run_all(connection: sqlite3.Connection) -> None:
@@ -12,6 +27,18 @@ def run_all(connection: sqlite3.Connection) -> None:
     migrations = [
         v0001_create_coverage_regions.upgrade,
         v0002_create_import_logs.upgrade,
+        v0003_create_import_job_timings.upgrade,
+        v0004_create_import_job_profiles.upgrade,
+        v0005_add_coverage_region_content_hash.upgrade,
+        v0006_create_table_versions.upgrade,
+        v0007_index_import_jobs_created_at.upgrade,
+        v0008_add_import_job_checkpoints.upgrade,
+        v0009_add_import_job_archival.upgrade,
+        v0010_add_import_job_target.upgrade,
+        v0011_create_idempotency_keys.upgrade,
+        v0012_create_import_stats_rollups.upgrade,
+        v0013_sequence_import_job_pending_errors.upgrade,
+        v0014_backfill_import_error_field.upgrade,
     ]
     for upgrade in migrations:
         upgrade(connection)
@@ -0,0 +1,23 @@
+"""Store per-stage durations for import jobs."""
+from __future__ import annotations
+
+import sqlite3
+
+
+CREATE_TIMINGS_SQL = """
+CREATE TABLE IF NOT EXISTS import_job_timings (
+    job_id INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    PRIMARY KEY (job_id, stage),
+    FOREIGN KEY(job_id) REFERENCES import_jobs(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+"""
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Create the import job timings table."""
+
+    cursor = connection.cursor()
+    cursor.execute(CREATE_TIMINGS_SQL)
+    cursor.close()
@@ -0,0 +1,22 @@
+"""Store optional profiler output captured for individual import jobs."""
+from __future__ import annotations
+
+import sqlite3
+
+
+CREATE_PROFILES_SQL = """
+CREATE TABLE IF NOT EXISTS import_job_profiles (
+    job_id INTEGER PRIMARY KEY,
+    content BLOB NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY(job_id) REFERENCES import_jobs(id) ON DELETE CASCADE
+);
+"""
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Create the import job profiles table."""
+
+    cursor = connection.cursor()
+    cursor.execute(CREATE_PROFILES_SQL)
+    cursor.close()
@@ -0,0 +1,32 @@
+"""Add a per-row content hash used by delta imports."""
+from __future__ import annotations
+
+import sqlite3
+
+from repositories.coverage_region import content_hash
+
+
+ADD_COLUMN_SQL = "ALTER TABLE coverage_regions ADD COLUMN content_hash TEXT"
+
+_BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Add ``content_hash`` and fill it in for rows created before it existed."""
+
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(coverage_regions)")}
+    if "content_hash" not in columns:
+        connection.execute(ADD_COLUMN_SQL)
+
+    cursor = connection.execute(
+        "SELECT id, name, description FROM coverage_regions WHERE content_hash IS NULL"
+    )
+    while True:
+        rows = cursor.fetchmany(_BACKFILL_BATCH_SIZE)
+        if not rows:
+            break
+        connection.executemany(
+            "UPDATE coverage_regions SET content_hash = ? WHERE id = ?",
+            [(content_hash(row[1], row[2]), row[0]) for row in rows],
+        )
+    cursor.close()
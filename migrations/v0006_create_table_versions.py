@@ -0,0 +1,48 @@
+"""Track a change counter per table for cheap conditional reads."""
+from __future__ import annotations
+
+import sqlite3
+
+
+CREATE_VERSIONS_SQL = """
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+
+SEED_SQL = "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('coverage_regions', 0)"
+
+
+# Inserts bump the counter once per batch from ``bulk_insert``; updates and
+# deletes can come from anywhere, so triggers cover them.
+CREATE_UPDATE_TRIGGER_SQL = """
+CREATE TRIGGER IF NOT EXISTS trg_coverage_regions_version_update
+AFTER UPDATE ON coverage_regions
+FOR EACH ROW
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'coverage_regions';
+END;
+"""
+
+
+CREATE_DELETE_TRIGGER_SQL = """
+CREATE TRIGGER IF NOT EXISTS trg_coverage_regions_version_delete
+AFTER DELETE ON coverage_regions
+FOR EACH ROW
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'coverage_regions';
+END;
+"""
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Create the version table and the triggers maintaining it."""
+
+    cursor = connection.cursor()
+    cursor.execute(CREATE_VERSIONS_SQL)
+    cursor.execute(SEED_SQL)
+    cursor.execute(CREATE_UPDATE_TRIGGER_SQL)
+    cursor.execute(CREATE_DELETE_TRIGGER_SQL)
+    cursor.close()
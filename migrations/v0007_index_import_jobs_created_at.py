@@ -0,0 +1,18 @@
+"""Index the ordering used by history pages."""
+from __future__ import annotations
+
+import sqlite3
+
+
+CREATE_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_import_jobs_created_at
+ON import_jobs (created_at, id);
+"""
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Let ``ORDER BY created_at DESC, id DESC LIMIT`` walk an index instead of sorting."""
+
+    cursor = connection.cursor()
+    cursor.execute(CREATE_INDEX_SQL)
+    cursor.close()
@@ -0,0 +1,41 @@
+"""Record checkpoints so interrupted imports can resume."""
+from __future__ import annotations
+
+import sqlite3
+
+
+_JOB_COLUMNS = {
+    "mode": "TEXT NOT NULL DEFAULT 'insert'",
+    "remove_missing": "INTEGER NOT NULL DEFAULT 0",
+    "payload_digest": "TEXT",
+    # Number of normalised rows whose batch has been committed.
+    "checkpoint_row": "INTEGER NOT NULL DEFAULT 0",
+    "cancel_requested": "INTEGER NOT NULL DEFAULT 0",
+    "heartbeat_at": "TIMESTAMP",
+}
+
+
+# Errors of committed batches wait here until the job is finalised, so a
+# resumed job still reports the errors found before the interruption.
+CREATE_PENDING_ERRORS_SQL = """
+CREATE TABLE IF NOT EXISTS import_job_pending_errors (
+    job_id INTEGER NOT NULL,
+    batch_start INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (job_id, batch_start),
+    FOREIGN KEY(job_id) REFERENCES import_jobs(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+"""
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Add the checkpoint columns and the pending error table."""
+
+    existing = {row[1] for row in connection.execute("PRAGMA table_info(import_jobs)")}
+    for name, definition in _JOB_COLUMNS.items():
+        if name not in existing:
+            connection.execute(f"ALTER TABLE import_jobs ADD COLUMN {name} {definition}")
+
+    cursor = connection.cursor()
+    cursor.execute(CREATE_PENDING_ERRORS_SQL)
+    cursor.close()
@@ -0,0 +1,31 @@
+"""Mark import jobs whose details were moved to archive files."""
+from __future__ import annotations
+
+import sqlite3
+
+
+_JOB_COLUMNS = {
+    "archived_at": "TIMESTAMP",
+    "archive_file": "TEXT",
+}
+
+
+# Shrinks as jobs get archived, so finding the next candidates stays cheap.
+CREATE_UNARCHIVED_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_import_jobs_unarchived
+ON import_jobs (completed_at)
+WHERE archived_at IS NULL;
+"""
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Add the archival columns and the index over unarchived jobs."""
+
+    existing = {row[1] for row in connection.execute("PRAGMA table_info(import_jobs)")}
+    for name, definition in _JOB_COLUMNS.items():
+        if name not in existing:
+            connection.execute(f"ALTER TABLE import_jobs ADD COLUMN {name} {definition}")
+
+    cursor = connection.cursor()
+    cursor.execute(CREATE_UNARCHIVED_INDEX_SQL)
+    cursor.close()
@@ -0,0 +1,14 @@
+"""Record which import target each job writes to."""
+from __future__ import annotations
+
+import sqlite3
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Add ``import_jobs.target``; jobs from before targets existed are region imports."""
+
+    existing = {row[1] for row in connection.execute("PRAGMA table_info(import_jobs)")}
+    if "target" not in existing:
+        connection.execute(
+            "ALTER TABLE import_jobs ADD COLUMN target TEXT NOT NULL DEFAULT 'coverage_regions'"
+        )
@@ -0,0 +1,33 @@
+"""Store responses of requests sent with an ``Idempotency-Key``."""
+from __future__ import annotations
+
+import sqlite3
+
+
+# One row per scope (route and upload token) and key.  ``response`` stays
+# NULL while the first request is still running.
+CREATE_IDEMPOTENCY_KEYS_SQL = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    request_hash TEXT NOT NULL,
+    status_code INTEGER,
+    response TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (scope, key)
+) WITHOUT ROWID;
+"""
+
+CREATE_EXPIRY_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys (expires_at);
+"""
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Create the idempotency key table and its expiry index."""
+
+    cursor = connection.cursor()
+    cursor.execute(CREATE_IDEMPOTENCY_KEYS_SQL)
+    cursor.execute(CREATE_EXPIRY_INDEX_SQL)
+    cursor.close()
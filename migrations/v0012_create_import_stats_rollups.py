@@ -0,0 +1,97 @@
+"""Roll finished import jobs up by day and by source."""
+from __future__ import annotations
+
+import sqlite3
+
+from repositories.import_stats import ImportStatsRepository, JobContribution
+
+
+_JOB_COLUMNS = {
+    # Wall-clock milliseconds of all runs of the job.
+    "duration_ms": "REAL",
+    # The job's current contribution to the rollups, replaced when a resumed
+    # job is finalised again.
+    "rollup": "TEXT",
+}
+
+CREATE_DAILY_SQL = """
+CREATE TABLE IF NOT EXISTS import_stats_daily (
+    day TEXT PRIMARY KEY,
+    jobs INTEGER NOT NULL DEFAULT 0,
+    completed_jobs INTEGER NOT NULL DEFAULT 0,
+    failed_jobs INTEGER NOT NULL DEFAULT 0,
+    cancelled_jobs INTEGER NOT NULL DEFAULT 0,
+    total_rows INTEGER NOT NULL DEFAULT 0,
+    success_rows INTEGER NOT NULL DEFAULT 0,
+    failure_rows INTEGER NOT NULL DEFAULT 0,
+    duration_ms REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+CREATE_DURATIONS_SQL = """
+CREATE TABLE IF NOT EXISTS import_stats_daily_durations (
+    day TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    jobs INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, bucket)
+) WITHOUT ROWID;
+"""
+
+CREATE_SOURCES_SQL = """
+CREATE TABLE IF NOT EXISTS import_stats_source_daily (
+    day TEXT NOT NULL,
+    source TEXT NOT NULL,
+    jobs INTEGER NOT NULL DEFAULT 0,
+    failed_jobs INTEGER NOT NULL DEFAULT 0,
+    total_rows INTEGER NOT NULL DEFAULT 0,
+    success_rows INTEGER NOT NULL DEFAULT 0,
+    failure_rows INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, source)
+) WITHOUT ROWID;
+"""
+
+
+def _backfill(connection: sqlite3.Connection) -> None:
+    # Jobs finished before the rollups existed; their duration is only known
+    # to the second from their timestamps.
+    rows = connection.execute(
+        """
+        SELECT id, date(created_at) AS day, COALESCE(source, '') AS source, status,
+               total_rows, success_count, failure_count,
+               ROUND(MAX((julianday(completed_at) - julianday(created_at)) * 86400000.0, 0)) AS duration_ms
+        FROM import_jobs
+        WHERE completed_at IS NOT NULL AND status != 'running' AND rollup IS NULL
+        """
+    ).fetchall()
+    repository = ImportStatsRepository(connection)
+    for row in rows:
+        contribution = JobContribution(
+            day=row[1],
+            source=row[2],
+            status=row[3],
+            total_rows=row[4],
+            success_count=row[5],
+            failure_count=row[6],
+            duration_ms=row[7],
+        )
+        repository.apply(contribution)
+        connection.execute(
+            "UPDATE import_jobs SET duration_ms = ?, rollup = ? WHERE id = ?",
+            (contribution.duration_ms, contribution.to_json(), row[0]),
+        )
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Add the rollup tables and fill them from the existing history."""
+
+    existing = {row[1] for row in connection.execute("PRAGMA table_info(import_jobs)")}
+    for name, definition in _JOB_COLUMNS.items():
+        if name not in existing:
+            connection.execute(f"ALTER TABLE import_jobs ADD COLUMN {name} {definition}")
+
+    cursor = connection.cursor()
+    cursor.execute(CREATE_DAILY_SQL)
+    cursor.execute(CREATE_DURATIONS_SQL)
+    cursor.execute(CREATE_SOURCES_SQL)
+    cursor.close()
+    _backfill(connection)
@@ -0,0 +1,49 @@
+"""Key pending import errors by a sequence instead of their batch start."""
+from __future__ import annotations
+
+import sqlite3
+
+
+# A file import flushes errors of rejected rows before the next accepted
+# row arrives, so several entries may share a ``batch_start``; ``id`` keeps
+# them apart and in order.  ``error_count`` is every error of the entry,
+# ``stored_count`` those kept in ``content`` under the per-job cap.
+CREATE_PENDING_ERRORS_SQL = """
+CREATE TABLE import_job_pending_errors_new (
+    id INTEGER PRIMARY KEY,
+    job_id INTEGER NOT NULL,
+    batch_start INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    stored_count INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    FOREIGN KEY(job_id) REFERENCES import_jobs(id) ON DELETE CASCADE
+);
+"""
+
+COPY_PENDING_ERRORS_SQL = """
+INSERT INTO import_job_pending_errors_new (job_id, batch_start, error_count, stored_count, content)
+SELECT job_id, batch_start, json_array_length(content), json_array_length(content), content
+FROM import_job_pending_errors
+ORDER BY job_id, batch_start;
+"""
+
+CREATE_JOB_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_import_job_pending_errors_job
+ON import_job_pending_errors (job_id, batch_start, id);
+"""
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Rebuild ``import_job_pending_errors`` with a sequence key."""
+
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(import_job_pending_errors)")}
+    if "id" in columns:
+        return
+
+    cursor = connection.cursor()
+    cursor.execute(CREATE_PENDING_ERRORS_SQL)
+    cursor.execute(COPY_PENDING_ERRORS_SQL)
+    cursor.execute("DROP TABLE import_job_pending_errors")
+    cursor.execute("ALTER TABLE import_job_pending_errors_new RENAME TO import_job_pending_errors")
+    cursor.execute(CREATE_JOB_INDEX_SQL)
+    cursor.close()
@@ -0,0 +1,34 @@
+"""Give every stored import error a ``field`` key."""
+from __future__ import annotations
+
+import sqlite3
+
+
+# Errors were stored without ``field`` when it was empty; history responses
+# splice the stored JSON verbatim, so older rows are brought in line.
+_MISSING_FIELD = "EXISTS (SELECT 1 FROM json_each({column}) WHERE json_type(value, '$.field') IS NULL)"
+_WITH_FIELD = (
+    "(SELECT json_group_array(json_set(value, '$.field', json_extract(value, '$.field'))) "
+    "FROM json_each({column}))"
+)
+
+BACKFILL_JOB_ERRORS_SQL = f"""
+UPDATE import_jobs
+SET errors = {_WITH_FIELD.format(column="import_jobs.errors")}
+WHERE errors IS NOT NULL AND {_MISSING_FIELD.format(column="import_jobs.errors")}
+"""
+
+BACKFILL_PENDING_ERRORS_SQL = f"""
+UPDATE import_job_pending_errors
+SET content = {_WITH_FIELD.format(column="import_job_pending_errors.content")}
+WHERE {_MISSING_FIELD.format(column="import_job_pending_errors.content")}
+"""
+
+
+def upgrade(connection: sqlite3.Connection) -> None:
+    """Add ``"field": null`` to stored errors that lack it."""
+
+    cursor = connection.cursor()
+    cursor.execute(BACKFILL_JOB_ERRORS_SQL)
+    cursor.execute(BACKFILL_PENDING_ERRORS_SQL)
+    cursor.close()
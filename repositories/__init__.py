@@ -1,11 +1,23 @@
 """Repository layer for persisting imported records."""
 
-from .coverage_region import CoverageRegionCreate, CoverageRegionRepository
-from .import_log import ImportLogRepository
+from .coverage_region import CoverageRegionCreate, CoverageRegionRepository, CoverageRegionRow, content_hash
+from .idempotency import IdempotencyRecord, IdempotencyRepository
+from .import_log import ImportJobCheckpoint, ImportLogRepository
+from .import_stats import ImportStatsRepository, JobContribution
+from .import_target import ImportTargetRepository, TableSpec, statements_for
 
 __all__ = [
     "CoverageRegionCreate",
     "CoverageRegionRepository",
+    "CoverageRegionRow",
+    "IdempotencyRecord",
+    "IdempotencyRepository",
+    "ImportJobCheckpoint",
     "ImportLogRepository",
+    "ImportStatsRepository",
+    "ImportTargetRepository",
+    "JobContribution",
+    "TableSpec",
+    "content_hash",
+    "statements_for",
 ]
-
@@ -0,0 +1,109 @@
+"""Repository for responses stored under idempotency keys."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import sqlite3
+
+
+@dataclass(frozen=True, slots=True)
+class IdempotencyRecord:
+    """A request seen under a key; ``response`` is ``None`` while it runs."""
+
+    request_hash: str
+    status_code: int | None
+    response: str | None
+    created_at: str
+
+    @property
+    def completed(self) -> bool:
+        return self.response is not None
+
+
+class IdempotencyRepository:
+    """Claims, completes and expires idempotency keys.
+
+    Timestamps are ``YYYY-MM-DD HH:MM:SS`` UTC strings like SQLite's
+    ``CURRENT_TIMESTAMP``, so they compare as text.
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def claim(
+        self,
+        scope: str,
+        key: str,
+        request_hash: str,
+        *,
+        now: str,
+        expires_at: str,
+        stale_before: str,
+    ) -> IdempotencyRecord | None:
+        """Reserve *key* for a new request, or return the request already holding it.
+
+        Expired keys, and claims still running since before *stale_before*
+        (their process died), are taken over.
+        """
+
+        self._connection.execute(
+            """
+            DELETE FROM idempotency_keys
+            WHERE scope = ? AND key = ?
+              AND (expires_at <= ? OR (response IS NULL AND created_at <= ?))
+            """,
+            (scope, key, now, stale_before),
+        )
+        cursor = self._connection.execute(
+            """
+            INSERT OR IGNORE INTO idempotency_keys (scope, key, request_hash, created_at, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (scope, key, request_hash, now, expires_at),
+        )
+        if cursor.rowcount == 1:
+            return None
+        return self.fetch(scope, key)
+
+    def fetch(self, scope: str, key: str) -> IdempotencyRecord | None:
+        row = self._connection.execute(
+            """
+            SELECT request_hash, status_code, response, created_at
+            FROM idempotency_keys
+            WHERE scope = ? AND key = ?
+            """,
+            (scope, key),
+        ).fetchone()
+        if row is None:
+            return None
+        return IdempotencyRecord(
+            request_hash=row["request_hash"],
+            status_code=row["status_code"],
+            response=row["response"],
+            created_at=row["created_at"],
+        )
+
+    def complete(self, scope: str, key: str, *, status_code: int, response: str) -> None:
+        self._connection.execute(
+            "UPDATE idempotency_keys SET status_code = ?, response = ? WHERE scope = ? AND key = ?",
+            (status_code, response, scope, key),
+        )
+
+    def release(self, scope: str, key: str) -> None:
+        """Drop an unfinished claim so the next request with the key runs again."""
+
+        self._connection.execute(
+            "DELETE FROM idempotency_keys WHERE scope = ? AND key = ? AND response IS NULL",
+            (scope, key),
+        )
+
+    def purge_expired(self, now: str, *, limit: int) -> int:
+        cursor = self._connection.execute(
+            """
+            DELETE FROM idempotency_keys
+            WHERE (scope, key) IN (
+                SELECT scope, key FROM idempotency_keys WHERE expires_at <= ? ORDER BY expires_at LIMIT ?
+            )
+            """,
+            (now, limit),
+        )
+        return cursor.rowcount
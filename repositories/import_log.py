@@ -7,6 +7,8 @@ import json
 import sqlite3
 from typing import Any, Iterable
 
+from .import_stats import ImportStatsRepository, JobContribution
+
 
 def _parse_timestamp(value: str | None) -> datetime | None:
     if value is None:
@@ -38,6 +40,26 @@ class ImportJobRow:
     created_at: datetime
     completed_at: datetime | None
     events: tuple[ImportJobEventRow, ...]
+    timings: dict[str, float]
+
+
+@dataclass(frozen=True, slots=True)
+class ImportJobCheckpoint:
+    """Resumption state of an import job."""
+
+    id: int
+    source: str | None
+    total_rows: int
+    status: str
+    mode: str
+    remove_missing: bool
+    payload_digest: str | None
+    checkpoint_row: int
+    success_count: int
+    cancel_requested: bool
+    heartbeat_at: datetime | None
+    archived: bool = False
+    target: str = "coverage_regions"
 
 
 class ImportLogRepository:
@@ -46,13 +68,23 @@ class ImportLogRepository:
     def __init__(self, connection: sqlite3.Connection):
         self._connection = connection
 
-    def create_job(self, source: str | None, total_rows: int) -> int:
+    def create_job(
+        self,
+        source: str | None,
+        total_rows: int,
+        *,
+        mode: str = "insert",
+        remove_missing: bool = False,
+        payload_digest: str | None = None,
+        target: str = "coverage_regions",
+    ) -> int:
         cursor = self._connection.execute(
             """
-            INSERT INTO import_jobs (source, total_rows, status)
-            VALUES (?, ?, 'running')
+            INSERT INTO import_jobs
+                (source, total_rows, status, mode, remove_missing, payload_digest, target, heartbeat_at)
+            VALUES (?, ?, 'running', ?, ?, ?, ?, CURRENT_TIMESTAMP)
             """,
-            (source, total_rows),
+            (source, total_rows, mode, int(remove_missing), payload_digest, target),
         )
         job_id = int(cursor.lastrowid)
         cursor.close()
@@ -75,7 +107,14 @@ class ImportLogRepository:
         failure_count: int,
         errors: Iterable[dict[str, Any]],
         status: str,
+        total_rows: int | None = None,
+        duration_ms: float | None = None,
     ) -> None:
+        """Record the outcome of a job run and fold it into the statistics rollups.
+
+        *duration_ms* is the run's wall-clock time; runs of a resumed job add up.
+        """
+
         self._connection.execute(
             """
             UPDATE import_jobs
@@ -83,6 +122,8 @@ class ImportLogRepository:
                 failure_count = ?,
                 errors = ?,
                 status = ?,
+                total_rows = COALESCE(?, total_rows),
+                duration_ms = COALESCE(duration_ms, 0) + COALESCE(?, 0),
                 completed_at = CURRENT_TIMESTAMP
             WHERE id = ?
             """,
@@ -91,11 +132,387 @@ class ImportLogRepository:
                 failure_count,
                 json.dumps(list(errors), ensure_ascii=False),
                 status,
+                total_rows,
+                duration_ms,
                 job_id,
             ),
         )
+        self._roll_up(job_id)
+
+    def _roll_up(self, job_id: int) -> None:
+        row = self._connection.execute(
+            """
+            SELECT date(created_at) AS day, COALESCE(source, '') AS source, status, total_rows,
+                   success_count, failure_count, duration_ms, rollup
+            FROM import_jobs
+            WHERE id = ?
+            """,
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return
+        contribution = JobContribution(
+            day=row["day"],
+            source=row["source"],
+            status=row["status"],
+            total_rows=row["total_rows"],
+            success_count=row["success_count"],
+            failure_count=row["failure_count"],
+            duration_ms=row["duration_ms"] or 0.0,
+        )
+        stats = ImportStatsRepository(self._connection)
+        if row["rollup"]:
+            # Finalised before, then resumed: replace the earlier outcome.
+            stats.apply(JobContribution.from_json(row["rollup"]), sign=-1)
+        stats.apply(contribution)
+        self._connection.execute(
+            "UPDATE import_jobs SET rollup = ? WHERE id = ?",
+            (contribution.to_json(), job_id),
+        )
+
+    def save_checkpoint(
+        self,
+        job_id: int,
+        *,
+        checkpoint_row: int,
+        inserted: int,
+        errors: list[dict[str, Any]],
+        batch_start: int,
+        max_errors: int | None = None,
+    ) -> None:
+        """Record a committed batch: its position, inserted rows and errors."""
+
+        self._connection.execute(
+            """
+            UPDATE import_jobs
+            SET checkpoint_row = ?,
+                success_count = success_count + ?,
+                failure_count = failure_count + ?,
+                heartbeat_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (checkpoint_row, inserted, len(errors), job_id),
+        )
+        self.save_pending_errors(job_id, batch_start, errors, max_errors=max_errors)
+
+    def save_pending_errors(
+        self,
+        job_id: int,
+        batch_start: int,
+        errors: list[dict[str, Any]],
+        *,
+        max_errors: int | None = None,
+    ) -> None:
+        """Keep *errors* until the job is finalised.
+
+        Beyond *max_errors* stored for the job, errors are only counted.
+        Errors found before the first batch (``batch_start`` 0) are saved
+        once, however often the job is resumed.
+        """
+
+        if not errors:
+            return
+        if batch_start == 0 and self._connection.execute(
+            "SELECT 1 FROM import_job_pending_errors WHERE job_id = ? AND batch_start = 0",
+            (job_id,),
+        ).fetchone():
+            return
+        kept = errors
+        if max_errors is not None:
+            stored = self._connection.execute(
+                "SELECT COALESCE(SUM(stored_count), 0) FROM import_job_pending_errors WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()[0]
+            kept = errors[: max(max_errors - stored, 0)]
+        self._connection.execute(
+            """
+            INSERT INTO import_job_pending_errors (job_id, batch_start, error_count, stored_count, content)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (job_id, batch_start, len(errors), len(kept), json.dumps(kept, ensure_ascii=False)),
+        )
+
+    def fetch_pending_errors(self, job_id: int) -> list[dict[str, Any]]:
+        """Return the errors recorded by committed batches, in row order."""
+
+        cursor = self._connection.execute(
+            "SELECT content FROM import_job_pending_errors WHERE job_id = ? ORDER BY batch_start, id",
+            (job_id,),
+        )
+        errors: list[dict[str, Any]] = []
+        for row in cursor.fetchall():
+            errors.extend(json.loads(row["content"]))
+        cursor.close()
+        return errors
+
+    def count_pending_errors(self, job_id: int) -> int:
+        """Return how many errors committed batches found, stored or not."""
+
+        return self._connection.execute(
+            "SELECT COALESCE(SUM(error_count), 0) FROM import_job_pending_errors WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()[0]
+
+    def discard_pending_errors_after(self, job_id: int, checkpoint_row: int) -> None:
+        """Drop errors saved past *checkpoint_row*; a resumed run finds them again."""
+
+        discarded = self._connection.execute(
+            """
+            SELECT COALESCE(SUM(error_count), 0) FROM import_job_pending_errors
+            WHERE job_id = ? AND batch_start > ?
+            """,
+            (job_id, checkpoint_row),
+        ).fetchone()[0]
+        if not discarded:
+            return
+        self._connection.execute(
+            "DELETE FROM import_job_pending_errors WHERE job_id = ? AND batch_start > ?",
+            (job_id, checkpoint_row),
+        )
+        self._connection.execute(
+            "UPDATE import_jobs SET failure_count = failure_count - ? WHERE id = ?",
+            (discarded, job_id),
+        )
+
+    def clear_pending_errors(self, job_id: int) -> None:
+        self._connection.execute("DELETE FROM import_job_pending_errors WHERE job_id = ?", (job_id,))
+
+    def fetch_checkpoint(self, job_id: int) -> ImportJobCheckpoint | None:
+        cursor = self._connection.execute(
+            """
+            SELECT id, source, total_rows, status, mode, remove_missing, payload_digest,
+                   checkpoint_row, success_count, cancel_requested, heartbeat_at, archived_at,
+                   target
+            FROM import_jobs
+            WHERE id = ?
+            """,
+            (job_id,),
+        )
+        row = cursor.fetchone()
+        cursor.close()
+        if row is None:
+            return None
+        return ImportJobCheckpoint(
+            id=row["id"],
+            source=row["source"],
+            total_rows=row["total_rows"],
+            status=row["status"],
+            mode=row["mode"],
+            remove_missing=bool(row["remove_missing"]),
+            payload_digest=row["payload_digest"],
+            checkpoint_row=row["checkpoint_row"],
+            success_count=row["success_count"],
+            cancel_requested=bool(row["cancel_requested"]),
+            heartbeat_at=_parse_timestamp(row["heartbeat_at"]),
+            archived=row["archived_at"] is not None,
+            target=row["target"],
+        )
+
+    def is_cancel_requested(self, job_id: int) -> bool:
+        cursor = self._connection.execute("SELECT cancel_requested FROM import_jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        cursor.close()
+        return bool(row and row[0])
+
+    def request_cancel(self, job_id: int) -> bool:
+        """Flag a running job for cancellation; return whether it was running."""
+
+        cursor = self._connection.execute(
+            "UPDATE import_jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+            (job_id,),
+        )
+        return cursor.rowcount > 0
+
+    def reopen_job(self, job_id: int, *, expected: ImportJobCheckpoint) -> bool:
+        """Put a stopped job back into ``running`` unless it changed since *expected*."""
+
+        heartbeat = expected.heartbeat_at.isoformat(sep=" ") if expected.heartbeat_at else None
+        cursor = self._connection.execute(
+            """
+            UPDATE import_jobs
+            SET status = 'running',
+                cancel_requested = 0,
+                completed_at = NULL,
+                heartbeat_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = ? AND heartbeat_at IS ?
+            """,
+            (job_id, expected.status, heartbeat),
+        )
+        return cursor.rowcount > 0
+
+    def fetch_archivable_jobs(self, completed_before: str, *, limit: int) -> list[dict[str, Any]]:
+        """Return finished, unarchived jobs completed before *completed_before*.
+
+        Each job is a plain dictionary with its summary columns, decoded
+        errors (including those still pending) and events, ordered by id.
+        """
+
+        cursor = self._connection.execute(
+            """
+            SELECT id, source, total_rows, success_count, failure_count, status, errors,
+                   created_at, completed_at
+            FROM import_jobs
+            WHERE archived_at IS NULL AND completed_at < ? AND status != 'running'
+            ORDER BY completed_at
+            LIMIT ?
+            """,
+            (completed_before, limit),
+        )
+        rows = sorted(cursor.fetchall(), key=lambda row: row["id"])
+        cursor.close()
+
+        events = self._fetch_events([row["id"] for row in rows])
+        jobs: list[dict[str, Any]] = []
+        for row in rows:
+            jobs.append(
+                {
+                    "id": row["id"],
+                    "source": row["source"],
+                    "totalRows": row["total_rows"],
+                    "successCount": row["success_count"],
+                    "failureCount": row["failure_count"],
+                    "status": row["status"],
+                    "createdAt": row["created_at"],
+                    "completedAt": row["completed_at"],
+                    "errors": json.loads(row["errors"] or "[]") + self.fetch_pending_errors(row["id"]),
+                    "events": [
+                        {"level": event["level"], "message": event["message"], "createdAt": event["created_at"]}
+                        for event in events[row["id"]]
+                    ],
+                }
+            )
+        return jobs
+
+    def collapse_archived_jobs(self, completed: dict[int, str], archive_file: str) -> int:
+        """Strip events and errors of the jobs now stored in *archive_file*.
+
+        *completed* maps each archived job to the ``completed_at`` it was
+        read with.  Jobs that finished again (after a resume) or were
+        archived since then are left alone.  Returns the number of jobs
+        collapsed.
+        """
+
+        if not completed:
+            return 0
+        rows = ",".join("(?, ?)" for _ in completed)
+        cursor = self._connection.execute(
+            f"""
+            SELECT id FROM import_jobs
+            WHERE (id, completed_at) IN (VALUES {rows}) AND archived_at IS NULL AND status != 'running'
+            """,
+            [value for item in completed.items() for value in item],
+        )
+        eligible = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        if not eligible:
+            return 0
+
+        placeholders = ",".join("?" for _ in eligible)
+        self._connection.execute(
+            f"""
+            UPDATE import_jobs
+            SET errors = '[]', archived_at = CURRENT_TIMESTAMP, archive_file = ?
+            WHERE id IN ({placeholders})
+            """,
+            [archive_file, *eligible],
+        )
+        self._connection.execute(f"DELETE FROM import_job_events WHERE job_id IN ({placeholders})", eligible)
+        self._connection.execute(f"DELETE FROM import_job_pending_errors WHERE job_id IN ({placeholders})", eligible)
+        return len(eligible)
+
+    def record_timings(self, job_id: int, timings: dict[str, float]) -> None:
+        """Persist per-stage durations (milliseconds) for *job_id*."""
+
+        self._connection.executemany(
+            """
+            INSERT OR REPLACE INTO import_job_timings (job_id, stage, duration_ms)
+            VALUES (?, ?, ?)
+            """,
+            [(job_id, stage, duration_ms) for stage, duration_ms in timings.items()],
+        )
+
+    def save_profile(self, job_id: int, content: bytes) -> None:
+        self._connection.execute(
+            """
+            INSERT OR REPLACE INTO import_job_profiles (job_id, content)
+            VALUES (?, ?)
+            """,
+            (job_id, content),
+        )
+
+    def fetch_profile(self, job_id: int) -> bytes | None:
+        cursor = self._connection.execute(
+            "SELECT content FROM import_job_profiles WHERE job_id = ?",
+            (job_id,),
+        )
+        row = cursor.fetchone()
+        cursor.close()
+        return bytes(row["content"]) if row else None
+
+    def _fetch_timings(self, job_ids: list[int]) -> dict[int, dict[str, float]]:
+        timings: dict[int, dict[str, float]] = {job_id: {} for job_id in job_ids}
+        if not job_ids:
+            return timings
+
+        placeholders = ",".join("?" for _ in job_ids)
+        cursor = self._connection.execute(
+            f"""
+            SELECT job_id, stage, duration_ms
+            FROM import_job_timings
+            WHERE job_id IN ({placeholders})
+            """,
+            job_ids,
+        )
+        for row in cursor.fetchall():
+            timings[row["job_id"]][row["stage"]] = row["duration_ms"]
+        cursor.close()
+        return timings
+
+    def fetch_job_counters(self, job_id: int) -> sqlite3.Row | None:
+        """Return the status and row counters of *job_id* without its payloads."""
+
+        cursor = self._connection.execute(
+            """
+            SELECT status, total_rows, success_count, failure_count, completed_at
+            FROM import_jobs
+            WHERE id = ?
+            """,
+            (job_id,),
+        )
+        row = cursor.fetchone()
+        cursor.close()
+        return row
+
+    def _fetch_events(self, job_ids: list[int]) -> dict[int, list[sqlite3.Row]]:
+        events: dict[int, list[sqlite3.Row]] = {job_id: [] for job_id in job_ids}
+        if not job_ids:
+            return events
+
+        placeholders = ",".join("?" for _ in job_ids)
+        cursor = self._connection.execute(
+            f"""
+            SELECT job_id, level, message, created_at
+            FROM import_job_events
+            WHERE job_id IN ({placeholders})
+            ORDER BY job_id, created_at ASC, id ASC
+            """,
+            job_ids,
+        )
+        for row in cursor.fetchall():
+            events[row["job_id"]].append(row)
+        cursor.close()
+        return events
+
+    def fetch_job_rows(
+        self, *, limit: int, offset: int
+    ) -> tuple[list[sqlite3.Row], dict[int, list[sqlite3.Row]], dict[int, dict[str, float]], int]:
+        """Return one page of raw job rows with their events and timings.
+
+        The job rows still carry ``errors`` as the stored JSON text, which
+        lets callers that only re-serialise it skip decoding altogether.
+        Returns ``(jobs, events_by_job, timings_by_job, total)``.
+        """
 
-    def fetch_jobs(self, *, limit: int, offset: int) -> tuple[list[ImportJobRow], int]:
         total_cursor = self._connection.execute("SELECT COUNT(*) FROM import_jobs")
         total_row = total_cursor.fetchone()
         total_cursor.close()
@@ -105,32 +522,22 @@ class ImportLogRepository:
             """
             SELECT id, source, total_rows, success_count, failure_count, status, errors, created_at, completed_at
             FROM import_jobs
-            ORDER BY created_at DESC
+            ORDER BY created_at DESC, id DESC
             LIMIT ? OFFSET ?
             """,
             (limit, offset),
         )
+        job_rows = cursor.fetchall()
+        cursor.close()
+
+        job_ids = [row["id"] for row in job_rows]
+        return job_rows, self._fetch_events(job_ids), self._fetch_timings(job_ids), total
+
+    def fetch_jobs(self, *, limit: int, offset: int) -> tuple[list[ImportJobRow], int]:
+        job_rows, events, timings, total = self.fetch_job_rows(limit=limit, offset=offset)
 
         jobs: list[ImportJobRow] = []
-        for row in cursor.fetchall():
-            events_cursor = self._connection.execute(
-                """
-                SELECT level, message, created_at
-                FROM import_job_events
-                WHERE job_id = ?
-                ORDER BY created_at ASC
-                """,
-                (row["id"],),
-            )
-            events = tuple(
-                ImportJobEventRow(
-                    level=event_row["level"],
-                    message=event_row["message"],
-                    created_at=_parse_timestamp(event_row["created_at"]),
-                )
-                for event_row in events_cursor.fetchall()
-            )
-            events_cursor.close()
+        for row in job_rows:
             jobs.append(
                 ImportJobRow(
                     id=row["id"],
@@ -142,9 +549,15 @@ class ImportLogRepository:
                     errors=json.loads(row["errors"] or "[]"),
                     created_at=_parse_timestamp(row["created_at"]),
                     completed_at=_parse_timestamp(row["completed_at"]),
-                    events=events,
+                    events=tuple(
+                        ImportJobEventRow(
+                            level=event_row["level"],
+                            message=event_row["message"],
+                            created_at=_parse_timestamp(event_row["created_at"]),
+                        )
+                        for event_row in events[row["id"]]
+                    ),
+                    timings=timings[row["id"]],
                 )
             )
-
-        cursor.close()
         return jobs, total
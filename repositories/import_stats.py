@@ -0,0 +1,182 @@
+"""Rollups of finished import jobs by day and by source."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+import json
+import math
+import sqlite3
+from typing import Any
+
+# Durations are counted in quarter-octave buckets: bucket ``b`` holds jobs
+# that took up to ``2 ** (b / 4)`` milliseconds, so a percentile read from
+# the buckets is at most 19% above the true value.
+DURATION_BUCKETS_PER_OCTAVE = 4
+MAX_DURATION_BUCKET = 25 * DURATION_BUCKETS_PER_OCTAVE  # About nine hours.
+
+
+def duration_bucket(duration_ms: float) -> int:
+    if duration_ms <= 1:
+        return 0
+    bucket = math.ceil(math.log2(duration_ms) * DURATION_BUCKETS_PER_OCTAVE)
+    return min(bucket, MAX_DURATION_BUCKET)
+
+
+def bucket_upper_ms(bucket: int) -> float:
+    return 2 ** (bucket / DURATION_BUCKETS_PER_OCTAVE)
+
+
+@dataclass(frozen=True, slots=True)
+class JobContribution:
+    """What one finished job adds to the rollups."""
+
+    day: str
+    source: str
+    status: str
+    total_rows: int
+    success_count: int
+    failure_count: int
+    duration_ms: float
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @staticmethod
+    def from_json(payload: str) -> "JobContribution":
+        return JobContribution(**json.loads(payload))
+
+
+class ImportStatsRepository:
+    """Maintains and reads the ``import_stats_*`` rollup tables.
+
+    Days are ``YYYY-MM-DD`` strings of the job's creation date, so reads
+    only touch the rows of the requested range, however long the history.
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def apply(self, contribution: JobContribution, *, sign: int = 1) -> None:
+        """Add *contribution* to the rollups, or remove it with ``sign=-1``."""
+
+        item = contribution
+        completed = int(item.status == "completed")
+        failed = int(item.status == "failed")
+        cancelled = int(item.status == "cancelled")
+        self._connection.execute(
+            """
+            INSERT INTO import_stats_daily (
+                day, jobs, completed_jobs, failed_jobs, cancelled_jobs,
+                total_rows, success_rows, failure_rows, duration_ms
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(day) DO UPDATE SET
+                jobs = jobs + excluded.jobs,
+                completed_jobs = completed_jobs + excluded.completed_jobs,
+                failed_jobs = failed_jobs + excluded.failed_jobs,
+                cancelled_jobs = cancelled_jobs + excluded.cancelled_jobs,
+                total_rows = total_rows + excluded.total_rows,
+                success_rows = success_rows + excluded.success_rows,
+                failure_rows = failure_rows + excluded.failure_rows,
+                duration_ms = duration_ms + excluded.duration_ms
+            """,
+            (
+                item.day,
+                sign,
+                sign * completed,
+                sign * failed,
+                sign * cancelled,
+                sign * item.total_rows,
+                sign * item.success_count,
+                sign * item.failure_count,
+                sign * item.duration_ms,
+            ),
+        )
+        self._connection.execute(
+            """
+            INSERT INTO import_stats_source_daily (
+                day, source, jobs, failed_jobs, total_rows, success_rows, failure_rows
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(day, source) DO UPDATE SET
+                jobs = jobs + excluded.jobs,
+                failed_jobs = failed_jobs + excluded.failed_jobs,
+                total_rows = total_rows + excluded.total_rows,
+                success_rows = success_rows + excluded.success_rows,
+                failure_rows = failure_rows + excluded.failure_rows
+            """,
+            (
+                item.day,
+                item.source,
+                sign,
+                sign * failed,
+                sign * item.total_rows,
+                sign * item.success_count,
+                sign * item.failure_count,
+            ),
+        )
+        self._connection.execute(
+            """
+            INSERT INTO import_stats_daily_durations (day, bucket, jobs)
+            VALUES (?, ?, ?)
+            ON CONFLICT(day, bucket) DO UPDATE SET jobs = jobs + excluded.jobs
+            """,
+            (item.day, duration_bucket(item.duration_ms), sign),
+        )
+
+    def fetch_daily(self, first_day: str, last_day: str) -> list[dict[str, Any]]:
+        cursor = self._connection.execute(
+            """
+            SELECT day, jobs, completed_jobs, failed_jobs, cancelled_jobs,
+                   total_rows, success_rows, failure_rows, duration_ms
+            FROM import_stats_daily
+            WHERE day BETWEEN ? AND ? AND jobs > 0
+            ORDER BY day
+            """,
+            (first_day, last_day),
+        )
+        rows = [dict(row) for row in cursor.fetchall()]
+        cursor.close()
+        return rows
+
+    def fetch_duration_buckets(self, first_day: str, last_day: str) -> dict[str, dict[int, int]]:
+        """Return job counts per duration bucket, by day."""
+
+        cursor = self._connection.execute(
+            """
+            SELECT day, bucket, jobs
+            FROM import_stats_daily_durations
+            WHERE day BETWEEN ? AND ? AND jobs > 0
+            """,
+            (first_day, last_day),
+        )
+        buckets: dict[str, dict[int, int]] = {}
+        for row in cursor.fetchall():
+            buckets.setdefault(row["day"], {})[row["bucket"]] = row["jobs"]
+        cursor.close()
+        return buckets
+
+    def fetch_sources(self, first_day: str, last_day: str, *, limit: int) -> list[dict[str, Any]]:
+        """Return per-source totals of the range, highest failure rate first."""
+
+        cursor = self._connection.execute(
+            """
+            SELECT source,
+                   SUM(jobs) AS jobs,
+                   SUM(failed_jobs) AS failed_jobs,
+                   SUM(total_rows) AS total_rows,
+                   SUM(success_rows) AS success_rows,
+                   SUM(failure_rows) AS failure_rows
+            FROM import_stats_source_daily
+            WHERE day BETWEEN ? AND ?
+            GROUP BY source
+            HAVING SUM(jobs) > 0
+            ORDER BY CAST(SUM(failure_rows) AS REAL) / MAX(SUM(total_rows), 1) DESC,
+                     SUM(jobs) DESC,
+                     source
+            LIMIT ?
+            """,
+            (first_day, last_day, limit),
+        )
+        rows = [dict(row) for row in cursor.fetchall()]
+        cursor.close()
+        return rows
@@ -0,0 +1,128 @@
+"""Generic bulk writes into any table an import can target."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import re
+import sqlite3
+from typing import Any, Sequence
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Keys looked up per statement.  Every lookup binds exactly this many keys
+# (the last chunk is padded), so one prepared statement serves all of them
+# and even three-column keys stay below the historical 999-variable limit.
+_LOOKUP_CHUNK = 256
+
+Key = tuple[Any, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class TableSpec:
+    """Table, identifying key columns and written columns of an import target."""
+
+    table: str
+    key_columns: tuple[str, ...]
+    columns: tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        # Names are interpolated into SQL, so only plain identifiers are allowed.
+        for name in (self.table, *self.key_columns, *self.columns):
+            if not _IDENTIFIER.match(name):
+                raise ValueError(f"Invalid SQL identifier {name!r}")
+        if not self.key_columns:
+            raise ValueError(f"Table {self.table!r} needs at least one key column")
+        missing = [name for name in self.key_columns if name not in self.columns]
+        if missing:
+            raise ValueError(f"Key columns {missing} of {self.table!r} are not written columns")
+
+
+@dataclass(frozen=True, slots=True)
+class TableStatements:
+    """SQL generated once per :class:`TableSpec`."""
+
+    lookup: str
+    insert: str
+    upsert: str
+    key_positions: tuple[int, ...]
+
+
+@lru_cache(maxsize=None)
+def statements_for(spec: TableSpec) -> TableStatements:
+    """Return the cached statements for *spec*.
+
+    The strings are identical on every call, so ``sqlite3``'s per-connection
+    statement cache prepares each of them only once.
+    """
+
+    keys = ", ".join(spec.key_columns)
+    if len(spec.key_columns) == 1:
+        lookup = f"SELECT {keys} FROM {spec.table} WHERE {keys} IN ({', '.join('?' * _LOOKUP_CHUNK)})"
+    else:
+        row = f"({', '.join('?' * len(spec.key_columns))})"
+        lookup = f"SELECT {keys} FROM {spec.table} WHERE ({keys}) IN (VALUES {', '.join([row] * _LOOKUP_CHUNK)})"
+
+    columns = ", ".join(spec.columns)
+    placeholders = ", ".join("?" * len(spec.columns))
+    updates = ", ".join(f"{name} = excluded.{name}" for name in spec.columns if name not in spec.key_columns)
+    conflict = "DO NOTHING" if not updates else f"DO UPDATE SET {updates}"
+    return TableStatements(
+        lookup=lookup,
+        insert=f"INSERT OR IGNORE INTO {spec.table} ({columns}) VALUES ({placeholders})",
+        upsert=f"INSERT INTO {spec.table} ({columns}) VALUES ({placeholders}) ON CONFLICT({keys}) {conflict}",
+        key_positions=tuple(spec.columns.index(name) for name in spec.key_columns),
+    )
+
+
+class ImportTargetRepository:
+    """Bulk lookups and writes of value tuples ordered as ``spec.columns``."""
+
+    def __init__(self, connection: sqlite3.Connection, spec: TableSpec):
+        self._connection = connection
+        self._spec = spec
+        self._statements = statements_for(spec)
+
+    def key_of(self, values: Sequence[Any]) -> Key:
+        return tuple(values[position] for position in self._statements.key_positions)
+
+    def fetch_existing_keys(self, keys: Sequence[Key]) -> set[Key]:
+        """Return the subset of *keys* already persisted."""
+
+        if not keys:
+            return set()
+
+        existing: set[Key] = set()
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = list(keys[start : start + _LOOKUP_CHUNK])
+            chunk.extend([chunk[0]] * (_LOOKUP_CHUNK - len(chunk)))
+            parameters = [value for key in chunk for value in key]
+            cursor = self._connection.execute(self._statements.lookup, parameters)
+            existing.update(tuple(row) for row in cursor.fetchall())
+            cursor.close()
+        return existing
+
+    def _write(self, statement: str, rows: Sequence[Sequence[Any]]) -> int:
+        if not rows:
+            return 0
+
+        # ``rowcount`` sums each row's own changes; ``total_changes`` would
+        # also count the rows touched by ``updated_at`` and version triggers.
+        cursor = self._connection.executemany(statement, rows)
+        written = cursor.rowcount
+        cursor.close()
+        if written:
+            # No-op for tables that do not publish a change counter.
+            self._connection.execute(
+                "UPDATE table_versions SET version = version + 1 WHERE name = ?",
+                (self._spec.table,),
+            )
+        return written
+
+    def bulk_insert(self, rows: Sequence[Sequence[Any]]) -> int:
+        """Insert *rows*, skipping existing keys, and return the inserted count."""
+
+        return self._write(self._statements.insert, rows)
+
+    def bulk_upsert(self, rows: Sequence[Sequence[Any]]) -> int:
+        """Insert *rows* or overwrite the stored row with the same key."""
+
+        return self._write(self._statements.upsert, rows)
@@ -1,22 +1,70 @@
 """Service layer entry points."""
 
+from .dry_run import dry_run_import
+from .file_import import import_file, resume_file
 from .import_service import (
+    ImportDelta,
     ImportErrorDetail,
     ImportHistory,
     ImportJobEvent,
+    ImportJobNotFoundError,
     ImportJobRecord,
+    ImportJobStateError,
     ImportSummary,
+    cancel_import,
     import_coverage_regions,
+    import_rows,
     list_import_jobs,
+    resume_import,
+    resume_rows,
 )
+from .import_stats import DailyImportStats, ImportStats, SourceImportStats, fetch_import_stats
+from .import_targets import (
+    ImportTarget,
+    UnknownImportTargetError,
+    get_import_target,
+    import_target_names,
+    register_import_target,
+)
+from .preview import ColumnProfile, SheetPreview, preview_sheet, preview_stream
+from .regions import Region, RegionPage, list_regions
+from .timing import StageTimings, new_stage_timings
 
 __all__ = [
+    "ColumnProfile",
+    "DailyImportStats",
+    "ImportDelta",
     "ImportErrorDetail",
     "ImportHistory",
     "ImportJobEvent",
+    "ImportJobNotFoundError",
     "ImportJobRecord",
+    "ImportJobStateError",
+    "ImportStats",
     "ImportSummary",
+    "ImportTarget",
+    "Region",
+    "RegionPage",
+    "SheetPreview",
+    "SourceImportStats",
+    "StageTimings",
+    "UnknownImportTargetError",
+    "cancel_import",
+    "dry_run_import",
+    "fetch_import_stats",
+    "get_import_target",
     "import_coverage_regions",
+    "import_file",
+    "import_rows",
+    "import_target_names",
     "list_import_jobs",
+    "list_regions",
+    "new_stage_timings",
+    "preview_sheet",
+    "preview_stream",
+    "register_import_target",
+    "resume_file",
+    "resume_import",
+    "resume_rows",
 ]
 
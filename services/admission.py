@@ -0,0 +1,330 @@
+"""Admission control and fair scheduling of imports per upload token.
+
+Every import is admitted through :data:`IMPORT_ADMISSION` before it runs.
+At most ``max_running`` imports run at once, and at most
+``max_running_per_token`` of them share an ``X-Upload-Token``.  Imports that
+cannot start yet wait in a per-token queue.  A free slot goes to the next
+token in weighted round-robin order, so a token with weight 3 starts up to
+three imports for every one of a token with weight 1, however many imports
+either has queued.
+
+Imports up to ``interactive_max_bytes`` are interactive.  They are served
+before bulk imports, but never more than :data:`_INTERACTIVE_BURST` in a row
+while bulk imports wait.  A request that would grow its token's queue beyond
+``max_queued_per_token`` imports or ``max_queued_bytes_per_token`` bytes, or
+the whole queue beyond ``max_queued`` imports, is rejected at once with
+:class:`AdmissionRejectedError`.  The error carries a ``retry_after``
+estimated from recent import durations.
+
+Every queued import blocks a worker thread of the server's thread pool
+(40 threads by default), so ``max_queued`` must stay well below its size or
+waiting imports starve the running ones and every other sync endpoint.
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import math
+import os
+import threading
+import time
+from typing import Mapping
+
+from metrics import IMPORT_ADMISSION_REJECTED, IMPORT_ADMISSION_WAIT
+
+ANONYMOUS_TOKEN = ""
+# Interactive imports started in a row before a waiting bulk import goes next.
+_INTERACTIVE_BURST = 4
+# Smoothing of the average import duration behind ``Retry-After``.
+_DURATION_SMOOTHING = 0.2
+_MAX_RETRY_AFTER_SECONDS = 300
+
+
+@dataclass(frozen=True, slots=True)
+class AdmissionPolicy:
+    """Concurrency, queue limits and scheduling weights for imports."""
+
+    max_running: int = 4
+    max_running_per_token: int = 2
+    max_queued_per_token: int = 8
+    max_queued: int = 16
+    max_queued_bytes_per_token: int = 64 * 1024 * 1024
+    interactive_max_bytes: int = 256 * 1024
+    queue_timeout_seconds: float = 30.0
+    weights: Mapping[str, int] = field(default_factory=dict)
+
+    def weight_of(self, token: str) -> int:
+        return max(self.weights.get(token, 1), 1)
+
+
+def _parse_weights(value: str) -> dict[str, int]:
+    weights: dict[str, int] = {}
+    for item in value.split(","):
+        token, separator, weight = item.strip().rpartition("=")
+        if separator and token:
+            weights[token] = int(weight)
+    return weights
+
+
+def policy_from_env() -> AdmissionPolicy:
+    """Build the policy from ``IMPORT_ADMISSION_*`` environment variables.
+
+    ``IMPORT_ADMISSION_WEIGHTS`` lists ``token=weight`` pairs separated by
+    commas; unlisted tokens weigh 1.
+    """
+
+    return AdmissionPolicy(
+        max_running=int(os.getenv("IMPORT_ADMISSION_MAX_RUNNING", "4")),
+        max_running_per_token=int(os.getenv("IMPORT_ADMISSION_MAX_RUNNING_PER_TOKEN", "2")),
+        max_queued_per_token=int(os.getenv("IMPORT_ADMISSION_MAX_QUEUED_PER_TOKEN", "8")),
+        max_queued=int(os.getenv("IMPORT_ADMISSION_MAX_QUEUED", "16")),
+        max_queued_bytes_per_token=int(
+            os.getenv("IMPORT_ADMISSION_MAX_QUEUED_BYTES_PER_TOKEN", str(64 * 1024 * 1024))
+        ),
+        interactive_max_bytes=int(os.getenv("IMPORT_ADMISSION_INTERACTIVE_MAX_BYTES", str(256 * 1024))),
+        queue_timeout_seconds=float(os.getenv("IMPORT_ADMISSION_QUEUE_TIMEOUT_SECONDS", "30")),
+        weights=_parse_weights(os.getenv("IMPORT_ADMISSION_WEIGHTS", "")),
+    )
+
+
+class AdmissionRejectedError(RuntimeError):
+    """Raised when an import cannot be queued; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, *, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("token", "nbytes", "interactive", "granted")
+
+    def __init__(self, token: str, nbytes: int, interactive: bool):
+        self.token = token
+        self.nbytes = nbytes
+        self.interactive = interactive
+        self.granted = False
+
+
+class _Tenant:
+    __slots__ = ("running", "queued_bytes", "queues", "credits")
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.queued_bytes = 0
+        # Waiters by class; True holds the interactive ones.
+        self.queues: dict[bool, deque[_Waiter]] = {True: deque(), False: deque()}
+        self.credits: dict[bool, int] = {True: 0, False: 0}
+
+    @property
+    def queued(self) -> int:
+        return len(self.queues[True]) + len(self.queues[False])
+
+
+class Admission:
+    """A granted import slot; release it by leaving the ``with`` block."""
+
+    __slots__ = ("_controller", "token", "interactive", "_started", "_released")
+
+    def __init__(self, controller: "AdmissionController", token: str, interactive: bool):
+        self._controller = controller
+        self.token = token
+        self.interactive = interactive
+        self._started = time.monotonic()
+        self._released = False
+
+    def __enter__(self) -> "Admission":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self.token, time.monotonic() - self._started)
+
+
+class AdmissionController:
+    """Thread-safe gate in front of import jobs."""
+
+    def __init__(self, policy: AdmissionPolicy | None = None):
+        self._policy = policy or AdmissionPolicy()
+        self._condition = threading.Condition()
+        self._tenants: dict[str, _Tenant] = {}
+        # Tokens with waiters, by class, in round-robin order.
+        self._rings: dict[bool, deque[str]] = {True: deque(), False: deque()}
+        self._running = 0
+        self._queued = 0
+        self._interactive_streak = 0
+        self._average_seconds = 1.0
+
+    @property
+    def policy(self) -> AdmissionPolicy:
+        return self._policy
+
+    def configure(self, policy: AdmissionPolicy) -> None:
+        """Replace the policy; running and queued imports are kept."""
+
+        with self._condition:
+            self._policy = policy
+            self._dispatch()
+
+    def running(self, token: str | None = None) -> int:
+        with self._condition:
+            if token is None:
+                return self._running
+            tenant = self._tenants.get(token)
+            return tenant.running if tenant else 0
+
+    def queued(self, token: str | None = None) -> int:
+        with self._condition:
+            if token is None:
+                return self._queued
+            tenant = self._tenants.get(token)
+            return tenant.queued if tenant else 0
+
+    def admit(self, token: str | None, nbytes: int, *, timeout: float | None = None) -> Admission:
+        """Wait for a slot for an import of *nbytes* on behalf of *token*.
+
+        Raises :class:`AdmissionRejectedError` at once when the token's queue
+        is full, or once *timeout* (default ``queue_timeout_seconds``) passes
+        without a slot.
+        """
+
+        token = token or ANONYMOUS_TOKEN
+        policy = self._policy
+        interactive = nbytes <= policy.interactive_max_bytes
+        priority = "interactive" if interactive else "bulk"
+        started = time.monotonic()
+        with self._condition:
+            tenant = self._tenants.get(token)
+            if tenant is None:
+                tenant = self._tenants[token] = _Tenant()
+            if not self._has_waiters() and self._can_start(tenant):
+                self._start(tenant)
+                IMPORT_ADMISSION_WAIT.observe(0.0, priority=priority)
+                return Admission(self, token, interactive)
+
+            if tenant.queued >= policy.max_queued_per_token or (
+                tenant.queued and tenant.queued_bytes + nbytes > policy.max_queued_bytes_per_token
+            ):
+                IMPORT_ADMISSION_REJECTED.inc(priority=priority)
+                self._forget_if_idle(token, tenant)
+                raise AdmissionRejectedError(
+                    f"Too many imports queued for this upload token ({tenant.queued} waiting).",
+                    retry_after=self._retry_after(tenant),
+                )
+            if self._queued >= policy.max_queued:
+                IMPORT_ADMISSION_REJECTED.inc(priority=priority)
+                self._forget_if_idle(token, tenant)
+                raise AdmissionRejectedError(
+                    f"Too many imports queued ({self._queued} waiting).",
+                    retry_after=self._retry_after(tenant),
+                )
+
+            waiter = _Waiter(token, nbytes, interactive)
+            self._enqueue(tenant, waiter)
+            self._dispatch()
+            deadline = started + (policy.queue_timeout_seconds if timeout is None else timeout)
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    if waiter.granted:
+                        break
+                    self._dequeue(tenant, waiter)
+                    self._forget_if_idle(token, tenant)
+                    IMPORT_ADMISSION_REJECTED.inc(priority=priority)
+                    raise AdmissionRejectedError(
+                        "Timed out waiting for an import slot.",
+                        retry_after=self._retry_after(tenant),
+                    )
+        IMPORT_ADMISSION_WAIT.observe(time.monotonic() - started, priority=priority)
+        return Admission(self, token, interactive)
+
+    def _has_waiters(self) -> bool:
+        return bool(self._rings[True] or self._rings[False])
+
+    def _can_start(self, tenant: _Tenant) -> bool:
+        return self._running < self._policy.max_running and tenant.running < self._policy.max_running_per_token
+
+    def _start(self, tenant: _Tenant) -> None:
+        self._running += 1
+        tenant.running += 1
+
+    def _enqueue(self, tenant: _Tenant, waiter: _Waiter) -> None:
+        queue = tenant.queues[waiter.interactive]
+        if not queue:
+            self._rings[waiter.interactive].append(waiter.token)
+            tenant.credits[waiter.interactive] = self._policy.weight_of(waiter.token)
+        queue.append(waiter)
+        tenant.queued_bytes += waiter.nbytes
+        self._queued += 1
+
+    def _dequeue(self, tenant: _Tenant, waiter: _Waiter) -> None:
+        queue = tenant.queues[waiter.interactive]
+        queue.remove(waiter)
+        tenant.queued_bytes -= waiter.nbytes
+        self._queued -= 1
+        if not queue:
+            self._rings[waiter.interactive].remove(waiter.token)
+
+    def _forget_if_idle(self, token: str, tenant: _Tenant) -> None:
+        if not tenant.running and not tenant.queued:
+            self._tenants.pop(token, None)
+
+    def _release(self, token: str, elapsed: float) -> None:
+        with self._condition:
+            self._running -= 1
+            tenant = self._tenants[token]
+            tenant.running -= 1
+            self._average_seconds += _DURATION_SMOOTHING * (elapsed - self._average_seconds)
+            self._forget_if_idle(token, tenant)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        granted = False
+        while self._running < self._policy.max_running:
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            tenant = self._tenants[waiter.token]
+            self._dequeue(tenant, waiter)
+            self._start(tenant)
+            waiter.granted = True
+            granted = True
+        if granted:
+            self._condition.notify_all()
+
+    def _next_waiter(self) -> _Waiter | None:
+        bulk_first = self._interactive_streak >= _INTERACTIVE_BURST
+        for interactive in ((False, True) if bulk_first else (True, False)):
+            waiter = self._next_in_ring(interactive)
+            if waiter is not None:
+                self._interactive_streak = self._interactive_streak + 1 if interactive else 0
+                return waiter
+        return None
+
+    def _next_in_ring(self, interactive: bool) -> _Waiter | None:
+        ring = self._rings[interactive]
+        for _ in range(len(ring)):
+            token = ring[0]
+            tenant = self._tenants[token]
+            if tenant.running >= self._policy.max_running_per_token:
+                ring.rotate(-1)
+                continue
+            waiter = tenant.queues[interactive][0]
+            tenant.credits[interactive] -= 1
+            if tenant.credits[interactive] <= 0:
+                # The token used its turn; the next one goes first.
+                tenant.credits[interactive] = self._policy.weight_of(token)
+                ring.rotate(-1)
+            return waiter
+        return None
+
+    def _retry_after(self, tenant: _Tenant) -> int:
+        slots = max(min(self._policy.max_running_per_token, self._policy.max_running), 1)
+        estimate = self._average_seconds * (tenant.queued + 1) / slots
+        return min(max(math.ceil(estimate), 1), _MAX_RETRY_AFTER_SECONDS)
+
+
+IMPORT_ADMISSION = AdmissionController(policy_from_env())
@@ -0,0 +1,110 @@
+"""Short-lived cache of what ``coverage_regions`` holds for recent uploads.
+
+Dry runs of one upload repeat on every edit of the sheet.  The cache keeps,
+per upload, the stored content hash (or absence) of every code already
+looked up, so a later run only queries codes it has not seen before.  Any
+write to ``coverage_regions`` made by this process clears the cache; writes
+made by other workers are picked up once an entry's TTL expires.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import os
+import sqlite3
+import threading
+import time
+from typing import Collection
+
+from database import get_database_url
+from repositories import CoverageRegionRepository
+
+_CACHE_TTL_SECONDS = float(os.getenv("DRY_RUN_CACHE_TTL_SECONDS", "30"))
+_CACHE_MAX_ENTRIES = 32
+
+
+@dataclass(slots=True)
+class _Entry:
+    generation: int
+    expires_at: float
+    stored: dict[str, str | None] = field(default_factory=dict)
+    absent: set[str] = field(default_factory=set)
+    all_codes: frozenset[str] | None = None
+
+
+class RegionCodeCache:
+    """Thread-safe, LRU-bounded cache of stored region codes per upload."""
+
+    def __init__(self, *, ttl: float = _CACHE_TTL_SECONDS, max_entries: int = _CACHE_MAX_ENTRIES):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Forget everything; called after ``coverage_regions`` changed."""
+
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def _entry(self, upload_key: str) -> _Entry:
+        # Caller holds the lock.
+        key = (get_database_url(), upload_key)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= now:
+            entry = _Entry(generation=self._generation, expires_at=now + self._ttl)
+            self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def content_hashes(
+        self,
+        key: str | None,
+        codes: Collection[str],
+        connection: sqlite3.Connection,
+    ) -> dict[str, str | None]:
+        """Return the stored content hash of each persisted code in *codes*."""
+
+        repository = CoverageRegionRepository(connection)
+        if key is None:
+            return repository.fetch_content_hashes(codes)
+
+        with self._lock:
+            entry = self._entry(key)
+            unseen = [code for code in codes if code not in entry.stored and code not in entry.absent]
+        fetched = repository.fetch_content_hashes(unseen)
+
+        with self._lock:
+            if entry.generation == self._generation:
+                entry.stored.update(fetched)
+                entry.absent.update(code for code in unseen if code not in fetched)
+            stored = entry.stored
+            return {
+                code: fetched[code] if code in fetched else stored[code]
+                for code in codes
+                if code in fetched or code in stored
+            }
+
+    def all_codes(self, key: str | None, connection: sqlite3.Connection) -> frozenset[str]:
+        """Return every persisted region code."""
+
+        if key is not None:
+            with self._lock:
+                entry = self._entry(key)
+                if entry.all_codes is not None:
+                    return entry.all_codes
+
+        codes = frozenset(CoverageRegionRepository(connection).fetch_all_codes())
+        if key is not None:
+            with self._lock:
+                if entry.generation == self._generation:
+                    entry.all_codes = codes
+        return codes
+
+
+REGION_CODE_CACHE = RegionCodeCache()
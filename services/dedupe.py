@@ -0,0 +1,121 @@
+"""First-occurrence duplicate detection with bounded memory.
+
+:class:`KeySet` answers "was this key seen before?" for every row of an
+upload.  Keys are kept in a Python set until their estimated size reaches
+the memory budget (``IMPORT_DEDUPE_MEMORY_BYTES``); later keys go to an
+on-disk index, a throwaway SQLite B-tree in a temporary file with a small
+page cache.  Every key is checked when it arrives, so the first occurrence
+still wins and later ones are still reported in row order; only the
+memory a large upload needs for de-duplication changes.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import sqlite3
+import sys
+import tempfile
+from typing import Hashable
+
+from .upload_store import TEMP_ROOT
+
+DEDUPE_MEMORY_BYTES = int(os.getenv("IMPORT_DEDUPE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+_SPILL_ROOT = TEMP_ROOT / "dedupe"
+# Hash table slot and resizing headroom of a set entry, on top of the key.
+_SET_ENTRY_BYTES = 48
+_SPILL_CACHE_KIB = 8 * 1024
+
+
+def _estimated_size(key: Hashable) -> int:
+    size = sys.getsizeof(key) + _SET_ENTRY_BYTES
+    if key.__class__ is tuple:
+        size += sum(sys.getsizeof(part) for part in key)
+    return size
+
+
+def _encode(key: Hashable) -> str:
+    # Strings are stored as-is; anything else keeps its types apart, so
+    # ``(1,)`` and ``("1",)`` stay different keys as they are in memory.
+    if isinstance(key, str):
+        return key
+    return json.dumps(key, ensure_ascii=False, default=str)
+
+
+class KeySet:
+    """Add-only set of keys that spills to disk beyond *memory_bytes*.
+
+    Use as a context manager (or call :meth:`close`) so the spill file is
+    removed.
+    """
+
+    __slots__ = ("_directory", "_memory", "_remaining", "_spilled", "_disk", "_path")
+
+    def __init__(self, *, memory_bytes: int | None = None, directory: Path | None = None):
+        self._directory = directory or _SPILL_ROOT
+        self._memory: set[Hashable] = set()
+        self._remaining = DEDUPE_MEMORY_BYTES if memory_bytes is None else memory_bytes
+        self._spilled = 0
+        self._disk: sqlite3.Connection | None = None
+        self._path: Path | None = None
+
+    def __enter__(self) -> "KeySet":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._memory) + self._spilled
+
+    @property
+    def spilled(self) -> bool:
+        return self._disk is not None
+
+    def add(self, key: Hashable) -> bool:
+        """Add *key*; return ``False`` when it was already present."""
+
+        memory = self._memory
+        if key in memory:
+            return False
+        if self._disk is None:
+            # Called once per row, so the common string key is sized inline.
+            if key.__class__ is str:
+                remaining = self._remaining - sys.getsizeof(key) - _SET_ENTRY_BYTES
+            else:
+                remaining = self._remaining - _estimated_size(key)
+            if remaining >= 0:
+                memory.add(key)
+                self._remaining = remaining
+                return True
+            self._open_disk()
+
+        cursor = self._disk.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (_encode(key),))
+        if cursor.rowcount == 1:
+            self._spilled += 1
+            return True
+        return False
+
+    def _open_disk(self) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        handle, name = tempfile.mkstemp(prefix="keys-", suffix=".sqlite", dir=self._directory)
+        os.close(handle)
+        self._path = Path(name)
+        # Private scratch data: no journal, no fsync, one open transaction.
+        disk = sqlite3.connect(self._path, isolation_level=None, check_same_thread=False)
+        disk.execute("PRAGMA journal_mode=OFF")
+        disk.execute("PRAGMA synchronous=OFF")
+        disk.execute(f"PRAGMA cache_size=-{_SPILL_CACHE_KIB}")
+        disk.execute("CREATE TABLE seen (key PRIMARY KEY) WITHOUT ROWID")
+        disk.execute("BEGIN")
+        self._disk = disk
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+        if self._path is not None:
+            self._path.unlink(missing_ok=True)
+            self._path = None
+        self._memory.clear()
+        self._remaining = self._spilled = 0
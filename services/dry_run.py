@@ -0,0 +1,99 @@
+"""Report what an import would do without writing anything."""
+from __future__ import annotations
+
+from typing import Sequence
+
+from database import initialize_database, read_scope
+from repositories import CoverageRegionCreate, content_hash
+
+from .code_cache import REGION_CODE_CACHE
+from .import_service import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_MODES,
+    ImportDelta,
+    ImportErrorDetail,
+    ImportSummary,
+    _normalise_records,
+)
+
+
+def dry_run_import(
+    records: Sequence[CoverageRegionCreate],
+    *,
+    mode: str = "insert",
+    remove_missing: bool = False,
+    cache_key: str | None = None,
+    batch_size: int | None = None,
+) -> ImportSummary:
+    """Return the summary :func:`import_coverage_regions` would produce.
+
+    Normalisation and the existing-code checks run exactly as in a real
+    import, but against a :func:`read_scope` snapshot: no job is created, no
+    row is written and the write lock is never requested.  Runs sharing a
+    *cache_key* (typically the upload's ``fileId``) reuse the codes already
+    looked up, so re-validating an edited sheet only queries new codes.
+    *batch_size* must match the real import's for the errors to come out
+    in the same order.
+    """
+
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Unknown import mode {mode!r}; expected one of {IMPORT_MODES}")
+    initialize_database()
+
+    normalised, normalisation_errors = _normalise_records(records)
+    errors = list(normalisation_errors)
+    if not normalised:
+        return ImportSummary(
+            job_id=None,
+            success_count=0,
+            failure_count=len(errors),
+            errors=tuple(errors),
+            delta=ImportDelta(added=0, changed=0, unchanged=0, removed=0) if mode == "delta" else None,
+            dry_run=True,
+        )
+
+    codes = [record.code for record in normalised]
+    with read_scope() as session:
+        stored = REGION_CODE_CACHE.content_hashes(cache_key, codes, session)
+        all_codes = REGION_CODE_CACHE.all_codes(cache_key, session) if mode == "delta" and remove_missing else None
+
+    delta: ImportDelta | None = None
+    if mode == "delta":
+        added = changed = 0
+        for record in normalised:
+            if record.code not in stored:
+                added += 1
+            elif stored[record.code] != content_hash(record.name, record.description):
+                changed += 1
+        delta = ImportDelta(
+            added=added,
+            changed=changed,
+            unchanged=len(normalised) - added - changed,
+            removed=len(all_codes - set(codes)) if all_codes is not None else 0,
+        )
+        success_count = added + changed
+    else:
+        # Same ordering and wording as the errors of a real import, which
+        # reports existing codes sorted within each committed batch.
+        batch_size = batch_size or IMPORT_BATCH_SIZE
+        for start in range(0, len(normalised), batch_size):
+            batch = normalised[start : start + batch_size]
+            errors.extend(
+                ImportErrorDetail(
+                    message="Region code already exists in database.",
+                    row_number=record.row_number,
+                    code=record.code,
+                )
+                for record in sorted(batch, key=lambda item: item.code)
+                if record.code in stored
+            )
+        success_count = len(normalised) - len(stored)
+
+    return ImportSummary(
+        job_id=None,
+        success_count=success_count,
+        failure_count=len(errors),
+        errors=tuple(errors),
+        delta=delta,
+        dry_run=True,
+    )
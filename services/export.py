@@ -0,0 +1,171 @@
+"""Streaming export of ``coverage_regions`` as CSV or XLSX.
+
+Both formats are produced by generators that read the table through one
+dedicated ``read_scope`` cursor in ``fetchmany`` batches and yield encoded
+bytes after every batch, so the first bytes leave immediately and memory stays constant
+however many rows are exported.  XLSX files are written as a streamed zip
+archive with inline strings, which needs no spreadsheet library.
+"""
+from __future__ import annotations
+
+import csv
+from datetime import datetime, timezone
+import io
+import re
+from typing import Iterator
+from xml.sax.saxutils import escape
+import zipfile
+
+from database import initialize_database, read_scope
+from repositories import CoverageRegionRepository
+
+EXPORT_FORMATS = ("csv", "xlsx")
+EXPORT_COLUMNS = ("code", "name", "description", "updated_at")
+_BATCH_SIZE = 1000
+
+# Characters XML 1.0 cannot represent at all.
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _format_since(since: datetime | None) -> str | None:
+    if since is None:
+        return None
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    # Same layout as SQLite's CURRENT_TIMESTAMP so the comparison is textual.
+    return since.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _iter_batches(prefix: str | None, since: datetime | None) -> Iterator[list]:
+    initialize_database()
+    # A download lasts as long as the client reads; it must not hold one of
+    # the pooled connections that every other read shares.
+    with read_scope(dedicated=True) as session:
+        yield from CoverageRegionRepository(session).iter_regions(
+            prefix=prefix,
+            updated_since=_format_since(since),
+            batch_size=_BATCH_SIZE,
+        )
+
+
+def iter_regions_csv(*, prefix: str | None = None, since: datetime | None = None) -> Iterator[bytes]:
+    """Yield the export as UTF-8 CSV with a BOM so Excel detects the encoding."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield b"\xef\xbb\xbf" + buffer.getvalue().encode("utf-8")
+
+    for rows in _iter_batches(prefix, since):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable sink collecting what ``zipfile`` writes until drained."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="coverage_regions" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def _xlsx_row(values) -> str:
+    cells = "".join(
+        '<c t="inlineStr"><is><t xml:space="preserve">'
+        f"{escape(_INVALID_XML_CHARS.sub('', str(value)))}</t></is></c>"
+        if value is not None
+        else "<c/>"
+        for value in values
+    )
+    return f"<row>{cells}</row>"
+
+
+def iter_regions_xlsx(*, prefix: str | None = None, since: datetime | None = None) -> Iterator[bytes]:
+    """Yield the export as a single-sheet XLSX workbook."""
+
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((_SHEET_HEAD + _xlsx_row(EXPORT_COLUMNS)).encode("utf-8"))
+            yield sink.drain()
+            for rows in _iter_batches(prefix, since):
+                sheet.write("".join(_xlsx_row(row) for row in rows).encode("utf-8"))
+                # The compressor buffers internally; only forward what it emitted.
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            sheet.write(_SHEET_TAIL.encode("utf-8"))
+    yield sink.drain()
+
+
+def iter_regions_export(
+    export_format: str,
+    *,
+    prefix: str | None = None,
+    since: datetime | None = None,
+) -> Iterator[bytes]:
+    """Return the byte stream for *export_format* (``csv`` or ``xlsx``)."""
+
+    if export_format == "csv":
+        return iter_regions_csv(prefix=prefix, since=since)
+    if export_format == "xlsx":
+        return iter_regions_xlsx(prefix=prefix, since=since)
+    raise ValueError(f"Unsupported export format {export_format!r}; expected one of {EXPORT_FORMATS}")
@@ -0,0 +1,434 @@
+"""Single-pass import of sheet files into a registered import target.
+
+The file is decoded, parsed, validated against the target's schema, trimmed
+and de-duplicated row by row while it is read.  Accepted rows go straight
+into checkpointed batches; every rejected row becomes an
+:class:`~services.import_service.ImportErrorDetail` that is stored with the
+batch following it.  No :class:`~services.parser.ParseResult` or list of
+parsed rows is built and the rows are walked exactly once.
+
+Reading and writing overlap: a worker thread reads the file into batches
+sized by the job's :class:`~services.memory_budget.MemoryBudget` and hands
+them over through a bounded queue, which blocks the reader while the
+writer is behind.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import queue
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Mapping
+
+from database import initialize_database, read_scope
+from repositories import ImportLogRepository
+from writer import run_write
+
+from .import_service import (
+    IMPORT_BATCH_SIZE,
+    TARGET_IMPORT_MODES,
+    ImportDelta,
+    ImportErrorDetail,
+    ImportJobNotFoundError,
+    ImportSummary,
+    _execute,
+    _normalise_stream,
+    _reopen,
+    _start_job,
+    _TargetRow,
+    _write_batch,
+)
+from .dedupe import KeySet
+from .import_targets import ImportTarget, get_import_target
+from .memory_budget import ERROR_DETAIL_BYTES, IMPORT_PIPELINE_DEPTH, MemoryBudget, estimate_row_bytes
+from .parser import DecodingReader, iter_rows, starting_row_for
+from .progress import PROGRESS
+from .timing import DISABLED_TIMINGS, StageTimings, new_stage_timings, timed_iter
+
+
+def _file_digest(handle: BinaryIO) -> str:
+    # Hashing the raw bytes is far cheaper than parsing them and lets a
+    # resumed job check it was given the same file before writing anything.
+    start = handle.tell()
+    digest = hashlib.file_digest(handle, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+    handle.seek(start)
+    return digest
+
+
+# Every this many rows the row size estimate is refreshed.
+_ROW_SIZE_SAMPLE = 64
+
+
+def import_file(
+    target_name: str,
+    handle: BinaryIO,
+    *,
+    filename: str,
+    source: str | None = None,
+    mode: str = "insert",
+    timings: StageTimings | None = None,
+    batch_size: int | None = None,
+) -> ImportSummary:
+    """Import the sheet readable from the seekable binary *handle*.
+
+    *filename* selects the parser as in :func:`~services.parser.parse_stream`.
+    Modes, errors and checkpoints behave as in
+    :func:`~services.import_service.import_rows`; an interrupted job
+    continues with :func:`resume_file`.
+    """
+
+    target = get_import_target(target_name)
+    if mode not in TARGET_IMPORT_MODES:
+        raise ValueError(f"Unknown import mode {mode!r}; expected one of {TARGET_IMPORT_MODES}")
+    starting_row_for(filename)  # Rejects unsupported extensions before a job exists.
+    if timings is None:
+        timings = new_stage_timings()
+    started = time.perf_counter()
+    initialize_database()
+
+    # The row count is only known once the file has been read.
+    job_id = _start_job(
+        source or filename,
+        0,
+        mode=mode,
+        payload_digest=_file_digest(handle),
+        target=target.name,
+    )
+    return _run_file_import(
+        job_id,
+        target,
+        handle,
+        filename=filename,
+        mode=mode,
+        checkpoint_row=0,
+        already_inserted=0,
+        timings=timings,
+        batch_size=batch_size or IMPORT_BATCH_SIZE,
+        started=started,
+    )
+
+
+def resume_file(
+    job_id: int,
+    handle: BinaryIO,
+    *,
+    filename: str,
+    timings: StageTimings | None = None,
+    batch_size: int | None = None,
+) -> ImportSummary:
+    """Continue an :func:`import_file` job; *handle* must hold the same file."""
+
+    if timings is None:
+        timings = new_stage_timings()
+    started = time.perf_counter()
+    initialize_database()
+
+    with read_scope() as session:
+        checkpoint = ImportLogRepository(session).fetch_checkpoint(job_id)
+    if checkpoint is None:
+        raise ImportJobNotFoundError(f"Import job {job_id} does not exist.")
+    target = get_import_target(checkpoint.target)
+    checkpoint = _reopen(job_id, target=target.name, payload_digest=_file_digest(handle))
+    # Errors flushed after the last committed row are found again below.
+    run_write(
+        lambda connection: ImportLogRepository(connection).discard_pending_errors_after(
+            job_id, checkpoint.checkpoint_row
+        )
+    )
+    return _run_file_import(
+        job_id,
+        target,
+        handle,
+        filename=filename,
+        mode=checkpoint.mode,
+        checkpoint_row=checkpoint.checkpoint_row,
+        already_inserted=checkpoint.success_count,
+        timings=timings,
+        batch_size=batch_size or IMPORT_BATCH_SIZE,
+        started=started,
+    )
+
+
+def _run_file_import(
+    job_id: int,
+    target: ImportTarget,
+    handle: BinaryIO,
+    *,
+    filename: str,
+    mode: str,
+    checkpoint_row: int,
+    already_inserted: int,
+    timings: StageTimings,
+    batch_size: int,
+    started: float,
+) -> ImportSummary:
+    rows_read = 0
+
+    def counted(rows: Iterable[Mapping[str, Any]]) -> Iterator[Mapping[str, Any]]:
+        nonlocal rows_read
+        for row in rows:
+            rows_read += 1
+            yield row
+
+    def persist() -> tuple[str, ImportDelta | None, list[str]]:
+        budget = MemoryBudget()
+        local = StageTimings() if timings.enabled else DISABLED_TIMINGS
+        starting_row = starting_row_for(filename)
+        reader = DecodingReader(handle, timings=local, header_lines=starting_row - 1)
+        rows = counted(timed_iter(iter_rows(reader, filename=filename), local, "parse"))
+        errors: list[ImportErrorDetail] = []
+        stream = _normalise_stream(
+            target,
+            rows,
+            errors,
+            starting_row=starting_row,
+            reader=reader,
+            seen=KeySet(memory_bytes=budget.dedupe_bytes),
+            mark_rejected=True,
+        )
+        batches = _batches(
+            stream,
+            errors,
+            budget,
+            checkpoint_row=checkpoint_row,
+            batch_size=batch_size,
+            rows_read=lambda: rows_read,
+        )
+        pipeline = _BatchReader(batches, depth=IMPORT_PIPELINE_DEPTH)
+        try:
+            with pipeline:
+                outcome = _write_batches(
+                    job_id,
+                    target,
+                    pipeline,
+                    budget,
+                    mode=mode,
+                    already_inserted=already_inserted,
+                    timings=timings,
+                )
+        finally:
+            # The parse iterator wraps the decoder and the reader thread's
+            # time wraps both; keep only each stage's own share.
+            timings.add("decode", local.seconds("decode"))
+            timings.add("parse", max(local.seconds("parse") - local.seconds("decode"), 0.0))
+            timings.add("normalise", max(pipeline.reading_seconds - local.seconds("parse"), 0.0))
+        if outcome is None:
+            return "cancelled", None, []
+
+        accepted, rejected, skipped, written = outcome
+        events = [f"Normalised payload produced {accepted} unique rows with {rejected} validation errors"]
+        if skipped:
+            events.append(f"Skipped {skipped} rows that already exist")
+        events.append(f"Upserted {written} rows" if mode == "upsert" else f"Inserted {written} new rows")
+        return "completed", None, events
+
+    with PROGRESS.track(job_id, total_rows=0):
+        return _execute(job_id, persist, timings=timings, started=started, rows_read=lambda: rows_read)
+
+
+@dataclass(frozen=True, slots=True)
+class _Batch:
+    """Normalised rows handed from the reader thread to the writer."""
+
+    rows: list[_TargetRow]
+    rejected: tuple[ImportErrorDetail, ...]
+    end: int
+    rows_read: int
+    nbytes: int
+    # Errors of rows before the checkpoint, stored by an earlier run.
+    stored_rejected: int = 0
+
+
+def _batches(
+    stream: Iterable[_TargetRow | None],
+    errors: list[ImportErrorDetail],
+    budget: MemoryBudget,
+    *,
+    checkpoint_row: int,
+    batch_size: int,
+    rows_read: Callable[[], int],
+) -> Iterator[_Batch]:
+    """Group *stream* into batches that fit the memory left in *budget*.
+
+    A batch closes at *batch_size* rows or once its estimated size, errors
+    included, reaches :meth:`MemoryBudget.batch_bytes`; it is charged to
+    *budget* when it is handed over.  *errors* fills up as the stream
+    advances and each batch takes those collected since the previous one,
+    so on resume the errors up to *checkpoint_row* are dropped with the rows
+    already committed.  The stream yields ``None`` for rejected rows, so a
+    run of them closes a batch holding only errors.  The last batch may be
+    empty.
+    """
+
+    rows = iter(stream)
+    position = stored = 0
+    try:
+        if checkpoint_row:
+            for row in rows:
+                if row is None:
+                    stored += len(errors)
+                    errors.clear()
+                    continue
+                position += 1
+                if position == checkpoint_row:
+                    break
+            stored += len(errors)
+            errors.clear()
+
+        batch: list[_TargetRow] = []
+        nbytes = row_bytes = leading = 0
+        limit = budget.batch_bytes()
+        for row in rows:
+            if row is not None:
+                position += 1
+                # Rows of one sheet are alike; sizing every one would cost
+                # more than the estimate is worth.
+                if not row_bytes or not position % _ROW_SIZE_SAMPLE:
+                    row_bytes = estimate_row_bytes(row.values)
+                batch.append(row)
+                nbytes += row_bytes
+                leading = len(errors)
+            elif not batch:
+                leading = len(errors)
+            if len(batch) >= batch_size or nbytes + len(errors) * ERROR_DETAIL_BYTES >= limit:
+                # A batch with rows only takes the errors before its last
+                # row: a resumed run restarts after that row and finds the
+                # later ones again.
+                nbytes += leading * ERROR_DETAIL_BYTES
+                budget.charge(nbytes)
+                yield _Batch(batch, tuple(errors[:leading]), position, rows_read(), nbytes, stored)
+                del errors[:leading]
+                batch = []
+                nbytes = stored = leading = 0
+                limit = budget.batch_bytes()
+
+        nbytes += len(errors) * ERROR_DETAIL_BYTES
+        budget.charge(nbytes)
+        yield _Batch(batch, tuple(errors), position, rows_read(), nbytes, stored)
+        errors.clear()
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+
+class _BatchReader:
+    """Runs *batches* on a worker thread, at most *depth* batches ahead.
+
+    The bounded queue is the backpressure between reading the file and
+    writing it: while the writer is behind, the worker waits instead of
+    parsing on.  Iterating yields the batches in order and re-raises
+    anything the worker failed with; closing stops the worker early.
+    """
+
+    _DONE = object()
+    _POLL_SECONDS = 0.1
+
+    def __init__(self, batches: Iterator[_Batch], *, depth: int):
+        self._batches = batches
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="import-file-reader", daemon=True)
+        # Time the worker spent producing batches, excluding waits on the queue.
+        self.reading_seconds = 0.0
+
+    def __enter__(self) -> "_BatchReader":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[_Batch]:
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item  # type: ignore[misc]
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _put(self, item: object) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=self._POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        batches = self._batches
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    batch = next(batches, None)
+                finally:
+                    self.reading_seconds += time.perf_counter() - started
+                if batch is None or not self._put(batch):
+                    break
+        except BaseException as exc:  # noqa: BLE001 - handed to the consuming thread
+            self._error = exc
+        finally:
+            batches.close()
+        self._put(self._DONE)
+
+
+def _write_batches(
+    job_id: int,
+    target: ImportTarget,
+    batches: Iterable[_Batch],
+    budget: MemoryBudget,
+    *,
+    mode: str,
+    already_inserted: int,
+    timings: StageTimings,
+) -> tuple[int, int, int, int] | None:
+    """Commit *batches* in order, releasing each from *budget* once written.
+
+    Returns ``(accepted, rejected, skipped, written)`` or ``None`` when the
+    job was cancelled.
+    """
+
+    position = rejected = skipped = written_total = 0
+    for batch in batches:
+        rejected += batch.stored_rejected
+        position = batch.end
+        if not batch.rows and not batch.rejected:
+            budget.release(batch.nbytes)
+            continue
+        try:
+            outcome = _write_batch(
+                job_id,
+                target,
+                batch.rows,
+                batch_start=batch.end - len(batch.rows),
+                mode=mode,
+                timings=timings,
+                rejected=batch.rejected,
+            )
+        finally:
+            budget.release(batch.nbytes)
+        if outcome is None:
+            return None
+        rejected += len(batch.rejected)
+        skipped += outcome[0]
+        written_total += outcome[1]
+        PROGRESS.update(
+            job_id,
+            stage="insert",
+            total_rows=batch.rows_read,
+            rows_parsed=batch.rows_read,
+            rows_validated=position,
+            rows_failed=rejected,
+            rows_inserted=already_inserted + written_total,
+        )
+    return position, rejected, skipped, written_total
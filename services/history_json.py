@@ -0,0 +1,57 @@
+"""Import history rendered straight from database rows to JSON bytes.
+
+:func:`list_import_jobs` builds repository rows, then domain records, which
+the API copies once more into response models.  For history pages that is
+most of the request time, mostly spent decoding and re-encoding error lists.
+:func:`render_import_history` produces the same camelCase document without
+any of those objects: the stored ``errors`` JSON is spliced in verbatim and
+every other value is encoded as it is read.
+"""
+from __future__ import annotations
+
+import json
+
+from database import initialize_database, read_scope
+from repositories import ImportLogRepository
+
+from .timing import order_stages
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _timestamp(value: str | None) -> str:
+    # ``YYYY-MM-DD HH:MM:SS`` -> the ISO form datetime.isoformat() produces.
+    return "null" if value is None else f'"{value.replace(" ", "T", 1)}"'
+
+
+def render_import_history(*, page: int, page_size: int) -> bytes:
+    """Return the ``GET /imports`` response body for *page* as UTF-8 JSON."""
+
+    initialize_database()
+    offset = max(page - 1, 0) * page_size
+
+    with read_scope() as session:
+        job_rows, events, timings, total = ImportLogRepository(session).fetch_job_rows(
+            limit=page_size,
+            offset=offset,
+        )
+
+    parts = [f'{{"page":{page},"pageSize":{page_size},"total":{total},"items":[']
+    for index, row in enumerate(job_rows):
+        job_id = row["id"]
+        event_parts = ",".join(
+            f'{{"level":{_encode(event["level"])},"message":{_encode(event["message"])},'
+            f'"createdAt":{_timestamp(event["created_at"])}}}'
+            for event in events[job_id]
+        )
+        parts.append(
+            ("," if index else "")
+            + f'{{"id":{job_id},"sourceFilename":{_encode(row["source"])},'
+            f'"totalRows":{row["total_rows"]},"successCount":{row["success_count"]},'
+            f'"failureCount":{row["failure_count"]},"status":{_encode(row["status"])},'
+            f'"createdAt":{_timestamp(row["created_at"])},"completedAt":{_timestamp(row["completed_at"])},'
+            f'"errors":{row["errors"] or "[]"},"events":[{event_parts}],'
+            f'"timings":{_encode(order_stages(timings[job_id]))}}}'
+        )
+    parts.append("]}")
+    return "".join(parts).encode("utf-8")
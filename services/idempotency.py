@@ -0,0 +1,160 @@
+"""Idempotency keys for requests that create imports or uploads.
+
+The first request sent with a key claims it together with a hash of its
+body, runs, and stores its response for ``IDEMPOTENCY_TTL_SECONDS``.  A
+retry with the same key and body is answered from the stored response
+without running anything again.  A retry that arrives while the first
+request still runs waits for it and gets the same answer.  Reusing a key
+for a different body raises :class:`IdempotencyConflictError`.
+
+Keys are scoped by the caller (route and upload token), so clients cannot
+collide with each other's keys.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import hashlib
+import json
+import os
+import threading
+import time
+
+from database import initialize_database
+from repositories import IdempotencyRepository
+from writer import run_write
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 60 * 60)))
+# How long a retry waits for the request still holding its key.
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+# Claims unfinished after this long belong to a process that died.
+IDEMPOTENCY_STALE_SECONDS = int(os.getenv("IDEMPOTENCY_STALE_SECONDS", str(60 * 60)))
+# Claims of other processes are polled; this process's are awaited directly.
+_POLL_SECONDS = 0.25
+_PURGE_BATCH = 500
+
+
+class IdempotencyConflictError(ValueError):
+    """Raised when a key is reused for a request with a different body."""
+
+
+class IdempotencyInProgressError(RuntimeError):
+    """Raised when the request holding a key is still running after the wait."""
+
+
+@dataclass(frozen=True, slots=True)
+class IdempotencyClaim:
+    """Permission to run a request; finish with :func:`complete_request` or :func:`abandon_request`."""
+
+    scope: str
+    key: str
+
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    """Response recorded for an earlier request with the same key."""
+
+    status_code: int
+    body: str
+
+
+_WAITERS: dict[tuple[str, str], threading.Event] = {}
+_WAITERS_LOCK = threading.Lock()
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def request_digest(*parts: object) -> str:
+    """Hash JSON-serialisable request *parts* independently of key order."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def begin_request(
+    scope: str,
+    key: str,
+    request_hash: str,
+    *,
+    wait_seconds: float | None = None,
+) -> IdempotencyClaim | StoredResponse:
+    """Claim *key* for a new request or return the response stored under it.
+
+    Blocks while another request holds the key, up to *wait_seconds*
+    (default ``IDEMPOTENCY_WAIT_SECONDS``).
+    """
+
+    initialize_database()
+    deadline = time.monotonic() + (IDEMPOTENCY_WAIT_SECONDS if wait_seconds is None else wait_seconds)
+    while True:
+        now = datetime.now(timezone.utc)
+        record = run_write(
+            lambda connection: IdempotencyRepository(connection).claim(
+                scope,
+                key,
+                request_hash,
+                now=_timestamp(now),
+                expires_at=_timestamp(now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)),
+                stale_before=_timestamp(now - timedelta(seconds=IDEMPOTENCY_STALE_SECONDS)),
+            )
+        )
+        if record is None:
+            with _WAITERS_LOCK:
+                _WAITERS[(scope, key)] = threading.Event()
+            return IdempotencyClaim(scope, key)
+
+        if record.request_hash != request_hash:
+            raise IdempotencyConflictError("Idempotency-Key was already used for a different request.")
+        if record.completed:
+            return StoredResponse(status_code=record.status_code or 200, body=record.response or "")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise IdempotencyInProgressError("A request with this Idempotency-Key is still being processed.")
+        with _WAITERS_LOCK:
+            local = _WAITERS.get((scope, key))
+        if local is not None:
+            local.wait(remaining)
+        else:
+            time.sleep(min(_POLL_SECONDS, remaining))
+
+
+def _finish(claim: IdempotencyClaim) -> None:
+    with _WAITERS_LOCK:
+        event = _WAITERS.pop((claim.scope, claim.key), None)
+    if event is not None:
+        event.set()
+
+
+def complete_request(claim: IdempotencyClaim, *, status_code: int, body: str) -> None:
+    """Store the response of a claimed request for its retries."""
+
+    try:
+        run_write(
+            lambda connection: IdempotencyRepository(connection).complete(
+                claim.scope, claim.key, status_code=status_code, response=body
+            )
+        )
+    finally:
+        _finish(claim)
+
+
+def abandon_request(claim: IdempotencyClaim) -> None:
+    """Give up a claim whose request failed, so a retry runs it again."""
+
+    try:
+        run_write(lambda connection: IdempotencyRepository(connection).release(claim.scope, claim.key))
+    finally:
+        _finish(claim)
+
+
+def purge_expired_keys(*, now: datetime | None = None, limit: int = _PURGE_BATCH) -> int:
+    """Delete up to *limit* expired keys and return how many were removed."""
+
+    moment = _timestamp(now or datetime.now(timezone.utc))
+    return run_write(lambda connection: IdempotencyRepository(connection).purge_expired(moment, limit=limit))
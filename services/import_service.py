@@ -1,16 +1,33 @@
 """Business logic for importing coverage region data and tracking history."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Iterable, Sequence
-
-from database import initialize_database, session_scope
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence
+
+from database import initialize_database, read_scope
+from metrics import IMPORT_DURATION, IMPORT_ROWS_IMPORTED, IMPORT_ROWS_REJECTED
 from repositories import (
     CoverageRegionCreate,
     CoverageRegionRepository,
+    ImportJobCheckpoint,
     ImportLogRepository,
+    ImportTargetRepository,
+    content_hash,
 )
+from writer import run_write
+
+from .code_cache import REGION_CODE_CACHE
+from .dedupe import KeySet
+from .import_targets import COVERAGE_REGIONS, ImportTarget, get_import_target
+from .parser import ROW_FIELD, DecodingReader, ValidationIssue, validate_row
+from .progress import PROGRESS
+from .timing import StageTimings, new_stage_timings, order_stages
 
 
 @dataclass(frozen=True, slots=True)
@@ -20,12 +37,14 @@ class ImportErrorDetail:
     message: str
     row_number: int | None = None
     code: str | None = None
+    field: str | None = None
 
     def to_dict(self) -> dict[str, int | str | None]:
         return {
             "message": self.message,
             "rowNumber": self.row_number,
             "code": self.code,
+            "field": self.field,
         }
 
     @staticmethod
@@ -34,8 +53,13 @@ class ImportErrorDetail:
             message=str(payload.get("message", "")),
             row_number=payload.get("rowNumber"),
             code=payload.get("code"),
+            field=payload.get("field"),
         )
 
+    @staticmethod
+    def from_issue(issue: ValidationIssue) -> "ImportErrorDetail":
+        return ImportErrorDetail(message=issue.reason, row_number=issue.row_number, field=issue.field)
+
 
 @dataclass(frozen=True, slots=True)
 class ImportJobEvent:
@@ -60,6 +84,7 @@ class ImportJobRecord:
     completed_at: datetime | None
     errors: tuple[ImportErrorDetail, ...]
     events: tuple[ImportJobEvent, ...]
+    timings: dict[str, float] = field(default_factory=dict)
 
 
 @dataclass(frozen=True, slots=True)
@@ -72,177 +97,885 @@ class ImportHistory:
     items: tuple[ImportJobRecord, ...]
 
 
+@dataclass(frozen=True, slots=True)
+class ImportDelta:
+    """Per-code outcome of a delta import."""
+
+    added: int
+    changed: int
+    unchanged: int
+    removed: int
+
+
 @dataclass(frozen=True, slots=True)
 class ImportSummary:
     """Outcome of a bulk import operation."""
 
-    job_id: int
+    job_id: int | None
     success_count: int
     failure_count: int
     errors: tuple[ImportErrorDetail, ...]
+    delta: ImportDelta | None = None
+    dry_run: bool = False
+    status: str = "completed"
+
+
+class ImportJobNotFoundError(LookupError):
+    """Raised when an import job id is unknown."""
+
+
+class ImportJobStateError(RuntimeError):
+    """Raised when a job cannot be cancelled or resumed in its current state."""
+
+
+IMPORT_MODES = ("insert", "delta")
+# Modes of :func:`import_rows`: ``upsert`` overwrites rows whose key exists.
+TARGET_IMPORT_MODES = ("insert", "upsert")
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+# A ``running`` job whose heartbeat is older than this is considered abandoned.
+IMPORT_STALE_AFTER_SECONDS = float(os.getenv("IMPORT_STALE_AFTER_SECONDS", "300"))
+# Error details kept and reported per job; further errors are only counted.
+IMPORT_MAX_ERRORS_PER_JOB = int(os.getenv("IMPORT_MAX_ERRORS_PER_JOB", "10000"))
 
 
 def _normalise_records(
     records: Iterable[CoverageRegionCreate],
 ) -> tuple[list[CoverageRegionCreate], list[ImportErrorDetail]]:
-    """Normalise and de-duplicate incoming *records* by code."""
+    """Normalise and de-duplicate incoming *records* by code.
+
+    Codes are de-duplicated through a :class:`KeySet`, so very large
+    payloads spill seen codes to disk instead of growing memory.
+    """
 
-    seen: dict[str, CoverageRegionCreate] = {}
+    normalised: list[CoverageRegionCreate] = []
     errors: list[ImportErrorDetail] = []
 
-    for record in records:
-        row_number = record.row_number
-        normalised_code = record.code.strip() if record.code else ""
-        if not normalised_code:
-            errors.append(
-                ImportErrorDetail(
-                    message="Region code is required.",
-                    row_number=row_number,
-                    code=None,
+    with KeySet() as seen:
+        for record in records:
+            row_number = record.row_number
+            normalised_code = record.code.strip() if record.code else ""
+            if not normalised_code:
+                errors.append(
+                    ImportErrorDetail(
+                        message="Region code is required.",
+                        row_number=row_number,
+                        code=None,
+                    )
                 )
-            )
-            continue
+                continue
 
-        if normalised_code in seen:
-            errors.append(
-                ImportErrorDetail(
-                    message="Duplicate region code in upload payload.",
-                    row_number=row_number,
+            if not seen.add(normalised_code):
+                errors.append(
+                    ImportErrorDetail(
+                        message="Duplicate region code in upload payload.",
+                        row_number=row_number,
+                        code=normalised_code,
+                    )
+                )
+                continue
+
+            normalised.append(
+                CoverageRegionCreate(
                     code=normalised_code,
+                    name=record.name.strip(),
+                    description=record.description.strip() if record.description else None,
+                    row_number=row_number,
                 )
             )
-            continue
 
-        seen[normalised_code] = CoverageRegionCreate(
-            code=normalised_code,
-            name=record.name.strip(),
-            description=record.description.strip() if record.description else None,
-            row_number=row_number,
+    return normalised, errors
+
+
+def _payload_digest(records: Sequence[CoverageRegionCreate]) -> str:
+    """Fingerprint of *records* used to check a resumed job gets the same payload."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    for record in records:
+        digest.update(
+            f"{record.code}\x1f{record.name}\x1f{record.description}\x1f{record.row_number}\x1e".encode("utf-8")
+        )
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class _TargetRow:
+    """Normalised record ready for :class:`ImportTargetRepository`."""
+
+    key: tuple[Any, ...]
+    values: tuple[Any, ...]
+    row_number: int | None
+
+
+def _key_text(key: tuple[Any, ...]) -> str:
+    return "/".join(str(part) for part in key)
+
+
+def _region_rows(records: Sequence[CoverageRegionCreate]) -> list[_TargetRow]:
+    return [
+        _TargetRow(
+            key=(record.code,),
+            values=(record.code, record.name, record.description, content_hash(record.name, record.description)),
+            row_number=record.row_number,
+        )
+        for record in records
+    ]
+
+
+def _take_decode_failures(reader: DecodingReader | None, errors: list[ImportErrorDetail]) -> str | None:
+    if reader is None:
+        return None
+    errors.extend(ImportErrorDetail(message=reason, field=ROW_FIELD) for reason in reader.take_file_failures())
+    return reader.take_failure()
+
+
+def _normalise_stream(
+    target: ImportTarget,
+    rows: Iterable[Mapping[str, Any]],
+    errors: list[ImportErrorDetail],
+    *,
+    starting_row: int,
+    reader: DecodingReader | None = None,
+    seen: KeySet | None = None,
+    mark_rejected: bool = False,
+) -> Iterator[_TargetRow | None]:
+    """Validate, trim and de-duplicate *rows* against *target* in one pass.
+
+    Accepted rows are yielded as soon as they are read, so a parser's lazy
+    rows flow straight into batches; rejected rows are appended to *errors*
+    instead.  With *mark_rejected*, ``None`` is yielded after each rejected
+    row, so the consumer can act on *errors* while no row is accepted.  The
+    first row of every key wins.  With a *reader*, rows whose bytes could
+    not be decoded are rejected as a whole, and undecodable input outside
+    any row is reported without a row number.  *seen* replaces the default
+    duplicate detector and is closed once the stream ends.
+    """
+
+    if seen is None:
+        seen = KeySet()
+    duplicate = f"Duplicate {target.label[:1].lower()}{target.label[1:]} in upload payload."
+    required = f"{target.label} is required."
+    key_positions = [target.spec.columns.index(column) for column in target.spec.key_columns]
+    schema = target.schema
+
+    try:
+        for row_number, row in enumerate(rows, start=starting_row):
+            failure = _take_decode_failures(reader, errors)
+            if failure is not None:
+                errors.append(ImportErrorDetail(message=failure, row_number=row_number, field=ROW_FIELD))
+            elif schema and (issues := validate_row(row, row_number, schema)):
+                errors.extend(ImportErrorDetail.from_issue(issue) for issue in issues)
+            else:
+                values = target.values_of(row)
+                key = tuple(values[position] for position in key_positions)
+                if None in key:
+                    errors.append(ImportErrorDetail(message=required, row_number=row_number))
+                elif not seen.add(key):
+                    errors.append(ImportErrorDetail(message=duplicate, row_number=row_number, code=_key_text(key)))
+                else:
+                    yield _TargetRow(key=key, values=values, row_number=row_number)
+                    continue
+            if mark_rejected:
+                yield None
+        _take_decode_failures(reader, errors)
+    finally:
+        seen.close()
+
+
+def _normalise_rows(
+    target: ImportTarget,
+    rows: Iterable[Mapping[str, Any]],
+    *,
+    starting_row: int,
+) -> tuple[list[_TargetRow], list[ImportErrorDetail]]:
+    errors: list[ImportErrorDetail] = []
+    normalised = list(_normalise_stream(target, rows, errors, starting_row=starting_row))
+    return normalised, errors
+
+
+def _rows_digest(rows: Sequence[Mapping[str, Any]]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        digest.update(json.dumps(row, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def _finalise(
+    job_id: int,
+    timings: StageTimings,
+    *,
+    status: str,
+    errors: Sequence[ImportErrorDetail] = (),
+    events: Sequence[str] = (),
+    total_rows: int | None = None,
+    started: float | None = None,
+) -> tuple[int, int, tuple[ImportErrorDetail, ...]]:
+    """Mark *job_id* as finished and persist its stage timings.
+
+    The job's errors are those recorded by its committed batches followed by
+    *errors*; only the first ``IMPORT_MAX_ERRORS_PER_JOB`` are kept.  Batch
+    errors stay pending unless the job completed, so that a resumed run
+    still reports them.  *total_rows* replaces the row count given when the
+    job started, for payloads only counted while streaming.  *started* is
+    the run's ``perf_counter`` start, recorded as its duration.  Returns the
+    job's total success and failure counts and its kept errors.
+    """
+
+    duration_ms = (time.perf_counter() - started) * 1000 if started is not None else None
+
+    def finalise(connection: sqlite3.Connection) -> tuple[int, int, list[dict[str, object]]]:
+        log_repository = ImportLogRepository(connection)
+        for message in events:
+            log_repository.append_event(job_id, message)
+        with timings.measure("finalise"):
+            all_errors = log_repository.fetch_pending_errors(job_id) + [error.to_dict() for error in errors]
+            del all_errors[IMPORT_MAX_ERRORS_PER_JOB:]
+            failure_count = log_repository.count_pending_errors(job_id) + len(errors)
+            success_count = log_repository.fetch_checkpoint(job_id).success_count
+            log_repository.finalise_job(
+                job_id,
+                success_count=success_count,
+                failure_count=failure_count,
+                errors=all_errors,
+                status=status,
+                total_rows=total_rows,
+                duration_ms=duration_ms,
+            )
+            if status == "completed":
+                log_repository.clear_pending_errors(job_id)
+        if timings.enabled:
+            log_repository.record_timings(job_id, timings.as_milliseconds())
+        return success_count, failure_count, all_errors
+
+    success_count, failure_count, stored_errors = run_write(finalise)
+    PROGRESS.finish(job_id, status=status, rows_failed=failure_count)
+    return success_count, failure_count, tuple(ImportErrorDetail.from_dict(error) for error in stored_errors)
+
+
+def _start_job(
+    source: str | None,
+    total_rows: int,
+    *,
+    mode: str,
+    remove_missing: bool = False,
+    payload_digest: str,
+    target: str,
+) -> int:
+    def start(connection: sqlite3.Connection) -> int:
+        log_repository = ImportLogRepository(connection)
+        job_id = log_repository.create_job(
+            source,
+            total_rows,
+            mode=mode,
+            remove_missing=remove_missing,
+            payload_digest=payload_digest,
+            target=target,
         )
+        log_repository.append_event(job_id, f"Import started with {total_rows} rows")
+        return job_id
 
-    return list(seen.values()), errors
+    return run_write(start)
 
 
 def import_coverage_regions(
     records: Sequence[CoverageRegionCreate],
     *,
     source: str | None = None,
+    timings: StageTimings | None = None,
+    mode: str = "insert",
+    remove_missing: bool = False,
+    batch_size: int | None = None,
 ) -> ImportSummary:
-    """Persist *records* while enforcing idempotency semantics."""
+    """Persist *records* while enforcing idempotency semantics.
+
+    Stage durations are accumulated in *timings* (a fresh recorder when
+    omitted) and stored on the job; callers that parsed the payload
+    themselves can pass the recorder used for parsing to keep those stages.
+
+    In the default ``"insert"`` mode codes that already exist are reported
+    as errors.  In ``"delta"`` mode the sheet is treated as the source of
+    truth: each row's content hash is compared with the stored one and only
+    added and changed rows are written (plus, with *remove_missing*, codes
+    absent from the sheet are deleted).  The counts are returned in
+    :attr:`ImportSummary.delta`.
+
+    Insert-mode rows are committed in batches of *batch_size*
+    (``IMPORT_BATCH_SIZE``), each together with a checkpoint on the job, so
+    an interrupted or cancelled job can continue with :func:`resume_import`.
+    """
+
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Unknown import mode {mode!r}; expected one of {IMPORT_MODES}")
+    if timings is None:
+        timings = new_stage_timings()
+    started = time.perf_counter()
+    initialize_database()
+
+    job_id = _start_job(
+        source,
+        len(records),
+        mode=mode,
+        remove_missing=remove_missing,
+        payload_digest=_payload_digest(records),
+        target=COVERAGE_REGIONS.name,
+    )
+    return _run_import(
+        job_id,
+        records,
+        mode=mode,
+        remove_missing=remove_missing,
+        checkpoint_row=0,
+        already_inserted=0,
+        timings=timings,
+        batch_size=batch_size or IMPORT_BATCH_SIZE,
+        started=started,
+    )
 
+
+def import_rows(
+    target_name: str,
+    rows: Sequence[Mapping[str, Any]],
+    *,
+    source: str | None = None,
+    mode: str = "insert",
+    starting_row: int = 1,
+    timings: StageTimings | None = None,
+    batch_size: int | None = None,
+) -> ImportSummary:
+    """Import *rows* into the registered target *target_name*.
+
+    Each row maps record field names to values and is checked against the
+    target's schema; the first row of every key wins and later ones are
+    reported as duplicates.  Row numbers in errors count from
+    *starting_row*.  ``"insert"`` reports keys that already exist as errors,
+    ``"upsert"`` overwrites them.  Batching, checkpoints, cancellation and
+    :func:`resume_rows` behave as for :func:`import_coverage_regions`.
+    """
+
+    target = get_import_target(target_name)
+    if mode not in TARGET_IMPORT_MODES:
+        raise ValueError(f"Unknown import mode {mode!r}; expected one of {TARGET_IMPORT_MODES}")
+    if timings is None:
+        timings = new_stage_timings()
+    started = time.perf_counter()
     initialize_database()
-    total_rows = len(records)
-    errors: list[ImportErrorDetail] = []
 
-    with session_scope() as session:
-        log_repository = ImportLogRepository(session)
-        job_id = log_repository.create_job(source, total_rows)
-        log_repository.append_event(job_id, f"Import started with {total_rows} rows")
+    job_id = _start_job(
+        source,
+        len(rows),
+        mode=mode,
+        payload_digest=_rows_digest(rows),
+        target=target.name,
+    )
+    return _run_target_import(
+        job_id,
+        target,
+        rows,
+        mode=mode,
+        starting_row=starting_row,
+        checkpoint_row=0,
+        already_inserted=0,
+        timings=timings,
+        batch_size=batch_size or IMPORT_BATCH_SIZE,
+        started=started,
+    )
+
+
+def _is_resumable(checkpoint: ImportJobCheckpoint) -> bool:
+    if checkpoint.archived:
+        return False  # Its errors now live in an archive file.
+    if checkpoint.status in ("failed", "cancelled"):
+        return True
+    if checkpoint.status != "running":
+        return False
+    live = PROGRESS.get(checkpoint.id)
+    if live is not None and not live.finished:
+        return False  # Still running in this process.
+    if checkpoint.heartbeat_at is None:
+        return True
+    # Running elsewhere keeps the heartbeat fresh; a stale one means the
+    # process running the job died.
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return (now - checkpoint.heartbeat_at).total_seconds() > IMPORT_STALE_AFTER_SECONDS
+
+
+def _reopen(job_id: int, *, target: str, payload_digest: str) -> ImportJobCheckpoint:
+    """Check *job_id* may resume with the given payload and mark it running again."""
+
+    with read_scope() as session:
+        checkpoint = ImportLogRepository(session).fetch_checkpoint(job_id)
+    if checkpoint is None:
+        raise ImportJobNotFoundError(f"Import job {job_id} does not exist.")
+    if checkpoint.target != target:
+        raise ImportJobStateError(f"Import job {job_id} imports into {checkpoint.target}, not {target}.")
+    if not _is_resumable(checkpoint):
+        raise ImportJobStateError(f"Import job {job_id} is {checkpoint.status} and cannot be resumed.")
+    if checkpoint.payload_digest != payload_digest:
+        raise ImportJobStateError("Records differ from the payload the job was started with.")
+
+    def reopen(connection: sqlite3.Connection) -> bool:
+        log_repository = ImportLogRepository(connection)
+        if not log_repository.reopen_job(job_id, expected=checkpoint):
+            return False
+        log_repository.append_event(job_id, f"Import resumed after row {checkpoint.checkpoint_row}")
+        return True
+
+    if not run_write(reopen):
+        raise ImportJobStateError(f"Import job {job_id} was resumed or changed concurrently.")
+    return checkpoint
+
+
+def resume_import(
+    job_id: int,
+    records: Sequence[CoverageRegionCreate],
+    *,
+    timings: StageTimings | None = None,
+    batch_size: int | None = None,
+) -> ImportSummary:
+    """Continue a cancelled, failed or abandoned job from its checkpoint.
+
+    *records* must be the payload the job was started with.  Batches
+    committed before the interruption are skipped; delta jobs simply
+    re-apply their diff, which only contains what is still missing.
+    """
+
+    if timings is None:
+        timings = new_stage_timings()
+    started = time.perf_counter()
+    initialize_database()
+
+    checkpoint = _reopen(job_id, target=COVERAGE_REGIONS.name, payload_digest=_payload_digest(records))
+    return _run_import(
+        job_id,
+        records,
+        mode=checkpoint.mode,
+        remove_missing=checkpoint.remove_missing,
+        checkpoint_row=checkpoint.checkpoint_row,
+        already_inserted=checkpoint.success_count,
+        timings=timings,
+        batch_size=batch_size or IMPORT_BATCH_SIZE,
+        started=started,
+    )
+
+
+def resume_rows(
+    job_id: int,
+    rows: Sequence[Mapping[str, Any]],
+    *,
+    starting_row: int = 1,
+    timings: StageTimings | None = None,
+    batch_size: int | None = None,
+) -> ImportSummary:
+    """Continue an :func:`import_rows` job; *rows* must be its original payload."""
+
+    if timings is None:
+        timings = new_stage_timings()
+    started = time.perf_counter()
+    initialize_database()
+
+    with read_scope() as session:
+        checkpoint = ImportLogRepository(session).fetch_checkpoint(job_id)
+    if checkpoint is None:
+        raise ImportJobNotFoundError(f"Import job {job_id} does not exist.")
+    target = get_import_target(checkpoint.target)
+    checkpoint = _reopen(job_id, target=target.name, payload_digest=_rows_digest(rows))
+    return _run_target_import(
+        job_id,
+        target,
+        rows,
+        mode=checkpoint.mode,
+        starting_row=starting_row,
+        checkpoint_row=checkpoint.checkpoint_row,
+        already_inserted=checkpoint.success_count,
+        timings=timings,
+        batch_size=batch_size or IMPORT_BATCH_SIZE,
+        started=started,
+    )
 
-    normalised, normalisation_errors = _normalise_records(records)
-    errors.extend(normalisation_errors)
 
-    with session_scope() as session:
-        log_repository = ImportLogRepository(session)
+def cancel_import(job_id: int) -> None:
+    """Ask a running job to stop after its current batch."""
+
+    initialize_database()
+
+    def request(connection: sqlite3.Connection) -> bool | None:
+        log_repository = ImportLogRepository(connection)
+        if log_repository.request_cancel(job_id):
+            log_repository.append_event(job_id, "Cancellation requested", level="WARNING")
+            return True
+        return None if log_repository.fetch_checkpoint(job_id) is None else False
+
+    requested = run_write(request)
+    if requested is None:
+        raise ImportJobNotFoundError(f"Import job {job_id} does not exist.")
+    if not requested:
+        raise ImportJobStateError(f"Import job {job_id} is not running.")
+
+
+def _record_normalised(
+    job_id: int,
+    unique_rows: int,
+    errors: Sequence[ImportErrorDetail],
+    *,
+    checkpoint_row: int,
+) -> None:
+    PROGRESS.update(job_id, stage="normalise", rows_validated=unique_rows, rows_failed=len(errors))
+
+    def normalised_event(connection: sqlite3.Connection) -> None:
+        log_repository = ImportLogRepository(connection)
         log_repository.append_event(
             job_id,
-            f"Normalised payload produced {len(normalised)} unique rows with {len(normalisation_errors)} validation errors",
+            f"Normalised payload produced {unique_rows} unique rows with {len(errors)} validation errors",
+        )
+        # Kept ahead of every batch's errors; ignored when already stored.
+        log_repository.save_pending_errors(
+            job_id, 0, [error.to_dict() for error in errors], max_errors=IMPORT_MAX_ERRORS_PER_JOB
         )
 
-    if not normalised:
-        failure_count = len(errors)
-        with session_scope() as session:
-            log_repository = ImportLogRepository(session)
-            log_repository.finalise_job(
+    run_write(normalised_event)
+    if checkpoint_row == 0:
+        IMPORT_ROWS_REJECTED.inc(len(errors))
+
+
+def _execute(
+    job_id: int,
+    persist: Callable[[], tuple[str, ImportDelta | None, list[str]]],
+    *,
+    timings: StageTimings,
+    started: float,
+    rows_read: Callable[[], int] | None = None,
+) -> ImportSummary:
+    """Run *persist* and finalise the job with its ``(status, delta, events)``.
+
+    *rows_read* reports the final row count of streamed payloads.
+    """
+
+    PROGRESS.update(job_id, stage="insert")
+    try:
+        status, delta, events = persist()
+    except Exception as exc:  # pragma: no cover - defensive safety net
+        failure = ImportErrorDetail(message=f"Unexpected error: {exc}", row_number=None, code=None)
+        IMPORT_ROWS_REJECTED.inc()
+        _finalise(
+            job_id,
+            timings,
+            status="failed",
+            errors=[failure],
+            events=[f"Import failed: {exc}"],
+            total_rows=rows_read() if rows_read else None,
+            started=started,
+        )
+        IMPORT_DURATION.observe(time.perf_counter() - started, status="failed")
+        raise
+
+    if status == "cancelled":
+        events.append("Import cancelled; resume it to continue from the last checkpoint")
+    success_count, failure_count, errors = _finalise(
+        job_id,
+        timings,
+        status=status,
+        events=events,
+        total_rows=rows_read() if rows_read else None,
+        started=started,
+    )
+    IMPORT_DURATION.observe(time.perf_counter() - started, status=status)
+
+    return ImportSummary(
+        job_id=job_id,
+        success_count=success_count,
+        failure_count=failure_count,
+        errors=errors,
+        delta=delta,
+        status=status,
+    )
+
+
+def _run_import(
+    job_id: int,
+    records: Sequence[CoverageRegionCreate],
+    *,
+    mode: str,
+    remove_missing: bool,
+    checkpoint_row: int,
+    already_inserted: int,
+    timings: StageTimings,
+    batch_size: int,
+    started: float,
+) -> ImportSummary:
+    with PROGRESS.track(job_id, total_rows=len(records)):
+        with timings.measure("normalise"):
+            normalised, normalisation_errors = _normalise_records(records)
+        _record_normalised(job_id, len(normalised), normalisation_errors, checkpoint_row=checkpoint_row)
+
+        def persist() -> tuple[str, ImportDelta | None, list[str]]:
+            if not normalised:
+                empty = ImportDelta(added=0, changed=0, unchanged=0, removed=0) if mode == "delta" else None
+                return "completed", empty, []
+            if mode == "delta":
+                delta = _persist_delta(job_id, normalised, timings=timings, remove_missing=remove_missing)
+                return ("cancelled", None, []) if delta is None else ("completed", delta, [])
+            return _insert_batches(
                 job_id,
-                success_count=0,
-                failure_count=failure_count,
-                errors=(error.to_dict() for error in errors),
-                status="completed",
+                COVERAGE_REGIONS,
+                _region_rows(normalised),
+                mode="insert",
+                checkpoint_row=checkpoint_row,
+                already_inserted=already_inserted,
+                timings=timings,
+                batch_size=batch_size,
             )
-        return ImportSummary(job_id=job_id, success_count=0, failure_count=failure_count, errors=tuple(errors))
 
-    code_to_record = {record.code: record for record in normalised}
+        return _execute(job_id, persist, timings=timings, started=started)
 
-    try:
-        with session_scope() as session:
-            repository = CoverageRegionRepository(session)
-            log_repository = ImportLogRepository(session)
-
-            existing_codes = repository.fetch_existing_codes(code_to_record.keys())
-            if existing_codes:
-                for code in sorted(existing_codes):
-                    skipped_record = code_to_record.get(code)
-                    errors.append(
-                        ImportErrorDetail(
-                            message="Region code already exists in database.",
-                            row_number=skipped_record.row_number if skipped_record else None,
-                            code=code,
-                        )
-                    )
-                log_repository.append_event(
-                    job_id,
-                    f"Skipped {len(existing_codes)} rows that already exist",
-                )
 
-            pending = [record for record in normalised if record.code not in existing_codes]
-            inserted = repository.bulk_insert(pending)
+def _run_target_import(
+    job_id: int,
+    target: ImportTarget,
+    rows: Sequence[Mapping[str, Any]],
+    *,
+    mode: str,
+    starting_row: int,
+    checkpoint_row: int,
+    already_inserted: int,
+    timings: StageTimings,
+    batch_size: int,
+    started: float,
+) -> ImportSummary:
+    with PROGRESS.track(job_id, total_rows=len(rows)):
+        with timings.measure("normalise"):
+            normalised, normalisation_errors = _normalise_rows(target, rows, starting_row=starting_row)
+        _record_normalised(job_id, len(normalised), normalisation_errors, checkpoint_row=checkpoint_row)
 
-            if inserted < len(pending):
-                errors.append(
-                    ImportErrorDetail(
-                        message="Database constraints prevented inserting some rows.",
-                        row_number=None,
-                        code=None,
-                    )
-                )
-                log_repository.append_event(
-                    job_id,
-                    "One or more rows could not be inserted due to database constraints",
-                    level="WARNING",
-                )
+        def persist() -> tuple[str, ImportDelta | None, list[str]]:
+            return _insert_batches(
+                job_id,
+                target,
+                normalised,
+                mode=mode,
+                checkpoint_row=checkpoint_row,
+                already_inserted=already_inserted,
+                timings=timings,
+                batch_size=batch_size,
+            )
 
-            log_repository.append_event(job_id, f"Inserted {inserted} new rows")
+        return _execute(job_id, persist, timings=timings, started=started)
 
-    except Exception as exc:  # pragma: no cover - defensive safety net
-        errors.append(
+
+def _insert_batches(
+    job_id: int,
+    target: ImportTarget,
+    normalised: Sequence[_TargetRow],
+    **options: Any,
+) -> tuple[str, ImportDelta | None, list[str]]:
+    outcome = _persist_batches(job_id, target, normalised, **options)
+    if outcome is None:
+        return "cancelled", None, []
+    skipped, written = outcome
+    events = [f"Skipped {skipped} rows that already exist"] if skipped else []
+    events.append(f"Upserted {written} rows" if options["mode"] == "upsert" else f"Inserted {written} new rows")
+    return "completed", None, events
+
+
+def _persist_batches(
+    job_id: int,
+    target: ImportTarget,
+    normalised: Sequence[_TargetRow],
+    *,
+    mode: str,
+    checkpoint_row: int,
+    already_inserted: int,
+    timings: StageTimings,
+    batch_size: int,
+) -> tuple[int, int] | None:
+    """Write *normalised* from *checkpoint_row* on, one checkpointed batch per commit.
+
+    Returns ``(skipped, written)`` for this run, or ``None`` when the job
+    was cancelled.
+    """
+
+    skipped = written_total = 0
+    for batch_start in range(checkpoint_row, len(normalised), batch_size):
+        outcome = _write_batch(
+            job_id,
+            target,
+            normalised[batch_start : batch_start + batch_size],
+            batch_start=batch_start,
+            mode=mode,
+            timings=timings,
+        )
+        if outcome is None:
+            return None
+
+        batch_skipped, written = outcome
+        skipped += batch_skipped
+        written_total += written
+        PROGRESS.update(job_id, rows_inserted=already_inserted + written_total)
+
+    return skipped, written_total
+
+
+def _write_batch(
+    job_id: int,
+    target: ImportTarget,
+    batch: Sequence[_TargetRow],
+    *,
+    batch_start: int,
+    mode: str,
+    timings: StageTimings,
+    rejected: Sequence[ImportErrorDetail] = (),
+) -> tuple[int, int] | None:
+    """Commit *batch*, the normalised rows from *batch_start* on, with its checkpoint.
+
+    *rejected* are errors of rows dropped before they reached the batch;
+    they are stored with the batch's own errors.  Returns ``(skipped,
+    written)``, or ``None`` when the job was cancelled.
+    """
+
+    exists_message = f"{target.label} already exists in database."
+
+    def persist(connection: sqlite3.Connection) -> tuple[int, int] | None:
+        repository = ImportTargetRepository(connection, target.spec)
+        log_repository = ImportLogRepository(connection)
+        if log_repository.is_cancel_requested(job_id):
+            return None
+
+        if mode == "upsert":
+            existing: set[tuple[Any, ...]] = set()
+            pending = batch
+            written = repository.bulk_upsert([row.values for row in pending])
+        else:
+            with timings.measure("lookup"):
+                existing = repository.fetch_existing_keys([row.key for row in batch])
+            pending = [row for row in batch if row.key not in existing]
+            written = repository.bulk_insert([row.values for row in pending])
+
+        errors = list(rejected)
+        errors.extend(
             ImportErrorDetail(
-                message=f"Unexpected error: {exc}",
-                row_number=None,
-                code=None,
+                message=exists_message,
+                row_number=row.row_number,
+                code=_key_text(row.key),
             )
+            for row in sorted(batch, key=lambda item: item.key)
+            if row.key in existing
         )
-        with session_scope() as session:
-            log_repository = ImportLogRepository(session)
-            log_repository.append_event(job_id, f"Import failed: {exc}", level="ERROR")
-            log_repository.finalise_job(
+        if written < len(pending):
+            log_repository.append_event(
                 job_id,
-                success_count=0,
-                failure_count=len(errors),
-                errors=(error.to_dict() for error in errors),
-                status="failed",
+                "One or more rows could not be inserted due to database constraints",
+                level="WARNING",
             )
-        raise
+            errors.append(
+                ImportErrorDetail(
+                    message="Database constraints prevented inserting some rows.",
+                    row_number=None,
+                    code=None,
+                )
+            )
+        log_repository.save_checkpoint(
+            job_id,
+            checkpoint_row=batch_start + len(batch),
+            inserted=written,
+            errors=[error.to_dict() for error in errors],
+            batch_start=batch_start + 1,
+            max_errors=IMPORT_MAX_ERRORS_PER_JOB,
+        )
+        IMPORT_ROWS_REJECTED.inc(len(errors))
+        return len(existing), written
+
+    # The insert stage spans the whole write including its group commit.
+    lookup_before = timings.seconds("lookup")
+    insert_started = time.perf_counter()
+    outcome = run_write(persist)
+    timings.add(
+        "insert",
+        time.perf_counter() - insert_started - (timings.seconds("lookup") - lookup_before),
+    )
+    if outcome is not None and outcome[1]:
+        if target.on_write is not None:
+            target.on_write()
+        IMPORT_ROWS_IMPORTED.inc(outcome[1])
+    return outcome
 
-    success_count = inserted
-    failure_count = len(errors)
 
-    with session_scope() as session:
-        log_repository = ImportLogRepository(session)
-        log_repository.finalise_job(
+def _persist_delta(
+    job_id: int,
+    normalised: Sequence[CoverageRegionCreate],
+    *,
+    timings: StageTimings,
+    remove_missing: bool,
+) -> ImportDelta | None:
+    """Write only the rows of *normalised* whose content hash differs.
+
+    Returns ``None`` when the job was cancelled before the write.
+    """
+
+    with timings.measure("normalise"):
+        hashes = {record.code: content_hash(record.name, record.description) for record in normalised}
+
+    def persist(connection: sqlite3.Connection) -> ImportDelta | None:
+        repository = CoverageRegionRepository(connection)
+        log_repository = ImportLogRepository(connection)
+        if log_repository.is_cancel_requested(job_id):
+            return None
+
+        with timings.measure("lookup"):
+            stored = repository.fetch_content_hashes(hashes.keys())
+            removed = sorted(repository.fetch_all_codes() - hashes.keys()) if remove_missing else []
+        added = [record for record in normalised if record.code not in stored]
+        changed = [
+            record
+            for record in normalised
+            if record.code in stored and stored[record.code] != hashes[record.code]
+        ]
+
+        inserted = repository.bulk_insert(added)
+        updated = repository.bulk_update(changed)
+        deleted = repository.delete_codes(removed)
+        errors: list[dict[str, object]] = []
+        if inserted < len(added):
+            log_repository.append_event(
+                job_id,
+                "One or more rows could not be inserted due to database constraints",
+                level="WARNING",
+            )
+            errors.append(ImportErrorDetail(message="Database constraints prevented inserting some rows.").to_dict())
+
+        delta = ImportDelta(
+            added=inserted,
+            changed=updated,
+            unchanged=len(normalised) - len(added) - len(changed),
+            removed=deleted,
+        )
+        log_repository.append_event(
             job_id,
-            success_count=success_count,
-            failure_count=failure_count,
-            errors=(error.to_dict() for error in errors),
-            status="completed",
+            f"Delta applied: {delta.added} added, {delta.changed} changed, "
+            f"{delta.unchanged} unchanged, {delta.removed} removed",
         )
-
-    return ImportSummary(
-        job_id=job_id,
-        success_count=success_count,
-        failure_count=failure_count,
-        errors=tuple(errors),
+        log_repository.save_checkpoint(
+            job_id,
+            checkpoint_row=len(normalised),
+            inserted=delta.added + delta.changed,
+            errors=errors,
+            batch_start=1,
+            max_errors=IMPORT_MAX_ERRORS_PER_JOB,
+        )
+        return delta
+
+    lookup_before = timings.seconds("lookup")
+    insert_started = time.perf_counter()
+    delta = run_write(persist)
+    timings.add(
+        "insert",
+        time.perf_counter() - insert_started - (timings.seconds("lookup") - lookup_before),
     )
+    if delta is None:
+        return None
+    if delta.added or delta.changed or delta.removed:
+        REGION_CODE_CACHE.invalidate()
+    IMPORT_ROWS_IMPORTED.inc(delta.added + delta.changed)
+    PROGRESS.update(job_id, rows_inserted=delta.added + delta.changed)
+    return delta
 
 
 def list_import_jobs(*, page: int, page_size: int) -> ImportHistory:
@@ -251,7 +984,7 @@ def list_import_jobs(*, page: int, page_size: int) -> ImportHistory:
     initialize_database()
     offset = max(page - 1, 0) * page_size
 
-    with session_scope() as session:
+    with read_scope() as session:
         repository = ImportLogRepository(session)
         raw_jobs, total = repository.fetch_jobs(limit=page_size, offset=offset)
 
@@ -274,6 +1007,7 @@ def list_import_jobs(*, page: int, page_size: int) -> ImportHistory:
                 completed_at=job.completed_at,
                 errors=errors,
                 events=events,
+                timings=order_stages(job.timings),
             )
         )
 
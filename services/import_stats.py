@@ -0,0 +1,158 @@
+"""Import statistics answered from the rollup tables.
+
+:meth:`repositories.ImportLogRepository.finalise_job` folds every finished
+job into per-day, per-day-and-source and per-day duration histogram rows.
+:func:`fetch_import_stats` only reads the rows of the requested days, so its
+cost depends on the range and the number of sources, never on how many
+jobs the history holds.  Days are UTC creation dates of the jobs; p95
+durations are read from the histogram and overstate by at most 19%.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Mapping
+
+from database import initialize_database, read_scope
+from repositories import ImportStatsRepository
+from repositories.import_stats import bucket_upper_ms
+
+MAX_STATS_DAYS = 366
+_DEFAULT_DAYS = 30
+
+
+@dataclass(frozen=True, slots=True)
+class DailyImportStats:
+    """Totals of the jobs created on one day."""
+
+    day: date
+    jobs: int
+    completed_jobs: int
+    failed_jobs: int
+    cancelled_jobs: int
+    total_rows: int
+    success_rows: int
+    failure_rows: int
+    average_duration_ms: float
+    p95_duration_ms: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class SourceImportStats:
+    """Totals of one source file over the range."""
+
+    source: str | None
+    jobs: int
+    failed_jobs: int
+    total_rows: int
+    success_rows: int
+    failure_rows: int
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failure_rows / self.total_rows if self.total_rows else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class ImportStats:
+    """Import statistics between two days, both included."""
+
+    first_day: date
+    last_day: date
+    days: tuple[DailyImportStats, ...]
+    sources: tuple[SourceImportStats, ...]
+    p95_duration_ms: float | None
+
+    @property
+    def jobs(self) -> int:
+        return sum(day.jobs for day in self.days)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(day.total_rows for day in self.days)
+
+    @property
+    def failure_rows(self) -> int:
+        return sum(day.failure_rows for day in self.days)
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failure_rows / self.total_rows if self.total_rows else 0.0
+
+
+def _percentile_ms(buckets: Mapping[int, int], fraction: float) -> float | None:
+    total = sum(buckets.values())
+    if total <= 0:
+        return None
+    rank = fraction * total
+    seen = 0
+    for bucket in sorted(buckets):
+        seen += buckets[bucket]
+        if seen >= rank:
+            return round(bucket_upper_ms(bucket), 3)
+    return round(bucket_upper_ms(max(buckets)), 3)
+
+
+def fetch_import_stats(
+    *,
+    first_day: date | None = None,
+    last_day: date | None = None,
+    source_limit: int = 20,
+) -> ImportStats:
+    """Return statistics of the jobs created from *first_day* to *last_day*.
+
+    Defaults to the last 30 days.  Ranges longer than ``MAX_STATS_DAYS``
+    raise ``ValueError``.  Sources are ordered by failure rate.
+    """
+
+    last_day = last_day or datetime.now(timezone.utc).date()
+    first_day = first_day or last_day - timedelta(days=_DEFAULT_DAYS - 1)
+    if first_day > last_day:
+        raise ValueError("The range must not end before it starts.")
+    if (last_day - first_day).days >= MAX_STATS_DAYS:
+        raise ValueError(f"The range must not span more than {MAX_STATS_DAYS} days.")
+
+    initialize_database()
+    first, last = first_day.isoformat(), last_day.isoformat()
+    with read_scope() as session:
+        repository = ImportStatsRepository(session)
+        daily = repository.fetch_daily(first, last)
+        durations = repository.fetch_duration_buckets(first, last)
+        sources = repository.fetch_sources(first, last, limit=source_limit)
+
+    overall: Counter[int] = Counter()
+    for buckets in durations.values():
+        overall.update(buckets)
+
+    return ImportStats(
+        first_day=first_day,
+        last_day=last_day,
+        days=tuple(
+            DailyImportStats(
+                day=date.fromisoformat(row["day"]),
+                jobs=row["jobs"],
+                completed_jobs=row["completed_jobs"],
+                failed_jobs=row["failed_jobs"],
+                cancelled_jobs=row["cancelled_jobs"],
+                total_rows=row["total_rows"],
+                success_rows=row["success_rows"],
+                failure_rows=row["failure_rows"],
+                average_duration_ms=round(row["duration_ms"] / row["jobs"], 3),
+                p95_duration_ms=_percentile_ms(durations.get(row["day"], {}), 0.95),
+            )
+            for row in daily
+        ),
+        sources=tuple(
+            SourceImportStats(
+                source=row["source"] or None,
+                jobs=row["jobs"],
+                failed_jobs=row["failed_jobs"],
+                total_rows=row["total_rows"],
+                success_rows=row["success_rows"],
+                failure_rows=row["failure_rows"],
+            )
+            for row in sources
+        ),
+        p95_duration_ms=_percentile_ms(overall, 0.95),
+    )
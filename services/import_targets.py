@@ -0,0 +1,110 @@
+"""Declarative registry of the tables sheets can be imported into.
+
+An :class:`ImportTarget` names a table, the columns identifying a row, how
+record fields map onto columns and the parser :data:`~services.parser.Schema`
+each record must satisfy.  :func:`services.import_service.import_rows` runs
+any registered target through the same batching, de-duplication,
+checkpointing and job logging as the region import, with the SQL generated
+once per target by :func:`repositories.statements_for`.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+
+from repositories import TableSpec, content_hash
+
+from .code_cache import REGION_CODE_CACHE
+from .parser import Schema
+
+
+class UnknownImportTargetError(LookupError):
+    """Raised when no import target is registered under a name."""
+
+
+@dataclass(frozen=True, slots=True)
+class ImportTarget:
+    """How records of one sheet type are written to their table.
+
+    ``fields`` maps record field names to columns.  ``derived`` adds columns
+    computed from the mapped values, by column name.  ``label`` names the
+    key in error messages (``"Region code is required."``) and ``on_write``
+    runs after every batch that changed the table.
+    """
+
+    name: str
+    table: str
+    key_columns: tuple[str, ...]
+    fields: Mapping[str, str]
+    schema: Schema = field(default_factory=dict)
+    derived: Mapping[str, Callable[[Mapping[str, Any]], Any]] = field(default_factory=dict)
+    label: str = "Key"
+    on_write: Callable[[], None] | None = None
+    spec: TableSpec = field(init=False, repr=False, compare=False)
+    _field_names: tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _derivers: tuple[Callable[[Mapping[str, Any]], Any], ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        columns = (*self.fields.values(), *self.derived)
+        object.__setattr__(self, "spec", TableSpec(self.table, tuple(self.key_columns), tuple(columns)))
+        object.__setattr__(self, "_field_names", tuple(self.fields))
+        object.__setattr__(self, "_derivers", tuple(self.derived.values()))
+
+    def values_of(self, record: Mapping[str, Any]) -> tuple[Any, ...]:
+        """Return *record* as a tuple ordered like ``spec.columns``.
+
+        Strings are stripped and blank values become ``None``.
+        """
+
+        values: list[Any] = []
+        get = record.get
+        for name in self._field_names:
+            value = get(name)
+            if value.__class__ is str:
+                value = value.strip() or None
+            values.append(value)
+        if self._derivers:
+            # Derived columns only see the mapped columns, by column name.
+            mapped = dict(zip(self.spec.columns, values))
+            values.extend(derive(mapped) for derive in self._derivers)
+        return tuple(values)
+
+
+_TARGETS: dict[str, ImportTarget] = {}
+
+
+def register_import_target(target: ImportTarget) -> None:
+    """Register *target* under its name, replacing any previous registration."""
+
+    _TARGETS[target.name] = target
+
+
+def get_import_target(name: str) -> ImportTarget:
+    try:
+        return _TARGETS[name]
+    except KeyError as exc:
+        raise UnknownImportTargetError(f"Unknown import target {name!r}") from exc
+
+
+def import_target_names() -> tuple[str, ...]:
+    return tuple(sorted(_TARGETS))
+
+
+def _required(label: str) -> Callable[[Any], str | None]:
+    def check(value: Any) -> str | None:
+        return None if value is not None and str(value).strip() else f"{label} is required."
+
+    return check
+
+
+COVERAGE_REGIONS = ImportTarget(
+    name="coverage_regions",
+    table="coverage_regions",
+    key_columns=("code",),
+    fields={"code": "code", "name": "name", "description": "description"},
+    schema={"name": _required("Region name")},
+    derived={"content_hash": lambda values: content_hash(values["name"], values["description"])},
+    label="Region code",
+    on_write=REGION_CODE_CACHE.invalidate,
+)
+register_import_target(COVERAGE_REGIONS)
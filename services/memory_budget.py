@@ -0,0 +1,92 @@
+"""Per-job memory budget for streaming imports.
+
+Every file import gets ``IMPORT_JOB_MEMORY_BYTES`` to work with.  A share of
+it (``IMPORT_JOB_DEDUPE_SHARE``) is reserved for duplicate detection, whose
+:class:`~services.dedupe.KeySet` spills to disk under
+:data:`~services.upload_store.TEMP_ROOT` once it is used up.  The rest holds
+the batches between the stage reading the file and the stage writing it:
+a batch is charged when it is queued and released once it is committed, and
+new batches are sized from what is left, so a slow database shrinks batches
+and a full queue stops the reader instead of growing the heap.
+
+Sizes are estimates of the Python objects involved, not measurements; they
+keep peak memory proportional to the budget rather than to the upload.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from typing import Any, Sequence
+
+IMPORT_JOB_MEMORY_BYTES = int(os.getenv("IMPORT_JOB_MEMORY_BYTES", str(256 * 1024 * 1024)))
+IMPORT_JOB_DEDUPE_SHARE = float(os.getenv("IMPORT_JOB_DEDUPE_SHARE", "0.5"))
+# Batches waiting between the reading and the writing stage.
+IMPORT_PIPELINE_DEPTH = max(int(os.getenv("IMPORT_PIPELINE_DEPTH", "2")), 1)
+# Batches never shrink below this, however little budget is left.
+MIN_BATCH_BYTES = 64 * 1024
+# Row wrapper, its key tuple and the list slot holding it in a batch.
+_ROW_OVERHEAD_BYTES = 160
+# A rejected row's error detail with a typical message.
+ERROR_DETAIL_BYTES = 400
+
+
+def estimate_row_bytes(values: Sequence[Any]) -> int:
+    """Approximate memory held by a normalised row with *values*."""
+
+    size = _ROW_OVERHEAD_BYTES + sys.getsizeof(values)
+    for value in values:
+        if value is not None:
+            size += sys.getsizeof(value)
+    return size
+
+
+class MemoryBudget:
+    """Thread-safe account of the bytes one job holds in flight."""
+
+    def __init__(self, limit_bytes: int | None = None, *, dedupe_share: float | None = None):
+        limit = IMPORT_JOB_MEMORY_BYTES if limit_bytes is None else limit_bytes
+        share = IMPORT_JOB_DEDUPE_SHARE if dedupe_share is None else dedupe_share
+        if limit <= 0:
+            raise ValueError("Memory budget must be positive")
+        if not 0 <= share < 1:
+            raise ValueError("Dedupe share must be within [0, 1)")
+        self.limit_bytes = limit
+        self.dedupe_bytes = int(limit * share)
+        self._pool = limit - self.dedupe_bytes
+        self._used = 0
+        self._peak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def used(self) -> int:
+        return self._used
+
+    @property
+    def peak(self) -> int:
+        """Largest number of batch bytes held at once."""
+
+        return self._peak
+
+    @property
+    def remaining(self) -> int:
+        return max(self._pool - self._used, 0)
+
+    def batch_bytes(self, depth: int = IMPORT_PIPELINE_DEPTH) -> int:
+        """Size for the next batch given what is currently in flight.
+
+        The remainder is split between the queued batches, the one being
+        written and the one being built.
+        """
+
+        return max(self.remaining // (depth + 2), MIN_BATCH_BYTES)
+
+    def charge(self, nbytes: int) -> None:
+        with self._lock:
+            self._used += nbytes
+            if self._used > self._peak:
+                self._peak = self._used
+
+    def release(self, nbytes: int) -> None:
+        with self._lock:
+            self._used = max(self._used - nbytes, 0)
@@ -8,51 +8,359 @@ rows and the validation errors.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
-from collections.abc import Sequence
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple, Union
+from collections.abc import Mapping as MappingABC, Sequence
+import codecs
 import csv
+import io
 import json
 import pathlib
+import time
+
+from .timing import DISABLED_TIMINGS, StageTimings, timed_iter
 
 Row = Dict[str, Any]
 Validator = Callable[[Any], Any]
 Schema = Mapping[str, Validator]
+StreamParser = Callable[[TextIO], Iterator[Row]]
+Table = Tuple[Tuple[str, ...], Iterator[Tuple[Any, ...]]]
+TableParser = Callable[[TextIO], Table]
 
 
 @dataclass(frozen=True)
 class ValidationIssue:
-    """Description of a validation failure for a specific field."""
+    """Description of a validation failure for a specific field.
+
+    ``row_number`` is ``None`` for undecodable input that belongs to no row.
+    """
 
-    row_number: int
+    row_number: Optional[int]
     field: str
     reason: str
 
 
+class RowView(MappingABC):
+    """Read-only mapping over one tuple row of a :class:`CompactRows` table.
+
+    Columns missing from a short row read as ``None``, matching the
+    ``restval`` behaviour of ``csv.DictReader``.
+    """
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index: Mapping[str, int], values: Tuple[Any, ...]):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        position = self._index[key]
+        values = self._values
+        return values[position] if position < len(values) else None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"RowView({dict(self)!r})"
+
+
+class CompactRows(Sequence):
+    """Rows stored as value tuples sharing a single header.
+
+    ``header`` lists the column names in file order and ``index`` maps each
+    name to its tuple position.  Indexing returns a :class:`RowView`; use
+    ``values`` directly to avoid even that allocation.
+    """
+
+    __slots__ = ("header", "index", "values")
+
+    def __init__(self, header: Tuple[str, ...], values: Optional[List[Tuple[Any, ...]]] = None):
+        self.header = header
+        self.index: Dict[str, int] = {name: position for position, name in enumerate(header)}
+        self.values: List[Tuple[Any, ...]] = values if values is not None else []
+
+    def __getitem__(self, position):  # type: ignore[override]
+        if isinstance(position, slice):
+            return [RowView(self.index, values) for values in self.values[position]]
+        return RowView(self.index, self.values[position])
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompactRows):
+            return self.header == other.header and self.values == other.values
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(view == row for view, row in zip(self, other))
+        return NotImplemented
+
+    def to_dicts(self) -> List[Row]:
+        """Materialise the rows as plain dictionaries."""
+
+        return [dict(view) for view in self]
+
+
 @dataclass
 class ParseResult:
-    """Structured result of a parsing operation."""
+    """Structured result of a parsing operation.
 
-    rows: List[Row] = field(default_factory=list)
+    ``rows`` holds dictionaries by default, or a :class:`CompactRows` table
+    when parsing was requested with ``compact=True``.
+    """
+
+    rows: Union[List[Row], CompactRows] = field(default_factory=list)
     errors: List[ValidationIssue] = field(default_factory=list)
+    encoding: Optional[str] = None
 
 
 class UnsupportedExtensionError(ValueError):
     """Raised when no parser is registered for the given file extension."""
 
 
+ROW_FIELD = "*"
+"""``ValidationIssue.field`` used for problems affecting the whole row."""
+
+_ENCODING_PROBE_BYTES = 64 * 1024
+_DECODE_CHUNK_BYTES = 64 * 1024
+_UTF8_BOM = codecs.BOM_UTF8
+
+
+def detect_encoding(prefix: bytes, *, final: bool = False) -> Optional[str]:
+    """Guess the encoding of a file from a bounded *prefix* of its bytes.
+
+    A UTF-8 BOM wins, then a strict UTF-8 trial, then GB18030 (a superset of
+    GBK as produced by Chinese Excel exports).  ``None`` is returned while the
+    prefix is pure ASCII and therefore compatible with every candidate; pass
+    ``final=True`` when *prefix* is the complete file.
+    """
+
+    if prefix.startswith(_UTF8_BOM):
+        return "utf-8-sig"
+    if prefix.isascii():
+        return "utf-8" if final else None
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=final)
+    except UnicodeDecodeError:
+        return "gb18030"
+    return "utf-8"
+
+
+class DecodingReader(io.TextIOBase):
+    """Text stream decoding a binary *handle* line by line.
+
+    The encoding is detected from the first ``64 KiB`` unless given.  A pure
+    ASCII prefix defers the decision to the first line containing non-ASCII
+    bytes, so a late GBK section never forces the file to be decoded twice.
+    Undecodable bytes are replaced with U+FFFD and recorded.  Failures in
+    rows read line by line past the first *header_lines* lines belong to a
+    row; consumers call :meth:`take_failure` after each row to learn whether
+    it was affected.  Failures in the header lines, or in text read by
+    :meth:`read` (as JSON is) which does not follow lines, cannot be tied
+    to a row and are collected by :meth:`take_file_failures` instead.
+    """
+
+    def __init__(
+        self,
+        handle: BinaryIO,
+        *,
+        encoding: Optional[str] = None,
+        timings: StageTimings = DISABLED_TIMINGS,
+        header_lines: int = 0,
+    ):
+        self._handle = handle
+        self._timings = timings
+        self._encoding = encoding
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        self._header_lines = header_lines
+        self._pending = ""
+        self._line_number = 0
+        self._failure: Optional[str] = None
+        self._file_failures: List[str] = []
+        self.bytes_consumed = 0
+
+        if encoding is None:
+            if handle.seekable():
+                start = handle.tell()
+                prefix = handle.read(_ENCODING_PROBE_BYTES)
+                handle.seek(start)
+                self._encoding = detect_encoding(prefix, final=len(prefix) < _ENCODING_PROBE_BYTES)
+            else:
+                # Unseekable streams only offer their buffered lookahead.
+                peek = getattr(handle, "peek", None)
+                prefix = peek(_ENCODING_PROBE_BYTES)[:_ENCODING_PROBE_BYTES] if peek else b""
+                self._encoding = detect_encoding(prefix)
+        if self._encoding is not None:
+            self._decoder = codecs.getincrementaldecoder(self._encoding)("strict")
+
+    @property
+    def encoding(self) -> Optional[str]:  # type: ignore[override]
+        return self._encoding
+
+    def readable(self) -> bool:
+        return True
+
+    def take_failure(self) -> Optional[str]:
+        """Return and clear the row decode failure recorded since the last call."""
+
+        failure, self._failure = self._failure, None
+        return failure
+
+    def take_file_failures(self) -> List[str]:
+        """Return and clear the recorded failures that belong to no row."""
+
+        failures, self._file_failures = self._file_failures, []
+        return failures
+
+    def _record_failure(self, reason: str, offset: int, *, by_line: bool) -> None:
+        if not by_line:
+            self._file_failures.append(f"Input {reason} at byte offset {offset}")
+        elif self._line_number < self._header_lines:
+            self._file_failures.append(f"Header line {self._line_number + 1} {reason} (byte offset {offset})")
+        elif self._failure is None:
+            self._failure = f"Line {self._line_number + 1} {reason} (byte offset {offset})"
+
+    def _decode(self, chunk: bytes, *, by_line: bool) -> str:
+        if self._decoder is None:
+            if chunk.isascii():
+                return chunk.decode("ascii")
+            self._encoding = detect_encoding(chunk, final=chunk.endswith(b"\n"))
+            self._decoder = codecs.getincrementaldecoder(self._encoding)("strict")
+        try:
+            return self._decoder.decode(chunk)
+        except UnicodeDecodeError as exc:
+            # ``exc.object`` starts with the bytes the decoder still held from
+            # the previous chunk, so a character split across the boundary
+            # survives; whatever this chunk leaves incomplete is carried on.
+            replacing = codecs.getincrementaldecoder(self._encoding)("replace")
+            text = replacing.decode(exc.object)
+            self._decoder.reset()
+            self._decoder.setstate(replacing.getstate())
+            offset = self.bytes_consumed + len(chunk) - len(exc.object) + exc.start
+            self._record_failure(f"could not be decoded as {self._encoding}", offset, by_line=by_line)
+            return text
+
+    def _read_chunk(self, *, by_line: bool = True) -> str:
+        chunk = self._handle.readline(_DECODE_CHUNK_BYTES)
+        if not chunk:
+            if self._decoder is not None:
+                try:
+                    return self._decoder.decode(b"", final=True)
+                except UnicodeDecodeError as exc:
+                    self._decoder.reset()
+                    self._record_failure(
+                        f"ends with an incomplete {self._encoding} sequence",
+                        self.bytes_consumed - len(exc.object) + exc.start,
+                        by_line=by_line,
+                    )
+                    return "\ufffd"
+            return ""
+        if self._timings.enabled:
+            started = time.perf_counter()
+            text = self._decode(chunk, by_line=by_line)
+            self._timings.add("decode", time.perf_counter() - started)
+        else:
+            text = self._decode(chunk, by_line=by_line)
+        self.bytes_consumed += len(chunk)
+        if chunk.endswith(b"\n"):
+            self._line_number += 1
+        return text
+
+    def readline(self, size: int = -1) -> str:  # type: ignore[override]
+        parts = [self._pending]
+        self._pending = ""
+        while not parts[-1].endswith("\n"):
+            text = self._read_chunk()
+            if not text:
+                break
+            parts.append(text)
+        return "".join(parts)
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            parts = [self._pending]
+            self._pending = ""
+            while True:
+                text = self._read_chunk(by_line=False)
+                if not text:
+                    return "".join(parts)
+                parts.append(text)
+
+        buffered = self._pending
+        while len(buffered) < size:
+            text = self._read_chunk(by_line=False)
+            if not text:
+                break
+            buffered += text
+        self._pending = buffered[size:]
+        return buffered[:size]
+
+    def __next__(self) -> str:
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+
+def parse_stream(
+    handle: BinaryIO,
+    *,
+    filename: str,
+    schema: Optional[Schema] = None,
+    encoding: Optional[str] = None,
+    compact: bool = False,
+    timings: Optional[StageTimings] = None,
+) -> ParseResult:
+    """Parse the binary *handle* while decoding it incrementally.
+
+    Rows are streamed through the parser registered for ``filename``.  A row
+    whose bytes cannot be decoded with the detected encoding is rejected with
+    a single ``ValidationIssue`` on :data:`ROW_FIELD` instead of aborting the
+    whole parse.  Undecodable header lines and JSON text, which belong to no
+    row, are reported without a row number.  ``compact`` behaves as in :func:`parse_data`.  When
+    ``timings`` is given the time spent decoding, parsing and validating is
+    added to its ``decode``, ``parse`` and ``validate`` stages.
+    """
+
+    starting_row = starting_row_for(filename)
+    local = StageTimings() if timings is not None and timings.enabled else DISABLED_TIMINGS
+    started = time.perf_counter()
+    reader = DecodingReader(handle, encoding=encoding, timings=local, header_lines=starting_row - 1)
+    if compact:
+        header, values = iter_table(reader, filename=filename)
+        result = _validate_table(header, timed_iter(values, local, "parse"), schema or {}, starting_row, reader)
+    else:
+        rows = timed_iter(iter_rows(reader, filename=filename), local, "parse")
+        result = _validate_rows(rows, schema or {}, starting_row, reader)
+    result.encoding = reader.encoding
+
+    if local.enabled:
+        elapsed = time.perf_counter() - started
+        producing = local.seconds("parse")
+        timings.add("decode", local.seconds("decode"))
+        timings.add("parse", max(producing - local.seconds("decode"), 0.0))
+        timings.add("validate", max(elapsed - producing, 0.0))
+    return result
+
+
 def parse_data(
-    file_content: str,
+    file_content: Union[str, bytes],
     *,
     filename: str,
     schema: Optional[Schema] = None,
+    compact: bool = False,
 ) -> ParseResult:
     """Parse *file_content* using the parser determined by ``filename``.
 
     Parameters
     ----------
     file_content:
-        The textual content of the uploaded file.  This module operates on text
-        to avoid leaking file handles to consumers.
+        The content of the uploaded file.  Text is parsed as-is; bytes are
+        decoded incrementally by :func:`parse_stream`, detecting UTF-8 (with or
+        without BOM) and GB18030/GBK.  This module never receives file handles
+        from ``parse_data`` callers to avoid leaking them.
     filename:
         The name of the file as provided by the user.  The suffix determines the
         parser that will be used.
@@ -61,6 +369,10 @@ def parse_data(
         accept a value and return ``None``/``True`` when the value is valid.
         Returning a string marks the value as invalid and uses the string as the
         error message.  Returning ``False`` results in a generic error message.
+    compact:
+        Return the accepted rows as a :class:`CompactRows` table of tuples with
+        a shared header instead of one dictionary per row.  Validators run
+        directly against the tuples.
 
     Returns
     -------
@@ -69,12 +381,19 @@ def parse_data(
         ``ParseResult.rows`` and validation errors in ``ParseResult.errors``.
     """
 
+    if isinstance(file_content, (bytes, bytearray)):
+        return parse_stream(io.BytesIO(file_content), filename=filename, schema=schema, compact=compact)
+
     extension = pathlib.Path(filename).suffix.lower()
     try:
         parser, starting_row = _PARSERS[extension]
     except KeyError as exc:  # pragma: no cover - defensive branch
         raise UnsupportedExtensionError(f"Unsupported file extension: {extension}") from exc
 
+    if compact:
+        header, values = iter_table(io.StringIO(file_content, newline=""), filename=filename)
+        return _validate_table(header, values, schema or {}, starting_row)
+
     raw_rows = parser(file_content)
     return _validate_rows(raw_rows, schema or {}, starting_row)
 
@@ -99,40 +418,258 @@ def _parse_json(file_content: str) -> List[Row]:
     return rows
 
 
+def _iter_csv(stream: TextIO) -> Iterator[Row]:
+    for row in csv.DictReader(stream):
+        yield dict(row)
+
+
+def _iter_csv_table(stream: TextIO) -> Table:
+    reader = csv.reader(stream)
+    header: List[str] = []
+    for header in reader:
+        if header:
+            break
+
+    def values() -> Iterator[Tuple[Any, ...]]:
+        for row in reader:
+            # ``csv.DictReader`` skips blank lines; keep row numbers aligned.
+            if row:
+                yield tuple(row)
+
+    return tuple(header), values()
+
+
+def _rows_to_table(rows: Iterable[Row]) -> Table:
+    """Fallback for parsers without a table variant.
+
+    The header is the union of all keys in first-seen order; keys absent from
+    a row read as ``None``.
+    """
+
+    materialised = list(rows)
+    header = tuple(dict.fromkeys(key for row in materialised for key in row))
+    return header, (tuple(row.get(name) for name in header) for row in materialised)
+
+
+_JSON_READ_SIZE = 64 * 1024
+
+
+def _iter_json(stream: TextIO) -> Iterator[Row]:
+    """Yield objects from a JSON array without loading the whole document.
+
+    Elements are decoded one at a time with ``JSONDecoder.raw_decode`` so that
+    only the current element and a read-ahead window are held in memory.
+    """
+
+    decoder = json.JSONDecoder()
+    buffer = stream.read(_JSON_READ_SIZE).lstrip()
+    if not buffer:
+        return
+    if not buffer.startswith("["):
+        # A single top-level object (or garbage) - defer to the full parser.
+        yield from _parse_json(buffer + stream.read())
+        return
+
+    position = 1
+    eof = False
+    while True:
+        # Skip whitespace and separators, refilling the window as needed.
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            chunk = stream.read(_JSON_READ_SIZE)
+            eof = not chunk
+            buffer, position = chunk, 0
+
+        if position >= len(buffer):
+            raise ValueError("JSON array is not terminated")
+        if buffer[position] == "]":
+            return
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = stream.read(_JSON_READ_SIZE)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            if end == len(buffer) and not eof:
+                # Numbers and literals may continue in the next chunk.
+                chunk = stream.read(_JSON_READ_SIZE)
+                eof = not chunk
+                if chunk:
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+            break
+
+        if not isinstance(item, Mapping):
+            raise ValueError("JSON array must contain objects")
+        yield dict(item)
+        position = end
+
+
 _PARSERS: Dict[str, Tuple[Callable[[str], List[Row]], int]] = {
     ".csv": (_parse_csv, 2),
     ".json": (_parse_json, 1),
 }
+_STREAM_PARSERS: Dict[str, StreamParser] = {
+    ".csv": _iter_csv,
+    ".json": _iter_json,
+}
+_TABLE_PARSERS: Dict[str, TableParser] = {
+    ".csv": _iter_csv_table,
+}
 
 
-def register_parser(extension: str, parser: Callable[[str], List[Row]], *, starting_row: int = 1) -> None:
+def register_parser(
+    extension: str,
+    parser: Callable[[str], List[Row]],
+    *,
+    starting_row: int = 1,
+    stream_parser: Optional[StreamParser] = None,
+    table_parser: Optional[TableParser] = None,
+) -> None:
     """Register a parser for *extension* at runtime.
 
     ``extension`` must include the leading ``.``.  Registered parsers override
     existing ones, which allows consumers to provide project-specific parsing
-    logic for formats such as XLSX.
+    logic for formats such as XLSX.  ``stream_parser`` optionally provides an
+    incremental variant used by :func:`iter_rows`; without it, streaming
+    consumers fall back to reading the whole stream into ``parser``.
+    ``table_parser`` likewise provides the ``(header, tuples)`` variant used
+    for ``compact=True`` parsing.
     """
 
     if not extension.startswith('.'):
         raise ValueError("Extension must start with a dot (.)")
     _PARSERS[extension.lower()] = (parser, starting_row)
+    for registry, variant in ((_STREAM_PARSERS, stream_parser), (_TABLE_PARSERS, table_parser)):
+        if variant is not None:
+            registry[extension.lower()] = variant
+        else:
+            registry.pop(extension.lower(), None)
+
+
+def starting_row_for(filename: str) -> int:
+    """Return the row number of the first data row for ``filename``."""
+
+    extension = pathlib.Path(filename).suffix.lower()
+    try:
+        return _PARSERS[extension][1]
+    except KeyError as exc:
+        raise UnsupportedExtensionError(f"Unsupported file extension: {extension}") from exc
+
+
+def iter_rows(stream: TextIO, *, filename: str) -> Iterator[Row]:
+    """Lazily yield raw rows from *stream* using the parser for ``filename``.
+
+    Unlike :func:`parse_data` no validation is performed and the caller may
+    stop consuming at any point, in which case only the data needed for the
+    rows produced so far has been read from ``stream``.
+    """
+
+    extension = pathlib.Path(filename).suffix.lower()
+    stream_parser = _STREAM_PARSERS.get(extension)
+    if stream_parser is not None:
+        return stream_parser(stream)
+    try:
+        parser, _ = _PARSERS[extension]
+    except KeyError as exc:
+        raise UnsupportedExtensionError(f"Unsupported file extension: {extension}") from exc
+    return iter(parser(stream.read()))
+
+
+def iter_table(stream: TextIO, *, filename: str) -> Table:
+    """Return the header and a lazy iterator of value tuples from *stream*."""
+
+    extension = pathlib.Path(filename).suffix.lower()
+    table_parser = _TABLE_PARSERS.get(extension)
+    if table_parser is not None:
+        return table_parser(stream)
+    return _rows_to_table(iter_rows(stream, filename=filename))
 
 
-def _validate_rows(rows: Iterable[Row], schema: Schema, starting_row: int) -> ParseResult:
+def _take_decode_failures(reader: Optional[DecodingReader], errors: List[ValidationIssue]) -> Optional[str]:
+    """Append *reader*'s failures that belong to no row; return the current row's."""
+
+    if reader is None:
+        return None
+    errors.extend(
+        ValidationIssue(row_number=None, field=ROW_FIELD, reason=reason) for reason in reader.take_file_failures()
+    )
+    return reader.take_failure()
+
+
+def _validate_table(
+    header: Tuple[str, ...],
+    values: Iterable[Tuple[Any, ...]],
+    schema: Schema,
+    starting_row: int,
+    reader: Optional[DecodingReader] = None,
+) -> ParseResult:
+    table = CompactRows(header)
+    errors: List[ValidationIssue] = []
+    checks = [(name, validator, table.index.get(name)) for name, validator in schema.items()]
+    accepted = table.values
+
+    for index, row in enumerate(values, start=starting_row):
+        failure = _take_decode_failures(reader, errors)
+        if failure is not None:
+            errors.append(ValidationIssue(row_number=index, field=ROW_FIELD, reason=failure))
+            continue
+
+        row_errors: List[ValidationIssue] = []
+        for field_name, validator, position in checks:
+            if position is None:
+                row_errors.append(ValidationIssue(row_number=index, field=field_name, reason="Missing value"))
+                continue
+            reason = _execute_validator(validator, row[position] if position < len(row) else None)
+            if reason is not None:
+                row_errors.append(ValidationIssue(row_number=index, field=field_name, reason=reason))
+
+        if row_errors:
+            errors.extend(row_errors)
+        else:
+            accepted.append(row)
+
+    _take_decode_failures(reader, errors)
+    return ParseResult(rows=table, errors=errors)
+
+
+def _validate_rows(
+    rows: Iterable[Row],
+    schema: Schema,
+    starting_row: int,
+    reader: Optional[DecodingReader] = None,
+) -> ParseResult:
     parsed_rows: List[Row] = []
     errors: List[ValidationIssue] = []
 
     for index, row in enumerate(rows, start=starting_row):
-        row_errors = _validate_row(row, index, schema)
+        failure = _take_decode_failures(reader, errors)
+        if failure is not None:
+            errors.append(ValidationIssue(row_number=index, field=ROW_FIELD, reason=failure))
+            continue
+        row_errors = validate_row(row, index, schema)
         if row_errors:
             errors.extend(row_errors)
         else:
             parsed_rows.append(row)
 
+    _take_decode_failures(reader, errors)
     return ParseResult(rows=parsed_rows, errors=errors)
 
 
-def _validate_row(row: Row, row_number: int, schema: Schema) -> List[ValidationIssue]:
+def validate_row(row: Mapping[str, Any], row_number: int, schema: Schema) -> List[ValidationIssue]:
+    """Return the issues *schema* finds in *row*; empty when the row is valid."""
+
     issues: List[ValidationIssue] = []
 
     for field_name, validator in schema.items():
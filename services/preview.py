@@ -0,0 +1,203 @@
+"""Cheap, bounded previews of uploaded sheets.
+
+A preview reads only a prefix of the file through the parser registry: the
+first ``limit`` rows are returned verbatim while a reservoir sample of the
+scanned rows is used to infer column types and null ratios.  The amount of
+work is capped by ``max_bytes`` so the response time does not depend on the
+size of the upload.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import random
+import re
+from typing import Any, BinaryIO, Iterable
+
+from . import parser
+
+DEFAULT_PREVIEW_ROWS = 200
+DEFAULT_SAMPLE_SIZE = 1000
+DEFAULT_SCAN_BYTES = 1024 * 1024  # 1 MiB
+
+_TYPE_THRESHOLD = 0.95
+_INTEGER_PATTERN = re.compile(r"^[+-]?\d+$")
+_NUMBER_PATTERN = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+_CODE_PATTERN = re.compile(r"^(?=.*\d)[A-Za-z0-9]+(?:[-_./][A-Za-z0-9]+)*$")
+
+
+@dataclass(frozen=True, slots=True)
+class ColumnProfile:
+    """Inferred characteristics of a single column."""
+
+    name: str
+    inferred_type: str
+    null_ratio: float
+    sample_size: int
+
+
+@dataclass(frozen=True, slots=True)
+class SheetPreview:
+    """Header, leading rows and column profiles for an uploaded sheet."""
+
+    header: tuple[str, ...]
+    rows: tuple[dict[str, Any], ...]
+    columns: tuple[ColumnProfile, ...]
+    rows_scanned: int
+    bytes_read: int
+    total_bytes: int
+    estimated_total_rows: int
+    is_exact: bool
+    encoding: str | None = None
+
+
+def _classify(value: Any) -> str | None:
+    """Return the narrowest type name for *value* or ``None`` when empty."""
+
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    text = str(value).strip()
+    if not text:
+        return None
+    if _INTEGER_PATTERN.match(text):
+        return "integer"
+    if _NUMBER_PATTERN.match(text):
+        return "number"
+    if _CODE_PATTERN.match(text):
+        return "code"
+    return "text"
+
+
+# Each inferred type is also satisfied by the values of the types listed.
+_TYPE_COVERAGE = (
+    ("integer", {"integer"}),
+    ("number", {"integer", "number"}),
+    ("code", {"integer", "code"}),
+    ("boolean", {"boolean"}),
+)
+
+
+def _infer_column(name: str, values: Iterable[Any]) -> ColumnProfile:
+    counts: dict[str, int] = {}
+    total = 0
+    nulls = 0
+    for value in values:
+        total += 1
+        kind = _classify(value)
+        if kind is None:
+            nulls += 1
+            continue
+        counts[kind] = counts.get(kind, 0) + 1
+
+    present = total - nulls
+    inferred = "empty"
+    if present:
+        inferred = "text"
+        for candidate, accepted in _TYPE_COVERAGE:
+            covered = sum(counts.get(kind, 0) for kind in accepted)
+            if covered / present >= _TYPE_THRESHOLD:
+                inferred = candidate
+                break
+
+    return ColumnProfile(
+        name=name,
+        inferred_type=inferred,
+        null_ratio=round(nulls / total, 4) if total else 0.0,
+        sample_size=total,
+    )
+
+
+def preview_sheet(
+    path: Path,
+    *,
+    filename: str | None = None,
+    limit: int = DEFAULT_PREVIEW_ROWS,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    max_bytes: int = DEFAULT_SCAN_BYTES,
+    seed: int | None = None,
+) -> SheetPreview:
+    """Return a bounded preview of the sheet stored at *path*.
+
+    ``filename`` selects the parser and defaults to the name of ``path``.
+    """
+
+    with path.open("rb") as handle:
+        return preview_stream(
+            handle,
+            filename=filename or path.name,
+            total_bytes=path.stat().st_size,
+            limit=limit,
+            sample_size=sample_size,
+            max_bytes=max_bytes,
+            seed=seed,
+        )
+
+
+def preview_stream(
+    handle: BinaryIO,
+    *,
+    filename: str,
+    total_bytes: int,
+    limit: int = DEFAULT_PREVIEW_ROWS,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    max_bytes: int = DEFAULT_SCAN_BYTES,
+    seed: int | None = None,
+) -> SheetPreview:
+    """Return a bounded preview of the sheet readable from *handle*.
+
+    Scanning stops once ``limit`` rows were collected and either ``max_bytes``
+    were read or the end of the stream was reached; rows scanned beyond the
+    first ``limit`` only contribute to the reservoir sample.
+    """
+
+    rng = random.Random(seed)
+    head: list[dict[str, Any]] = []
+    reservoir: list[dict[str, Any]] = []
+    header: dict[str, None] = {}
+    scanned = 0
+    is_exact = False
+
+    reader = parser.DecodingReader(handle)
+    for row in parser.iter_rows(reader, filename=filename):
+        scanned += 1
+        header.update(dict.fromkeys(row))
+        if len(head) < limit:
+            head.append(row)
+        if len(reservoir) < sample_size:
+            reservoir.append(row)
+        else:
+            slot = rng.randrange(scanned)
+            if slot < sample_size:
+                reservoir[slot] = row
+        if len(head) >= limit and reader.bytes_consumed >= max_bytes:
+            break
+    else:
+        is_exact = True
+    bytes_read = reader.bytes_consumed
+
+    if is_exact or not bytes_read:
+        estimated = scanned
+    else:
+        estimated = max(scanned, round(scanned * total_bytes / bytes_read))
+
+    columns = tuple(
+        _infer_column(name, (row.get(name) for row in reservoir)) for name in header
+    )
+
+    return SheetPreview(
+        header=tuple(header),
+        rows=tuple(head),
+        columns=columns,
+        rows_scanned=scanned,
+        bytes_read=bytes_read,
+        total_bytes=total_bytes,
+        estimated_total_rows=estimated,
+        is_exact=is_exact,
+        encoding=reader.encoding,
+    )
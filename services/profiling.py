@@ -0,0 +1,78 @@
+"""Opt-in profiling of individual imports.
+
+Only requests that explicitly ask for it run under ``cProfile``; the profile
+is stored in ``import_job_profiles`` next to the job and can be downloaded
+as a ``pstats`` file (``python -m pstats job-1.prof``, snakeviz, ...) or as a
+plain-text summary.  The job's database writes run on the group-commit
+writer thread; they are profiled separately and merged into the same
+profile, where they appear under :meth:`cProfile.Profile.runcall`.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import marshal
+import pstats
+from typing import Sequence
+
+from database import initialize_database, read_scope
+from repositories import CoverageRegionCreate, ImportLogRepository
+from writer import profile_writes, run_write
+
+from .import_service import ImportSummary, import_coverage_regions
+
+
+def import_coverage_regions_profiled(
+    records: Sequence[CoverageRegionCreate],
+    *,
+    source: str | None = None,
+    mode: str = "insert",
+    remove_missing: bool = False,
+) -> ImportSummary:
+    """Run :func:`import_coverage_regions` under ``cProfile`` and keep the profile."""
+
+    profiler = cProfile.Profile()
+    writes = cProfile.Profile()
+    with profile_writes(writes):
+        summary = profiler.runcall(
+            import_coverage_regions,
+            records,
+            source=source,
+            mode=mode,
+            remove_missing=remove_missing,
+        )
+    stats = pstats.Stats(profiler)
+    writes.create_stats()
+    if writes.stats:  # Empty without group commit; pstats rejects that.
+        stats.add(writes)
+    content = marshal.dumps(stats.stats)  # Same layout as ``Stats.dump_stats``.
+
+    run_write(lambda connection: ImportLogRepository(connection).save_profile(summary.job_id, content))
+    return summary
+
+
+def fetch_import_profile(job_id: int) -> bytes | None:
+    """Return the stored ``pstats`` payload for *job_id*, if any."""
+
+    initialize_database()
+    with read_scope() as session:
+        return ImportLogRepository(session).fetch_profile(job_id)
+
+
+def render_profile_text(content: bytes, *, limit: int = 50) -> str:
+    """Render a stored profile as a cumulative-time ``pstats`` report."""
+
+    output = io.StringIO()
+    stats = pstats.Stats(_StoredProfile(marshal.loads(content)), stream=output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return output.getvalue()
+
+
+class _StoredProfile:
+    """Adapter letting ``pstats.Stats`` load already-collected stats."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        return None
@@ -0,0 +1,146 @@
+"""Live progress of running imports.
+
+Imports publish their counters to a process-local :class:`ProgressHub`.  An
+update only replaces one immutable snapshot under a lock, so publishing is
+cheap enough to do per batch and nothing is written to the database.
+Watchers poll the hub at a bounded rate and only forward snapshots whose
+``version`` changed, which coalesces bursts of updates and lets any number
+of watchers share the same snapshot object.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+import threading
+import time
+from typing import Iterator
+
+from database import initialize_database, read_scope
+from repositories import ImportLogRepository
+
+_RETAIN_FINISHED_SECONDS = 300.0
+
+
+@dataclass(frozen=True, slots=True)
+class ImportProgress:
+    """Point-in-time progress of one import job."""
+
+    job_id: int
+    status: str
+    stage: str
+    total_rows: int
+    rows_parsed: int = 0
+    rows_validated: int = 0
+    rows_inserted: int = 0
+    rows_failed: int = 0
+    version: int = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "running"
+
+    def to_dict(self) -> dict[str, int | str]:
+        return {
+            "jobId": self.job_id,
+            "status": self.status,
+            "stage": self.stage,
+            "totalRows": self.total_rows,
+            "rowsParsed": self.rows_parsed,
+            "rowsValidated": self.rows_validated,
+            "rowsInserted": self.rows_inserted,
+            "rowsFailed": self.rows_failed,
+        }
+
+
+class ProgressHub:
+    """Thread-safe registry of the latest progress snapshot per job."""
+
+    def __init__(self, *, retain_finished: float = _RETAIN_FINISHED_SECONDS):
+        self._retain_finished = retain_finished
+        self._snapshots: dict[int, ImportProgress] = {}
+        self._finished_at: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def start(self, job_id: int, *, total_rows: int) -> None:
+        with self._lock:
+            self._prune()
+            self._snapshots[job_id] = ImportProgress(
+                job_id=job_id,
+                status="running",
+                stage="start",
+                total_rows=total_rows,
+                rows_parsed=total_rows,
+            )
+
+    @contextmanager
+    def track(self, job_id: int, *, total_rows: int) -> Iterator[None]:
+        """Start *job_id* for the block; it is marked failed if left unfinished.
+
+        The import finishes its snapshot itself.  When the block raises
+        before it does, watchers would otherwise see ``running`` forever.
+        """
+
+        self.start(job_id, total_rows=total_rows)
+        try:
+            yield
+        finally:
+            current = self.get(job_id)
+            if current is not None and not current.finished:
+                self.finish(job_id, status="failed", rows_failed=current.rows_failed)
+
+    def update(self, job_id: int, **changes: int | str) -> None:
+        """Replace fields of *job_id*'s snapshot; unknown jobs are ignored."""
+
+        with self._lock:
+            current = self._snapshots.get(job_id)
+            if current is None:
+                return
+            self._snapshots[job_id] = replace(current, version=current.version + 1, **changes)
+
+    def finish(self, job_id: int, *, status: str, rows_failed: int) -> None:
+        self.update(job_id, status=status, stage="finished", rows_failed=rows_failed)
+        with self._lock:
+            if job_id in self._snapshots:
+                self._finished_at[job_id] = time.monotonic()
+
+    def get(self, job_id: int) -> ImportProgress | None:
+        return self._snapshots.get(job_id)
+
+    def _prune(self) -> None:
+        # Caller holds the lock.
+        cutoff = time.monotonic() - self._retain_finished
+        for job_id in [job_id for job_id, finished in self._finished_at.items() if finished < cutoff]:
+            del self._finished_at[job_id]
+            self._snapshots.pop(job_id, None)
+
+
+PROGRESS = ProgressHub()
+
+
+def fetch_import_progress(job_id: int) -> ImportProgress | None:
+    """Return *job_id*'s live progress, or its stored outcome.
+
+    Jobs run by another worker process (or finished long ago) are not in
+    this process's hub; for those the persisted counters are returned.
+    """
+
+    progress = PROGRESS.get(job_id)
+    if progress is not None:
+        return progress
+
+    initialize_database()
+    with read_scope() as session:
+        row = ImportLogRepository(session).fetch_job_counters(job_id)
+    if row is None:
+        return None
+    return ImportProgress(
+        job_id=job_id,
+        status=row["status"],
+        stage="finished" if row["completed_at"] else "running",
+        total_rows=row["total_rows"],
+        rows_parsed=row["total_rows"],
+        rows_inserted=row["success_count"],
+        rows_failed=row["failure_count"],
+        # Changes whenever the stored counters do, so watchers forward it.
+        version=hash((row["status"], row["success_count"], row["failure_count"], row["completed_at"])),
+    )
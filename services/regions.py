@@ -0,0 +1,72 @@
+"""Read access to persisted coverage regions."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import hashlib
+from typing import Collection
+
+from database import initialize_database, read_scope
+from repositories import CoverageRegionRepository
+
+
+@dataclass(frozen=True, slots=True)
+class Region:
+    """Coverage region as exposed to API clients."""
+
+    code: str
+    name: str
+    description: str | None
+    updated_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class RegionPage:
+    """One keyset page of regions.
+
+    ``items`` is ``None`` when the caller already holds the current
+    representation, i.e. one of its ETags matched.
+    """
+
+    etag: str
+    items: tuple[Region, ...] | None
+    next_cursor: str | None = None
+
+
+def region_etag(version: int, *, after: str | None, prefix: str | None, limit: int) -> str:
+    """Return the strong ETag of a page at table *version*."""
+
+    # Query parameters are folded in so a tag never validates another page.
+    query = hashlib.blake2b(repr((after, prefix, limit)).encode("utf-8"), digest_size=6).hexdigest()
+    return f'"regions-{version}-{query}"'
+
+
+def list_regions(
+    *,
+    after: str | None = None,
+    prefix: str | None = None,
+    limit: int = 100,
+    if_none_match: Collection[str] = (),
+) -> RegionPage:
+    """Return the page of regions following *after*, ordered by code.
+
+    The ETag is derived from the ``coverage_regions`` change counter.  When
+    it is listed in *if_none_match* the page is not read at all; otherwise
+    the counter and the rows come from the same snapshot, so the tag always
+    describes the returned rows.
+    """
+
+    initialize_database()
+    with read_scope() as session:
+        repository = CoverageRegionRepository(session)
+        etag = region_etag(repository.fetch_version(), after=after, prefix=prefix, limit=limit)
+        if etag in if_none_match or "*" in if_none_match:
+            return RegionPage(etag=etag, items=None)
+        rows = repository.fetch_page(after=after, prefix=prefix, limit=limit + 1)
+
+    items = tuple(
+        Region(code=row.code, name=row.name, description=row.description, updated_at=row.updated_at)
+        for row in rows[:limit]
+    )
+    next_cursor = items[-1].code if len(rows) > limit else None
+    return RegionPage(etag=etag, items=items, next_cursor=next_cursor)
@@ -0,0 +1,204 @@
+"""Retention, archival and compaction of import history.
+
+Jobs finished more than ``IMPORT_HISTORY_RETAIN_DAYS`` ago are collapsed to
+their summary row: their events and error lists move to gzip-compressed
+JSON-lines archive files and are deleted from the live tables.  The freed
+pages are then handed back with ``PRAGMA incremental_vacuum`` when the
+database uses ``auto_vacuum=INCREMENTAL`` (the default for databases created
+by :func:`database.initialize_database`).
+
+Every step touches a bounded number of jobs and pages and goes through the
+group-commit writer, so the work interleaves with imports instead of
+pausing them.  :class:`RetentionWorker` runs the steps in the background.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import tempfile
+import threading
+
+from database import get_database_path, initialize_database, read_scope
+from repositories import ImportLogRepository
+from writer import run_write
+
+from .idempotency import purge_expired_keys
+from .upload_store import TEMP_ROOT
+
+logger = logging.getLogger(__name__)
+
+_AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+@dataclass(frozen=True, slots=True)
+class RetentionPolicy:
+    """How much import history stays in full and how fast it is compacted."""
+
+    keep_days: int = 30
+    archive_dir: Path | None = None
+    jobs_per_step: int = 200
+    pages_per_step: int = 512
+    interval_seconds: float = 60.0
+
+
+@dataclass(frozen=True, slots=True)
+class RetentionStepResult:
+    """What a single retention step did."""
+
+    archived_jobs: int
+    archive_file: Path | None
+    freed_pages: int
+    purged_keys: int = 0
+
+    @property
+    def idle(self) -> bool:
+        return self.archived_jobs == 0 and self.freed_pages == 0 and self.purged_keys == 0
+
+
+def policy_from_env() -> RetentionPolicy:
+    """Build the policy from ``IMPORT_HISTORY_*`` environment variables."""
+
+    archive_dir = os.getenv("IMPORT_HISTORY_ARCHIVE_DIR")
+    return RetentionPolicy(
+        keep_days=int(os.getenv("IMPORT_HISTORY_RETAIN_DAYS", "30")),
+        archive_dir=Path(archive_dir) if archive_dir else None,
+        jobs_per_step=int(os.getenv("IMPORT_HISTORY_JOBS_PER_STEP", "200")),
+        pages_per_step=int(os.getenv("IMPORT_HISTORY_PAGES_PER_STEP", "512")),
+        interval_seconds=float(os.getenv("IMPORT_HISTORY_RETENTION_INTERVAL_SECONDS", "60")),
+    )
+
+
+def _archive_dir(policy: RetentionPolicy) -> Path:
+    if policy.archive_dir is not None:
+        return policy.archive_dir
+    database_path = get_database_path()
+    if database_path is None:
+        return TEMP_ROOT / "archive"
+    return database_path.resolve().parent / "import-archive"
+
+
+def _write_archive(directory: Path, jobs: list[dict[str, object]]) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"import-jobs-{jobs[0]['id']:09d}-{jobs[-1]['id']:09d}.jsonl.gz"
+    # A unique staging file per step: two workers archiving the same jobs
+    # must not write into each other's file.
+    descriptor, staging = tempfile.mkstemp(dir=directory, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with open(descriptor, "wb") as raw:
+            with gzip.open(raw, "wt", encoding="utf-8") as handle:
+                for job in jobs:
+                    handle.write(json.dumps(job, ensure_ascii=False))
+                    handle.write("\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+        # The rows are only deleted once the archive is durable under its name.
+        os.replace(staging, target)
+    except BaseException:
+        Path(staging).unlink(missing_ok=True)
+        raise
+    return target
+
+
+def archive_expired_jobs(policy: RetentionPolicy, *, now: datetime | None = None) -> tuple[int, Path | None]:
+    """Archive up to ``jobs_per_step`` expired jobs; return the count and file."""
+
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    cutoff = (now - timedelta(days=policy.keep_days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    with read_scope() as session:
+        jobs = ImportLogRepository(session).fetch_archivable_jobs(cutoff, limit=policy.jobs_per_step)
+    if not jobs:
+        return 0, None
+
+    archive_file = _write_archive(_archive_dir(policy), jobs)
+    completed = {int(job["id"]): str(job["completedAt"]) for job in jobs}  # type: ignore[arg-type]
+    archived = run_write(
+        lambda connection: ImportLogRepository(connection).collapse_archived_jobs(completed, str(archive_file))
+    )
+    return archived, archive_file
+
+
+def compact(policy: RetentionPolicy) -> int:
+    """Release up to ``pages_per_step`` free pages; return how many were freed."""
+
+    def release(connection: sqlite3.Connection) -> int:
+        mode = connection.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if _AUTO_VACUUM_MODES.get(mode) != "incremental":
+            return 0
+        before = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        # Through the sqlite3 module each execution frees a single page, so
+        # stepping one page at a time keeps the write short and bounded.
+        for _ in range(min(before, policy.pages_per_step)):
+            connection.execute("PRAGMA incremental_vacuum(1)")
+        return before - connection.execute("PRAGMA freelist_count").fetchone()[0]
+
+    return run_write(release)
+
+
+def auto_vacuum_mode() -> str:
+    """Return the database's ``auto_vacuum`` setting by name.
+
+    Databases created before incremental vacuuming was enabled report
+    ``"none"``; converting them needs a one-off full ``VACUUM`` while the
+    service is idle, which this module deliberately never runs on its own.
+    """
+
+    initialize_database()
+    with read_scope() as session:
+        mode = session.execute("PRAGMA auto_vacuum").fetchone()[0]
+    return _AUTO_VACUUM_MODES.get(mode, str(mode))
+
+
+def run_retention_step(policy: RetentionPolicy, *, now: datetime | None = None) -> RetentionStepResult:
+    """Archive expired jobs, drop expired idempotency keys, then compact, one batch each."""
+
+    initialize_database()
+    archived, archive_file = archive_expired_jobs(policy, now=now)
+    purged = purge_expired_keys(now=now, limit=policy.jobs_per_step)
+    freed = compact(policy)
+    return RetentionStepResult(
+        archived_jobs=archived,
+        archive_file=archive_file,
+        freed_pages=freed,
+        purged_keys=purged,
+    )
+
+
+class RetentionWorker:
+    """Daemon thread running retention steps until there is nothing left to do.
+
+    After a busy step the next one follows shortly, so a backlog drains in
+    many small writes; once a step finds no work the worker sleeps for the
+    policy interval.
+    """
+
+    _BUSY_PAUSE_SECONDS = 0.5
+
+    def __init__(self, policy: RetentionPolicy):
+        self._policy = policy
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="import-history-retention", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                result = run_retention_step(self._policy)
+            except Exception:  # noqa: BLE001 - keep the worker alive; retry next interval
+                logger.exception("Import history retention step failed")
+                result = None
+            pause = self._policy.interval_seconds if result is None or result.idle else self._BUSY_PAUSE_SECONDS
+            self._stop.wait(pause)
@@ -0,0 +1,96 @@
+"""Per-stage wall-clock timings for imports.
+
+Timings are accumulated per stage name and persisted on the import job.  When
+disabled through ``IMPORT_STAGE_TIMINGS=0`` callers receive
+:data:`DISABLED_TIMINGS`, whose methods do nothing, so the instrumented code
+paths cost a single attribute lookup.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager, nullcontext
+import os
+import time
+from typing import ContextManager, Iterable, Iterator, Mapping, TypeVar
+
+T = TypeVar("T")
+
+STAGES = ("decode", "parse", "validate", "normalise", "lookup", "insert", "finalise")
+
+TIMINGS_ENABLED = os.getenv("IMPORT_STAGE_TIMINGS", "1") != "0"
+
+
+class StageTimings:
+    """Accumulates elapsed seconds per stage."""
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._seconds: dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self._seconds[stage] = self._seconds.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def _measure(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+    def measure(self, stage: str) -> ContextManager[None]:
+        return self._measure(stage)
+
+    def seconds(self, stage: str) -> float:
+        return self._seconds.get(stage, 0.0)
+
+    def as_milliseconds(self) -> dict[str, float]:
+        """Return the recorded stages in milliseconds, ordered by :data:`STAGES`."""
+
+        return order_stages({stage: round(seconds * 1000, 3) for stage, seconds in self._seconds.items()})
+
+
+class _DisabledTimings(StageTimings):
+    enabled = False
+
+    def add(self, stage: str, seconds: float) -> None:
+        return None
+
+    def measure(self, stage: str) -> ContextManager[None]:
+        return nullcontext()
+
+
+DISABLED_TIMINGS: StageTimings = _DisabledTimings()
+
+
+def order_stages(timings: Mapping[str, float]) -> dict[str, float]:
+    """Return *timings* ordered by pipeline position, unknown stages last."""
+
+    order = {stage: position for position, stage in enumerate(STAGES)}
+    return {stage: timings[stage] for stage in sorted(timings, key=lambda name: order.get(name, len(STAGES)))}
+
+
+def new_stage_timings() -> StageTimings:
+    """Return a fresh recorder, or the shared no-op one when disabled."""
+
+    return StageTimings() if TIMINGS_ENABLED else DISABLED_TIMINGS
+
+
+def timed_iter(iterable: Iterable[T], timings: StageTimings, stage: str) -> Iterator[T]:
+    """Yield from *iterable*, charging the time spent producing items to *stage*."""
+
+    if not timings.enabled:
+        yield from iterable
+        return
+
+    iterator = iter(iterable)
+    clock = time.perf_counter
+    while True:
+        started = clock()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            timings.add(stage, clock() - started)
+            return
+        timings.add(stage, clock() - started)
+        yield item
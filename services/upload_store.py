@@ -0,0 +1,88 @@
+"""In-memory spool for small uploads.
+
+Uploads below the spool threshold never touch the disk: their bytes are kept
+in a bounded, process-local store keyed by ``fileId`` and handed straight to
+the parser.  When the store runs out of capacity the oldest entries are
+reported as overflow so the caller can persist them before discarding.
+
+Spooled uploads are only visible to the process that received them.  Under
+several server workers a ``fileId`` previewed or imported through another
+worker would not be found, so spooling is off by default when
+``METRICS_MULTIPROC_DIR`` marks a multi-worker deployment, and every upload
+is written under the shared :data:`TEMP_ROOT`.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import tempfile
+import threading
+
+# Root of everything imports keep on local disk: persisted uploads and the
+# scratch files imports spill to when they run out of memory budget.
+TEMP_ROOT = Path(tempfile.gettempdir()) / "sheet-import-demo"
+
+
+@dataclass(frozen=True, slots=True)
+class SpooledUpload:
+    """Upload content held in memory."""
+
+    file_id: str
+    filename: str
+    suffix: str
+    content: bytes
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+class UploadSpool:
+    """Thread-safe, capacity-bounded store of spooled uploads."""
+
+    def __init__(self, capacity_bytes: int):
+        self._capacity = capacity_bytes
+        self._entries: OrderedDict[str, SpooledUpload] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def put(self, upload: SpooledUpload) -> None:
+        with self._lock:
+            previous = self._entries.pop(upload.file_id, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[upload.file_id] = upload
+            self._size += upload.size
+
+    def get(self, file_id: str) -> SpooledUpload | None:
+        with self._lock:
+            return self._entries.get(file_id)
+
+    def discard(self, file_id: str) -> None:
+        with self._lock:
+            upload = self._entries.pop(file_id, None)
+            if upload is not None:
+                self._size -= upload.size
+
+    def overflow(self, incoming_bytes: int) -> list[SpooledUpload]:
+        """Return the oldest entries that must leave to fit *incoming_bytes*.
+
+        The entries stay readable until :meth:`discard` is called so that a
+        concurrent reader never observes a ``fileId`` that is neither in
+        memory nor on disk.
+        """
+
+        with self._lock:
+            excess = self._size + incoming_bytes - self._capacity
+            victims: list[SpooledUpload] = []
+            for upload in self._entries.values():
+                if excess <= 0:
+                    break
+                victims.append(upload)
+                excess -= upload.size
+            return victims
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from services.admission import AdmissionController, AdmissionPolicy, AdmissionRejectedError
+
+
+def _queue_behind(controller: AdmissionController, token: str, nbytes: int, order: list[str], label: str) -> threading.Thread:
+    def run() -> None:
+        with controller.admit(token, nbytes):
+            order.append(label)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while controller.queued(token) == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return thread
+
+
+def test_free_slots_rotate_across_tokens_by_weight() -> None:
+    controller = AdmissionController(
+        AdmissionPolicy(max_running=1, max_running_per_token=1, weights={"heavy": 2})
+    )
+    blocker = controller.admit("other", 0)
+    order: list[str] = []
+    threads = [_queue_behind(controller, "heavy", 0, order, f"heavy-{index}") for index in range(4)]
+    threads += [_queue_behind(controller, "light", 0, order, f"light-{index}") for index in range(2)]
+
+    blocker.release()
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert order == ["heavy-0", "heavy-1", "light-0", "heavy-2", "heavy-3", "light-1"]
+    assert controller.running() == 0
+
+
+def test_interactive_imports_go_before_bulk_ones() -> None:
+    controller = AdmissionController(AdmissionPolicy(max_running=1, interactive_max_bytes=100))
+    blocker = controller.admit("a", 0)
+    order: list[str] = []
+    threads = [
+        _queue_behind(controller, "bulk", 1000, order, "bulk"),
+        _queue_behind(controller, "small", 10, order, "small"),
+    ]
+
+    blocker.release()
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert order == ["small", "bulk"]
+
+
+def test_full_token_queue_is_rejected_with_retry_after() -> None:
+    controller = AdmissionController(
+        AdmissionPolicy(max_running=1, max_queued_per_token=1, queue_timeout_seconds=5)
+    )
+    blocker = controller.admit("team", 0)
+    order: list[str] = []
+    waiting = _queue_behind(controller, "team", 0, order, "queued")
+
+    started = time.monotonic()
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        controller.admit("team", 0)
+    assert time.monotonic() - started < 1
+    assert rejected.value.retry_after >= 1
+
+    # Other tokens still get their own queue.
+    other = _queue_behind(controller, "other", 0, order, "other")
+    blocker.release()
+    waiting.join(timeout=2)
+    other.join(timeout=2)
+    assert sorted(order) == ["other", "queued"]
+
+
+def test_queued_imports_time_out() -> None:
+    controller = AdmissionController(AdmissionPolicy(max_running=1))
+    with controller.admit("a", 0):
+        with pytest.raises(AdmissionRejectedError, match="Timed out"):
+            controller.admit("b", 0, timeout=0.01)
+        assert controller.queued("b") == 0
+    assert controller.running() == 0
+
+
+def test_queue_is_capped_across_tokens() -> None:
+    controller = AdmissionController(AdmissionPolicy(max_running=1, max_queued=2, queue_timeout_seconds=5))
+    blocker = controller.admit("a", 0)
+    order: list[str] = []
+    threads = [_queue_behind(controller, token, 0, order, token) for token in ("b", "c")]
+
+    with pytest.raises(AdmissionRejectedError, match="Too many imports queued"):
+        controller.admit("d", 0)
+    assert controller.queued() == 2
+
+    blocker.release()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert sorted(order) == ["b", "c"]
+    assert controller.queued() == 0
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+import database
+from database import (
+    ReadPoolExhaustedError,
+    configure_database,
+    initialize_database,
+    read_scope,
+    session_scope,
+)
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def _count(connection) -> int:
+    return connection.execute("SELECT COUNT(*) FROM coverage_regions").fetchone()[0]
+
+
+def test_read_scope_sees_one_snapshot_and_rejects_writes() -> None:
+    with read_scope() as reader:
+        before = _count(reader)
+        with session_scope() as writer:
+            writer.execute("INSERT INTO coverage_regions (code, name) VALUES ('CN-1', '北京')")
+        assert _count(reader) == before
+
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            reader.execute("INSERT INTO coverage_regions (code, name) VALUES ('CN-2', '上海')")
+
+    with read_scope() as reader:
+        assert _count(reader) == before + 1
+
+
+def test_read_scope_times_out_when_the_pool_is_exhausted(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(database, "_READ_POOL_SIZE", 1)
+    monkeypatch.setattr(database, "_READ_TIMEOUT_SECONDS", 0.05)
+    configure_database(f"sqlite:///{tmp_path / 'small.db'}")
+    initialize_database()
+
+    with read_scope():
+        with pytest.raises(ReadPoolExhaustedError):
+            with read_scope():
+                pass
+        with read_scope(dedicated=True) as reader:
+            assert _count(reader) == 0
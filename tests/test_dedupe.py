@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from database import configure_database, initialize_database
+from repositories import CoverageRegionCreate
+from services import dedupe, import_coverage_regions, import_file
+from services.dedupe import KeySet
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def test_key_set_spills_to_disk_beyond_its_budget(tmp_path) -> None:
+    with KeySet(memory_bytes=300, directory=tmp_path / "spill") as seen:
+        added = [seen.add(key) for key in ["a", "b", "c", "d", "a", "d", ("d",), (1,), ("1",), (1,)]]
+
+        assert seen.spilled
+        assert list((tmp_path / "spill").iterdir())
+        assert added == [True, True, True, True, False, False, True, True, True, False]
+        assert len(seen) == 7
+
+    assert not list((tmp_path / "spill").iterdir())
+
+
+def test_spilled_dedupe_keeps_first_occurrence_and_row_numbers(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(dedupe, "DEDUPE_MEMORY_BYTES", 0)
+    monkeypatch.setattr(dedupe, "_SPILL_ROOT", tmp_path / "spill")
+    records = [
+        CoverageRegionCreate(code=code, name=f"区域{row}", row_number=row)
+        for row, code in enumerate(["CN-1", "CN-2", " CN-1", "CN-3", "CN-2"], start=2)
+    ]
+
+    summary = import_coverage_regions(records)
+
+    assert summary.success_count == 3
+    assert [(error.row_number, error.code) for error in summary.errors] == [(4, "CN-1"), (6, "CN-2")]
+    assert not list((tmp_path / "spill").iterdir())
+
+
+def test_spilled_dedupe_in_file_imports(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(dedupe, "DEDUPE_MEMORY_BYTES", 0)
+    monkeypatch.setattr(dedupe, "_SPILL_ROOT", tmp_path / "spill")
+    content = io.BytesIO("code,name\nCN-1,北京\nCN-2,上海\nCN-1,重复\n".encode("utf-8"))
+
+    summary = import_file("coverage_regions", content, filename="regions.csv")
+
+    assert summary.success_count == 2
+    assert [(error.row_number, error.message) for error in summary.errors] == [
+        (4, "Duplicate region code in upload payload.")
+    ]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import pytest
+
+from database import configure_database, initialize_database
+from repositories import CoverageRegionCreate
+from services import ImportDelta, dry_run_import, import_coverage_regions, list_import_jobs
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def test_dry_run_reports_summary_without_writing() -> None:
+    import_coverage_regions([CoverageRegionCreate(code="CN-110000", name="北京", row_number=2)])
+
+    summary = dry_run_import(
+        [
+            CoverageRegionCreate(code="CN-110000", name="北京", row_number=2),
+            CoverageRegionCreate(code="CN-310000", name="上海", row_number=3),
+            CoverageRegionCreate(code="CN-310000", name="上海", row_number=4),
+        ],
+        cache_key="upload-1",
+    )
+
+    assert summary.dry_run is True
+    assert summary.job_id is None
+    assert summary.success_count == 1
+    assert [(error.code, error.row_number) for error in summary.errors] == [
+        ("CN-310000", 4),
+        ("CN-110000", 2),
+    ]
+    assert list_import_jobs(page=1, page_size=10).total == 1
+
+
+def test_dry_run_orders_existing_codes_per_batch_like_the_import() -> None:
+    import_coverage_regions(
+        [CoverageRegionCreate(code=code, name=code, row_number=2) for code in ("CN-1", "CN-2", "CN-3", "CN-4")]
+    )
+    records = [
+        CoverageRegionCreate(code=code, name=code, row_number=row)
+        for row, code in enumerate(("CN-4", "CN-9", "CN-1", "CN-3", "CN-2"), start=2)
+    ]
+
+    preview = dry_run_import(records, batch_size=2)
+    summary = import_coverage_regions(records, batch_size=2)
+
+    assert [(error.code, error.row_number) for error in preview.errors] == [
+        ("CN-4", 2),
+        ("CN-1", 4),
+        ("CN-3", 5),
+        ("CN-2", 6),
+    ]
+    assert preview.errors == summary.errors
+    assert preview.success_count == summary.success_count == 1
+
+
+def test_dry_run_cache_is_invalidated_by_imports() -> None:
+    records = [
+        CoverageRegionCreate(code="CN-110000", name="北京", row_number=2),
+        CoverageRegionCreate(code="CN-310000", name="上海", row_number=3),
+    ]
+
+    first = dry_run_import(records, mode="delta", cache_key="upload-1")
+    assert first.delta == ImportDelta(added=2, changed=0, unchanged=0, removed=0)
+
+    import_coverage_regions(records[:1])
+
+    second = dry_run_import(records, mode="delta", cache_key="upload-1")
+    assert second.delta == ImportDelta(added=1, changed=0, unchanged=1, removed=0)
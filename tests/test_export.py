@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import io
+import zipfile
+
+import pytest
+
+from database import configure_database, initialize_database
+from repositories import CoverageRegionCreate
+from services import import_coverage_regions
+from services.export import iter_regions_csv, iter_regions_xlsx
+from services.parser import parse_data
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    import_coverage_regions(
+        [
+            CoverageRegionCreate(code="CN-110000", name="北京", description="重点客户 <A&B>", row_number=2),
+            CoverageRegionCreate(code="CN-310000", name="上海", row_number=3),
+            CoverageRegionCreate(code="US-CA", name="California", row_number=4),
+        ]
+    )
+    yield
+
+
+def test_csv_export_round_trips_through_the_parser() -> None:
+    content = b"".join(iter_regions_csv(prefix="CN-"))
+
+    result = parse_data(content, filename="export.csv")
+
+    assert result.encoding == "utf-8-sig"
+    assert [(row["code"], row["name"], row["description"]) for row in result.rows] == [
+        ("CN-110000", "北京", "重点客户 <A&B>"),
+        ("CN-310000", "上海", ""),
+    ]
+
+
+def test_xlsx_export_streams_a_valid_workbook() -> None:
+    chunks = list(iter_regions_xlsx(prefix="US-"))
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+
+    assert len(chunks) > 1
+    assert "California" in sheet
+    assert "CN-110000" not in sheet
+    assert archive.testzip() is None
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from database import configure_database, initialize_database
+from repositories import CoverageRegionCreate, ImportLogRepository
+from services import dedupe, file_import, import_service, memory_budget
+from services import (
+    ImportJobStateError,
+    import_coverage_regions,
+    import_file,
+    list_import_jobs,
+    resume_file,
+)
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def _csv(*lines: str) -> io.BytesIO:
+    return io.BytesIO(("code,name,description\n" + "\n".join(lines) + "\n").encode("utf-8"))
+
+
+def test_file_rows_are_validated_normalised_and_inserted_in_one_pass() -> None:
+    import_coverage_regions([CoverageRegionCreate(code="CN-1", name="已存在", row_number=2)])
+    content = _csv("CN-1,北京,", " CN-2 , 上海 ,直辖市", "CN-2,重复,", ",缺编码,", "CN-3,,", "CN-4,广州,")
+
+    summary = import_file("coverage_regions", content, filename="regions.csv", batch_size=2)
+
+    assert summary.status == "completed"
+    assert summary.success_count == 2
+    assert [(error.row_number, error.code, error.field, error.message) for error in summary.errors] == [
+        (2, "CN-1", None, "Region code already exists in database."),
+        (4, "CN-2", None, "Duplicate region code in upload payload."),
+        (5, None, None, "Region code is required."),
+        (6, None, "name", "Region name is required."),
+    ]
+    job = list_import_jobs(page=1, page_size=1).items[0]
+    assert job.total_rows == 6
+    assert job.source == "regions.csv"
+    assert job.errors == summary.errors
+
+
+def test_undecodable_rows_are_rejected_with_the_row_field() -> None:
+    content = io.BytesIO("code,name\nCN-1,北京\n".encode("utf-8") + b"CN-2,\xff\xfe\n")
+
+    summary = import_file("coverage_regions", content, filename="regions.csv")
+
+    assert summary.success_count == 1
+    assert [(error.row_number, error.field) for error in summary.errors] == [(3, "*")]
+
+
+def test_cancelled_file_import_resumes_without_repeating_errors(monkeypatch) -> None:
+    lines = [f"CN-{index},区域{index}," for index in range(6)]
+    content = _csv(lines[0], ",缺编码,", *lines[1:], lines[5])
+    original = ImportLogRepository.save_checkpoint
+
+    def cancel_after_first_batch(self, job_id, **kwargs):
+        original(self, job_id, **kwargs)
+        self.request_cancel(job_id)
+
+    monkeypatch.setattr(ImportLogRepository, "save_checkpoint", cancel_after_first_batch)
+    summary = import_file("coverage_regions", content, filename="regions.csv", batch_size=2)
+    assert summary.status == "cancelled"
+    assert summary.success_count == 2
+
+    monkeypatch.setattr(ImportLogRepository, "save_checkpoint", original)
+    with pytest.raises(ImportJobStateError):
+        resume_file(summary.job_id, _csv(*lines), filename="regions.csv")
+
+    content.seek(0)
+    resumed = resume_file(summary.job_id, content, filename="regions.csv", batch_size=2)
+
+    assert resumed.status == "completed"
+    assert resumed.success_count == 6
+    assert [(error.row_number, error.message) for error in resumed.errors] == [
+        (3, "Region code is required."),
+        (9, "Duplicate region code in upload payload."),
+    ]
+
+
+def test_small_memory_budget_shrinks_batches_and_spills_keys(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(memory_budget, "IMPORT_JOB_MEMORY_BYTES", 8 * 1024)
+    monkeypatch.setattr(memory_budget, "MIN_BATCH_BYTES", 1)
+    monkeypatch.setattr(dedupe, "_SPILL_ROOT", tmp_path / "spill")
+    budgets: list[memory_budget.MemoryBudget] = []
+
+    def tracked_budget() -> memory_budget.MemoryBudget:
+        budgets.append(memory_budget.MemoryBudget())
+        return budgets[-1]
+
+    monkeypatch.setattr(file_import, "MemoryBudget", tracked_budget)
+    checkpoints: list[int] = []
+    original = ImportLogRepository.save_checkpoint
+
+    def record(self, job_id, **kwargs):
+        checkpoints.append(kwargs["checkpoint_row"])
+        original(self, job_id, **kwargs)
+
+    monkeypatch.setattr(ImportLogRepository, "save_checkpoint", record)
+    lines = [f"CN-{index},区域{index}," for index in range(300)]
+
+    summary = import_file("coverage_regions", _csv(*lines, "CN-0,重复,"), filename="regions.csv")
+
+    assert summary.success_count == 300
+    assert [(error.row_number, error.code) for error in summary.errors] == [(302, "CN-0")]
+    assert len(checkpoints) > 10
+    assert checkpoints == sorted(checkpoints) and checkpoints[-1] == 300
+    (budget,) = budgets
+    assert budget.used == 0
+    assert budget.peak <= budget.limit_bytes - budget.dedupe_bytes + 1024
+    assert not list((tmp_path / "spill").iterdir())
+
+
+def test_runs_of_rejected_rows_flush_error_only_batches(monkeypatch) -> None:
+    monkeypatch.setattr(memory_budget, "IMPORT_JOB_MEMORY_BYTES", 8 * 1024)
+    monkeypatch.setattr(memory_budget, "MIN_BATCH_BYTES", 1)
+    monkeypatch.setattr(import_service, "IMPORT_MAX_ERRORS_PER_JOB", 50)
+    checkpoints: list[tuple[int, int]] = []
+    original = ImportLogRepository.save_checkpoint
+
+    def record(self, job_id, **kwargs):
+        checkpoints.append((kwargs["checkpoint_row"], len(kwargs["errors"])))
+        original(self, job_id, **kwargs)
+
+    monkeypatch.setattr(ImportLogRepository, "save_checkpoint", record)
+    lines = ["CN-1,北京,", *(f"CN-{index},," for index in range(2, 202)), "CN-202,上海,"]
+
+    summary = import_file("coverage_regions", _csv(*lines), filename="regions.csv")
+
+    assert summary.success_count == 2
+    assert summary.failure_count == 200
+    assert [error.row_number for error in summary.errors] == list(range(3, 53))
+    flushes = [errors for checkpoint_row, errors in checkpoints if checkpoint_row == 1 and errors]
+    assert len(flushes) > 1 and max(flushes) < 200
+    job = list_import_jobs(page=1, page_size=1).items[0]
+    assert (job.failure_count, len(job.errors)) == (200, 50)
+
+
+def test_resume_after_error_only_batches_does_not_repeat_errors(monkeypatch) -> None:
+    monkeypatch.setattr(memory_budget, "IMPORT_JOB_MEMORY_BYTES", 8 * 1024)
+    monkeypatch.setattr(memory_budget, "MIN_BATCH_BYTES", 1)
+    lines = ["CN-1,北京,", *(f"CN-{index},," for index in range(2, 20)), "CN-20,上海,"]
+    original = ImportLogRepository.save_checkpoint
+    saved: list[int] = []
+
+    def cancel_after_three_batches(self, job_id, **kwargs):
+        original(self, job_id, **kwargs)
+        saved.append(kwargs["checkpoint_row"])
+        if len(saved) == 3:
+            self.request_cancel(job_id)
+
+    monkeypatch.setattr(ImportLogRepository, "save_checkpoint", cancel_after_three_batches)
+    summary = import_file("coverage_regions", _csv(*lines), filename="regions.csv")
+    assert summary.status == "cancelled"
+    assert saved == [1, 1, 1]
+
+    monkeypatch.setattr(ImportLogRepository, "save_checkpoint", original)
+    resumed = resume_file(summary.job_id, _csv(*lines), filename="regions.csv")
+
+    assert resumed.success_count == 2
+    assert [error.row_number for error in resumed.errors] == list(range(3, 21))
+
+
+def test_reader_failures_fail_the_job(monkeypatch) -> None:
+    def broken_rows(reader, *, filename):
+        yield {"code": "CN-1", "name": "北京"}
+        raise RuntimeError("corrupt sheet")
+
+    monkeypatch.setattr(file_import, "iter_rows", broken_rows)
+
+    with pytest.raises(RuntimeError, match="corrupt sheet"):
+        import_file("coverage_regions", _csv("CN-1,北京,"), filename="regions.csv")
+
+    assert list_import_jobs(page=1, page_size=1).items[0].status == "failed"
+
+
+def test_batch_size_adapts_to_the_remaining_budget() -> None:
+    budget = memory_budget.MemoryBudget(10 * 1024 * 1024, dedupe_share=0.5)
+    roomy = budget.batch_bytes(depth=2)
+
+    budget.charge(4 * 1024 * 1024)
+
+    assert budget.batch_bytes(depth=2) < roomy
+    budget.charge(4 * 1024 * 1024)
+    assert budget.batch_bytes(depth=2) == memory_budget.MIN_BATCH_BYTES
+    budget.release(8 * 1024 * 1024)
+    assert budget.batch_bytes(depth=2) == roomy and budget.peak == 8 * 1024 * 1024
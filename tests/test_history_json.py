@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from database import configure_database, initialize_database
+from repositories import CoverageRegionCreate
+from services import import_coverage_regions, list_import_jobs
+from services.history_json import render_import_history
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def test_rendered_history_matches_domain_records() -> None:
+    import_coverage_regions([CoverageRegionCreate(code="CN-110000", name="北京", row_number=2)], source="a.csv")
+    import_coverage_regions(
+        [
+            CoverageRegionCreate(code="CN-110000", name="北京", row_number=2),
+            CoverageRegionCreate(code="", name="\"引号\"", row_number=3),
+        ]
+    )
+
+    history = list_import_jobs(page=1, page_size=10)
+    expected = {
+        "page": 1,
+        "pageSize": 10,
+        "total": history.total,
+        "items": [
+            {
+                "id": job.id,
+                "sourceFilename": job.source,
+                "totalRows": job.total_rows,
+                "successCount": job.success_count,
+                "failureCount": job.failure_count,
+                "status": job.status,
+                "createdAt": job.created_at.isoformat(),
+                "completedAt": job.completed_at.isoformat() if job.completed_at else None,
+                "errors": [error.to_dict() for error in job.errors],
+                "events": [
+                    {"level": event.level, "message": event.message, "createdAt": event.created_at.isoformat()}
+                    for event in job.events
+                ],
+                "timings": job.timings,
+            }
+            for job in history.items
+        ],
+    }
+
+    rendered = json.loads(render_import_history(page=1, page_size=10))
+    assert rendered == expected
+    assert rendered["items"][0]["errors"][0]["field"] is None
+
+
+def test_rendered_history_matches_the_response_model() -> None:
+    pytest.importorskip("fastapi")
+    from api.imports_controller import ImportHistoryResponse
+
+    import_coverage_regions(
+        [
+            CoverageRegionCreate(code="CN-110000", name="北京", row_number=2),
+            CoverageRegionCreate(code="CN-110000", name="重复", row_number=3),
+        ],
+        source="a.csv",
+    )
+
+    model = ImportHistoryResponse.from_domain(list_import_jobs(page=1, page_size=10))
+
+    assert json.loads(render_import_history(page=1, page_size=10)) == json.loads(model.json(by_alias=True))
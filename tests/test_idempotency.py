@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import threading
+
+import pytest
+
+from database import configure_database, initialize_database
+from services import idempotency
+from services.idempotency import (
+    IdempotencyClaim,
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+    StoredResponse,
+    abandon_request,
+    begin_request,
+    complete_request,
+    purge_expired_keys,
+    request_digest,
+)
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def test_completed_requests_are_replayed_and_keys_bound_to_their_body() -> None:
+    digest = request_digest({"records": [{"code": "CN-1", "name": "北京"}]})
+    assert digest == request_digest({"records": [{"name": "北京", "code": "CN-1"}]})
+
+    claim = begin_request("POST /imports team", "retry-1", digest)
+    assert isinstance(claim, IdempotencyClaim)
+    complete_request(claim, status_code=201, body='{"jobId": 7}')
+
+    assert begin_request("POST /imports team", "retry-1", digest) == StoredResponse(201, '{"jobId": 7}')
+    with pytest.raises(IdempotencyConflictError):
+        begin_request("POST /imports team", "retry-1", request_digest({"records": []}))
+    # The same key of another caller is unrelated.
+    assert isinstance(begin_request("POST /imports other", "retry-1", digest), IdempotencyClaim)
+
+
+def test_in_flight_duplicates_wait_for_the_first_request() -> None:
+    claim = begin_request("scope", "key", "hash")
+    outcome: list[object] = []
+    duplicate = threading.Thread(target=lambda: outcome.append(begin_request("scope", "key", "hash")))
+    duplicate.start()
+
+    complete_request(claim, status_code=201, body="{}")
+    duplicate.join(timeout=5)
+
+    assert outcome == [StoredResponse(201, "{}")]
+    begin_request("scope", "busy", "hash")
+    with pytest.raises(IdempotencyInProgressError):
+        begin_request("scope", "busy", "hash", wait_seconds=0)
+
+
+def test_abandoned_claims_let_the_retry_run() -> None:
+    claim = begin_request("scope", "key", "hash")
+    abandon_request(claim)
+
+    assert isinstance(begin_request("scope", "key", "hash"), IdempotencyClaim)
+
+
+def test_expired_keys_are_reclaimed_and_purged(monkeypatch) -> None:
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_TTL_SECONDS", 0)
+    claim = begin_request("scope", "old", "hash")
+    complete_request(claim, status_code=201, body="{}")
+
+    assert isinstance(begin_request("scope", "old", "other-hash"), IdempotencyClaim)
+    assert purge_expired_keys(now=datetime.now(timezone.utc) + timedelta(seconds=1)) == 1
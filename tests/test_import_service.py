@@ -4,7 +4,7 @@ import pytest
 
 from database import configure_database, initialize_database
 from repositories import CoverageRegionCreate
-from services import import_coverage_regions, list_import_jobs
+from services import ImportDelta, import_coverage_regions, list_import_jobs
 
 
 @pytest.fixture(autouse=True)
@@ -68,3 +68,49 @@ def test_import_regions_is_idempotent() -> None:
     assert summary_second.errors[0].code == "CN-110000"
     assert "already exists" in summary_second.errors[0].message
 
+
+def test_import_records_stage_timings_on_job() -> None:
+    summary = import_coverage_regions(
+        [CoverageRegionCreate(code="CN-110000", name="北京", row_number=2)],
+        source="coverage.csv",
+    )
+
+    job = list_import_jobs(page=1, page_size=10).items[0]
+
+    assert job.id == summary.job_id
+    assert list(job.timings) == ["normalise", "lookup", "insert", "finalise"]
+    assert all(duration >= 0 for duration in job.timings.values())
+
+
+def test_delta_import_writes_only_changed_rows() -> None:
+    import_coverage_regions(
+        [
+            CoverageRegionCreate(code="CN-110000", name="北京", row_number=2),
+            CoverageRegionCreate(code="CN-310000", name="上海", row_number=3),
+            CoverageRegionCreate(code="CN-440300", name="深圳", row_number=4),
+        ]
+    )
+
+    summary = import_coverage_regions(
+        [
+            CoverageRegionCreate(code="CN-110000", name="北京", row_number=2),
+            CoverageRegionCreate(code="CN-310000", name="上海", description="重点客户数量 86", row_number=3),
+            CoverageRegionCreate(code="CN-510100", name="成都", row_number=4),
+        ],
+        mode="delta",
+        remove_missing=True,
+    )
+
+    assert summary.delta == ImportDelta(added=1, changed=1, unchanged=1, removed=1)
+    assert summary.success_count == 2
+    assert summary.failure_count == 0
+
+    repeat = import_coverage_regions(
+        [
+            CoverageRegionCreate(code="CN-110000", name="北京", row_number=2),
+            CoverageRegionCreate(code="CN-310000", name="上海", description="重点客户数量 86", row_number=3),
+        ],
+        mode="delta",
+    )
+    assert repeat.delta == ImportDelta(added=0, changed=0, unchanged=2, removed=0)
+    assert repeat.success_count == 0
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from database import configure_database, initialize_database, session_scope
+from migrations import v0012_create_import_stats_rollups
+from repositories import CoverageRegionCreate, ImportLogRepository
+from services import fetch_import_stats, import_coverage_regions, resume_import
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def _records(*codes: str) -> list[CoverageRegionCreate]:
+    return [CoverageRegionCreate(code=code, name=f"区域{code}", row_number=index + 2) for index, code in enumerate(codes)]
+
+
+def test_finished_jobs_are_rolled_up_by_day_and_source(monkeypatch) -> None:
+    import_coverage_regions(_records("CN-1", "CN-2"), source="clean.csv")
+    import_coverage_regions(_records("CN-1", "CN-3", "CN-3"), source="dirty.csv")
+
+    # A cancelled and resumed job replaces its first outcome.
+    original = ImportLogRepository.save_checkpoint
+
+    def cancel_after_first_batch(self, job_id, **kwargs):
+        original(self, job_id, **kwargs)
+        self.request_cancel(job_id)
+
+    monkeypatch.setattr(ImportLogRepository, "save_checkpoint", cancel_after_first_batch)
+    records = _records("CN-4", "CN-5", "CN-6")
+    cancelled = import_coverage_regions(records, source="clean.csv", batch_size=1)
+    assert cancelled.status == "cancelled"
+    monkeypatch.setattr(ImportLogRepository, "save_checkpoint", original)
+    resume_import(cancelled.job_id, records, batch_size=1)
+
+    stats = fetch_import_stats()
+
+    (day,) = stats.days
+    assert day.day == datetime.now(timezone.utc).date()
+    assert (day.jobs, day.completed_jobs, day.cancelled_jobs) == (3, 3, 0)
+    assert (day.total_rows, day.success_rows, day.failure_rows) == (8, 6, 2)
+    assert day.p95_duration_ms is not None and day.p95_duration_ms > 0
+    assert stats.p95_duration_ms == day.p95_duration_ms
+    assert [(source.source, source.jobs, source.total_rows, source.failure_rows) for source in stats.sources] == [
+        ("dirty.csv", 1, 3, 2),
+        ("clean.csv", 2, 5, 0),
+    ]
+    assert stats.failure_rate == pytest.approx(2 / 8)
+
+
+def test_ranges_filter_days_and_are_bounded() -> None:
+    import_coverage_regions(_records("CN-1"), source="regions.csv")
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+
+    stats = fetch_import_stats(first_day=yesterday, last_day=yesterday)
+
+    assert stats.days == () and stats.sources == () and stats.p95_duration_ms is None
+    with pytest.raises(ValueError):
+        fetch_import_stats(first_day=yesterday - timedelta(days=400), last_day=yesterday)
+
+
+def test_migration_backfills_jobs_finished_before_the_rollups() -> None:
+    with session_scope() as session:
+        session.execute(
+            """
+            INSERT INTO import_jobs (source, total_rows, success_count, failure_count, status, created_at, completed_at)
+            VALUES ('legacy.csv', 10, 7, 3, 'completed', '2024-03-01 10:00:00', '2024-03-01 10:00:02')
+            """
+        )
+        v0012_create_import_stats_rollups.upgrade(session)
+        v0012_create_import_stats_rollups.upgrade(session)  # Idempotent.
+
+    day = datetime(2024, 3, 1).date()
+    stats = fetch_import_stats(first_day=day, last_day=day)
+
+    assert [(item.jobs, item.total_rows, item.failure_rows, item.average_duration_ms) for item in stats.days] == [
+        (1, 10, 3, 2000.0)
+    ]
+    assert 2000 <= stats.p95_duration_ms < 2000 * 1.19
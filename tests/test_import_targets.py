@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import pytest
+
+from database import configure_database, initialize_database, read_scope
+from repositories import statements_for
+from services import (
+    ImportTarget,
+    UnknownImportTargetError,
+    get_import_target,
+    import_rows,
+    register_import_target,
+)
+from writer import run_write
+
+OUTLETS = ImportTarget(
+    name="outlets",
+    table="outlets",
+    key_columns=("region_code", "outlet_no"),
+    fields={"region": "region_code", "number": "outlet_no", "name": "name"},
+    schema={"name": lambda value: bool(value)},
+    label="Outlet",
+)
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    run_write(
+        lambda connection: connection.execute(
+            """
+            CREATE TABLE outlets (
+                region_code TEXT NOT NULL,
+                outlet_no TEXT NOT NULL,
+                name TEXT NOT NULL,
+                PRIMARY KEY (region_code, outlet_no)
+            )
+            """
+        )
+    )
+    register_import_target(OUTLETS)
+    yield
+
+
+def _outlets() -> list[tuple]:
+    with read_scope() as session:
+        return [tuple(row) for row in session.execute("SELECT * FROM outlets ORDER BY region_code, outlet_no")]
+
+
+def test_composite_keys_are_validated_deduplicated_and_checked_against_the_table() -> None:
+    import_rows("outlets", [{"region": "CN-1", "number": "7", "name": "旧店"}])
+
+    summary = import_rows(
+        "outlets",
+        [
+            {"region": "CN-1", "number": "7", "name": "已存在"},
+            {"region": " CN-1 ", "number": "8", "name": "新店"},
+            {"region": "CN-1", "number": "8", "name": "重复"},
+            {"region": "CN-2", "number": "", "name": "缺编号"},
+            {"region": "CN-2", "number": "1"},
+        ],
+        starting_row=2,
+        batch_size=2,
+    )
+
+    assert summary.success_count == 1
+    assert sorted((error.row_number, error.code, error.field, error.message) for error in summary.errors) == [
+        (2, "CN-1/7", None, "Outlet already exists in database."),
+        (4, "CN-1/8", None, "Duplicate outlet in upload payload."),
+        (5, None, None, "Outlet is required."),
+        (6, None, "name", "Missing value"),
+    ]
+    assert _outlets() == [("CN-1", "7", "旧店"), ("CN-1", "8", "新店")]
+
+
+def test_upsert_overwrites_existing_rows() -> None:
+    import_rows("outlets", [{"region": "CN-1", "number": "7", "name": "旧店"}])
+
+    summary = import_rows(
+        "outlets",
+        [{"region": "CN-1", "number": "7", "name": "改名"}, {"region": "CN-1", "number": "9", "name": "新店"}],
+        mode="upsert",
+    )
+
+    assert summary.success_count == 2
+    assert summary.errors == ()
+    assert _outlets() == [("CN-1", "7", "改名"), ("CN-1", "9", "新店")]
+
+
+def test_statements_are_generated_once_per_target() -> None:
+    statements = statements_for(OUTLETS.spec)
+
+    assert statements_for(get_import_target("outlets").spec) is statements
+    assert "ON CONFLICT(region_code, outlet_no) DO UPDATE SET name = excluded.name" in statements.upsert
+    with pytest.raises(UnknownImportTargetError):
+        get_import_target("quotas")
+
+
+def test_region_rows_import_through_the_registered_target() -> None:
+    summary = import_rows("coverage_regions", [{"code": "CN-1", "name": "北京"}, {"code": "CN-2"}])
+
+    assert summary.success_count == 1
+    with read_scope() as session:
+        row = session.execute("SELECT code, name, content_hash FROM coverage_regions").fetchone()
+    assert row["code"] == "CN-1" and row["content_hash"]
+
+
+def test_upserting_existing_rows_counts_each_row_once() -> None:
+    rows = [{"code": "CN-1", "name": "北京"}, {"code": "CN-2", "name": "上海"}]
+    import_rows("coverage_regions", rows)
+
+    summary = import_rows("coverage_regions", [{**row, "name": row["name"] + "市"} for row in rows], mode="upsert")
+
+    assert summary.success_count == 2
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import time
+
+import metrics
+from metrics import Registry
+
+
+def test_render_prometheus_text_format():
+    registry = Registry()
+    rows = registry.counter("rows_total", "Rows seen.")
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+
+    rows.inc(3)
+    latency.observe(0.05, route="/imports/")
+    latency.observe(0.5, route="/imports/")
+    latency.observe(5, route="/imports/")
+
+    text = registry.render()
+
+    assert "# TYPE rows_total counter\nrows_total 3\n" in text
+    assert 'latency_seconds_bucket{route="/imports/",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/imports/",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/imports/",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/imports/"} 3' in text
+    assert 'latency_seconds_sum{route="/imports/"} 5.55' in text
+
+
+def test_multiprocess_snapshots_are_summed(tmp_path):
+    first = Registry(str(tmp_path))
+    second = Registry(str(tmp_path))
+    for registry in (first, second):
+        registry.counter("rows_total", "Rows seen.").inc(2)
+
+    # Simulate two workers by giving the second snapshot another file name.
+    second.flush(force=True)
+    (tmp_path / next(p.name for p in tmp_path.glob("metrics-*.json"))).rename(tmp_path / "metrics-other.json")
+
+    assert "rows_total 4\n" in first.render()
+
+
+def test_flusher_publishes_without_requests_and_on_stop(monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "_FLUSH_INTERVAL_SECONDS", 0.01)
+    registry = Registry(str(tmp_path))
+    rows = registry.counter("rows_total", "Rows seen.")
+
+    registry.start_flushing()
+    rows.inc(2)
+    try:
+        for _ in range(500):
+            files = list(tmp_path.glob("metrics-*.json"))
+            if files and '"samples": [[[], 2]]' in files[0].read_text(encoding="utf-8"):
+                break
+            time.sleep(0.01)
+        else:
+            raise AssertionError("the flusher never published the snapshot")
+    finally:
+        rows.inc(1)
+        registry.stop_flushing()
+
+    assert '"samples": [[[], 3]]' in files[0].read_text(encoding="utf-8")
@@ -1,6 +1,8 @@
+import io
+
 import pytest
 
-from services import parser
+from services import StageTimings, parser
 
 
 def _non_empty(value):
@@ -73,3 +75,119 @@ def test_register_parser_override():
 
     assert result.rows == [{"name": "Override"}]
     assert result.errors == []
+
+
+@pytest.mark.parametrize(
+    ("content", "encoding"),
+    [
+        ("name,age\n北京,30\n".encode("gbk"), "gb18030"),
+        ("\ufeffname,age\n北京,30\n".encode("utf-8"), "utf-8-sig"),
+        ("name,age\n北京,30\n".encode("utf-8"), "utf-8"),
+    ],
+)
+def test_parse_bytes_detects_encoding(content, encoding):
+    result = parser.parse_data(content, filename="people.csv")
+
+    assert result.encoding == encoding
+    assert result.rows == [{"name": "北京", "age": "30"}]
+
+
+def test_parse_bytes_defers_encoding_past_ascii_prefix():
+    content = ("name,age\n" + "Alice,30\n" * 20000 + "北京,31\n").encode("gbk")
+
+    result = parser.parse_data(content, filename="people.csv", schema={"age": _positive_integer})
+
+    assert result.encoding == "gb18030"
+    assert result.errors == []
+    assert result.rows[-1] == {"name": "北京", "age": "31"}
+
+
+def test_parse_bytes_reports_late_undecodable_row():
+    content = ("name,age\n" + "北京,30\n" * 10000).encode("utf-8") + b"\xff\xfe,31\n" + b"Bob,32\n"
+
+    result = parser.parse_data(content, filename="people.csv")
+
+    assert result.encoding == "utf-8"
+    assert len(result.rows) == 10001
+    assert result.rows[-1] == {"name": "Bob", "age": "32"}
+    assert [(e.row_number, e.field) for e in result.errors] == [(10002, parser.ROW_FIELD)]
+    assert "could not be decoded as utf-8" in result.errors[0].reason
+
+
+def test_parse_bytes_reports_undecodable_header_and_json_by_offset():
+    csv_result = parser.parse_stream(
+        io.BytesIO(b"na\xffme,age\n" + "北京,30\n".encode("utf-8")), filename="people.csv", encoding="utf-8"
+    )
+    json_result = parser.parse_stream(
+        io.BytesIO('[{"name": "北京"}, {"name": "'.encode("utf-8") + b"\xff" + b'"}, {"name": "Bob"}]'),
+        filename="people.json",
+        encoding="utf-8",
+    )
+
+    assert csv_result.rows == [{"na\ufffdme": "北京", "age": "30"}]
+    assert [(e.row_number, e.reason) for e in csv_result.errors] == [
+        (None, "Header line 1 could not be decoded as utf-8 (byte offset 2)")
+    ]
+    assert [row["name"] for row in json_result.rows] == ["北京", "\ufffd", "Bob"]
+    assert [(e.row_number, e.reason) for e in json_result.errors] == [
+        (None, "Input could not be decoded as utf-8 at byte offset 31")
+    ]
+
+
+def test_undecodable_chunk_keeps_character_split_across_chunks():
+    # The reader decodes at most 64 KiB at a time; put "中" across the first
+    # boundary and an invalid byte right after it.
+    prefix = b'[{"name": "'
+    content = prefix + b"a" * (65535 - len(prefix)) + "中".encode("utf-8") + b'\xff"}]'
+
+    result = parser.parse_data(content, filename="people.json")
+
+    assert result.rows[0]["name"].endswith("a中\ufffd")
+    assert [e.reason for e in result.errors] == ["Input could not be decoded as utf-8 at byte offset 65538"]
+
+
+def test_parse_csv_compact_rows_share_header():
+    csv_content = """name,age\nAlice,30\nBob,\n\n,27\nCarol\n"""
+
+    result = parser.parse_data(
+        csv_content,
+        filename="people.csv",
+        schema={"name": _non_empty},
+        compact=True,
+    )
+
+    assert isinstance(result.rows, parser.CompactRows)
+    assert result.rows.header == ("name", "age")
+    assert result.rows.values == [("Alice", "30"), ("Bob", ""), ("Carol",)]
+    assert result.rows == [
+        {"name": "Alice", "age": "30"},
+        {"name": "Bob", "age": ""},
+        {"name": "Carol", "age": None},
+    ]
+    assert result.rows[2]["age"] is None
+    assert [e.row_number for e in result.errors] == [4]
+
+
+def test_parse_bytes_compact_matches_dict_rows():
+    content = "name,age\n北京,30\n上海,x\n".encode("gbk")
+    schema = {"age": _positive_integer}
+
+    compact = parser.parse_data(content, filename="people.csv", schema=schema, compact=True)
+    regular = parser.parse_data(content, filename="people.csv", schema=schema)
+
+    assert compact.rows.to_dicts() == regular.rows
+    assert compact.errors == regular.errors
+    assert compact.encoding == regular.encoding == "gb18030"
+
+
+def test_parse_stream_records_stage_timings():
+    timings = StageTimings()
+
+    parser.parse_stream(
+        io.BytesIO("name,age\nAlice,30\n".encode("utf-8")),
+        filename="people.csv",
+        schema={"age": _positive_integer},
+        timings=timings,
+    )
+
+    assert set(timings.as_milliseconds()) == {"decode", "parse", "validate"}
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+
+from services import preview_sheet
+
+
+def test_preview_reads_prefix_and_estimates_total(tmp_path):
+    path = tmp_path / "regions.csv"
+    lines = ["code,name,customers"]
+    lines += [f"CN-{index:06d},区域{index},{index}" for index in range(50000)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    preview = preview_sheet(path, limit=50, sample_size=100, max_bytes=256 * 1024, seed=1)
+
+    assert preview.header == ("code", "name", "customers")
+    assert len(preview.rows) == 50
+    assert preview.rows[0] == {"code": "CN-000000", "name": "区域0", "customers": "0"}
+    assert not preview.is_exact
+    assert preview.bytes_read < preview.total_bytes
+    assert 40000 < preview.estimated_total_rows < 60000
+    assert {column.name: column.inferred_type for column in preview.columns} == {
+        "code": "code",
+        "name": "text",
+        "customers": "integer",
+    }
+
+
+def test_preview_reports_null_ratio_for_small_json(tmp_path):
+    path = tmp_path / "regions.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"code": "CN-110000", "description": "重点客户"},
+                {"code": "CN-310000", "description": ""},
+                {"code": "CN-440300", "description": None},
+                {"code": "CN-510100", "description": "重点客户"},
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    preview = preview_sheet(path)
+
+    assert preview.is_exact
+    assert preview.estimated_total_rows == 4
+    description = next(column for column in preview.columns if column.name == "description")
+    assert description.null_ratio == 0.5
+    assert description.inferred_type == "text"
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import pytest
+
+from database import configure_database, initialize_database
+from repositories import CoverageRegionCreate
+from services.profiling import fetch_import_profile, import_coverage_regions_profiled, render_profile_text
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def test_profiled_import_stores_profile_next_to_job() -> None:
+    summary = import_coverage_regions_profiled(
+        [CoverageRegionCreate(code="CN-110000", name="北京", row_number=2)],
+        source="coverage.csv",
+    )
+
+    assert summary.success_count == 1
+    content = fetch_import_profile(summary.job_id)
+    assert content
+    report = render_profile_text(content)
+    assert "import_coverage_regions" in report
+    # Run by the writer thread on the job's behalf.
+    assert "finalise_job" in report
+    assert fetch_import_profile(summary.job_id + 1) is None
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from database import configure_database, initialize_database
+from repositories import CoverageRegionCreate
+from services import import_coverage_regions
+from services import import_service
+from services.progress import PROGRESS, ProgressHub, fetch_import_progress
+
+REGIONS = [
+    CoverageRegionCreate(code="CN-110000", name="北京", row_number=2),
+    CoverageRegionCreate(code="CN-310000", name="上海", row_number=3),
+]
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def test_hub_coalesces_updates_into_one_snapshot() -> None:
+    hub = ProgressHub()
+    hub.start(7, total_rows=100)
+    first = hub.get(7)
+
+    hub.update(7, stage="insert", rows_inserted=10)
+    hub.update(7, rows_inserted=20)
+    hub.update(99, rows_inserted=1)
+
+    latest = hub.get(7)
+    assert latest.version == first.version + 2
+    assert (latest.stage, latest.rows_inserted) == ("insert", 20)
+    assert hub.get(99) is None
+
+    hub.finish(7, status="completed", rows_failed=3)
+    assert hub.get(7).finished
+
+
+def test_import_publishes_final_progress() -> None:
+    summary = import_coverage_regions(
+        [
+            CoverageRegionCreate(code="CN-110000", name="北京", row_number=2),
+            CoverageRegionCreate(code="CN-110000", name="北京", row_number=3),
+            CoverageRegionCreate(code="CN-310000", name="上海", row_number=4),
+        ]
+    )
+
+    progress = fetch_import_progress(summary.job_id)
+
+    assert progress.status == "completed"
+    assert progress.stage == "finished"
+    assert (progress.rows_parsed, progress.rows_validated, progress.rows_inserted, progress.rows_failed) == (3, 2, 2, 1)
+    assert fetch_import_progress(10_000) is None
+
+
+def test_import_failing_before_it_finishes_marks_progress_failed(monkeypatch) -> None:
+    jobs: list[int] = []
+
+    def broken(job_id: int, *args, **kwargs) -> None:
+        jobs.append(job_id)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(import_service, "_record_normalised", broken)
+
+    with pytest.raises(RuntimeError):
+        import_coverage_regions(REGIONS)
+
+    progress = PROGRESS.get(jobs[0])
+    assert (progress.status, progress.stage) == ("failed", "finished")
+
+
+def test_progress_stream_follows_import_running_in_another_thread(monkeypatch) -> None:
+    pytest.importorskip("fastapi")
+    from api.imports_controller import _progress_events
+
+    started = threading.Event()
+    release = threading.Event()
+    jobs: list[int] = []
+    execute = import_service._execute
+
+    def paused(job_id: int, *args, **kwargs):
+        jobs.append(job_id)
+        started.set()
+        assert release.wait(10)
+        return execute(job_id, *args, **kwargs)
+
+    async def follow(job_id: int) -> list[str]:
+        statuses: list[str] = []
+        async for event in _progress_events(job_id, PROGRESS.get(job_id)):
+            for line in event.decode("utf-8").splitlines():
+                if line.startswith("data: "):
+                    statuses.append(json.loads(line[len("data: "):])["status"])
+                    release.set()
+        return statuses
+
+    monkeypatch.setattr(import_service, "_execute", paused)
+    worker = threading.Thread(target=import_coverage_regions, args=(REGIONS,))
+    worker.start()
+    try:
+        assert started.wait(10)
+        statuses = asyncio.run(asyncio.wait_for(follow(jobs[0]), 10))
+    finally:
+        release.set()
+        worker.join(10)
+
+    assert statuses[0] == "running"
+    assert statuses[-1] == "completed"
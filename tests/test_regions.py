@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+from database import configure_database, initialize_database, session_scope
+from repositories import CoverageRegionCreate
+from services import import_coverage_regions, list_regions
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    import_coverage_regions(
+        [
+            CoverageRegionCreate(code=code, name=code, row_number=index)
+            for index, code in enumerate(["CN-110000", "CN-310000", "CN-440300", "US-CA"], start=2)
+        ]
+    )
+    yield
+
+
+def test_regions_are_paginated_by_code() -> None:
+    first = list_regions(prefix="CN-", limit=2)
+    assert [item.code for item in first.items] == ["CN-110000", "CN-310000"]
+    assert first.next_cursor == "CN-310000"
+
+    second = list_regions(prefix="CN-", after=first.next_cursor, limit=2)
+    assert [item.code for item in second.items] == ["CN-440300"]
+    assert second.next_cursor is None
+
+
+def test_etag_changes_only_when_the_table_changes() -> None:
+    page = list_regions(limit=10)
+
+    assert list_regions(limit=10, if_none_match={page.etag}).items is None
+    assert list_regions(limit=5, if_none_match={page.etag}).items is not None
+
+    with session_scope() as session:
+        session.execute("UPDATE coverage_regions SET name = 'Beijing' WHERE code = 'CN-110000'")
+
+    refreshed = list_regions(limit=10, if_none_match={page.etag})
+    assert refreshed.items is not None
+    assert refreshed.etag != page.etag
+
+    import_coverage_regions([CoverageRegionCreate(code="CN-510100", name="成都", row_number=2)])
+    assert list_regions(limit=10, if_none_match={refreshed.etag}).items is not None
+
+
+def test_prefixes_ending_in_the_last_code_points_are_bounded() -> None:
+    import_coverage_regions(
+        [
+            CoverageRegionCreate(code=code, name=code, row_number=index)
+            for index, code in enumerate(["X-\ud7ff1", "X-", "Y-\U0010ffff1", "Z"], start=2)
+        ]
+    )
+
+    assert [item.code for item in list_regions(prefix="X-\ud7ff", limit=10).items] == ["X-\ud7ff1"]
+    assert [item.code for item in list_regions(prefix="Y-\U0010ffff", limit=10).items] == ["Y-\U0010ffff1"]
+    assert list_regions(prefix="\U0010ffff", limit=10).items == ()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import pytest
+
+from database import configure_database, initialize_database
+from repositories import CoverageRegionCreate, ImportLogRepository, ImportTargetRepository
+from services import (
+    ImportJobStateError,
+    cancel_import,
+    import_coverage_regions,
+    list_import_jobs,
+    resume_import,
+)
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def _records(count: int) -> list[CoverageRegionCreate]:
+    return [
+        CoverageRegionCreate(code=f"CN-{index:06d}", name=f"区域{index}", row_number=index + 2)
+        for index in range(count)
+    ]
+
+
+def test_failed_import_resumes_from_its_checkpoint(monkeypatch) -> None:
+    import_coverage_regions([CoverageRegionCreate(code="CN-000001", name="已存在", row_number=2)])
+    records = _records(6)
+    original = ImportTargetRepository.bulk_insert
+    calls: list[int] = []
+
+    def flaky_bulk_insert(self, batch):
+        calls.append(len(batch))
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return original(self, batch)
+
+    monkeypatch.setattr(ImportTargetRepository, "bulk_insert", flaky_bulk_insert)
+    with pytest.raises(RuntimeError):
+        import_coverage_regions(records, batch_size=2)
+    job = list_import_jobs(page=1, page_size=1).items[0]
+    assert job.status == "failed"
+    assert job.success_count == 1
+
+    monkeypatch.setattr(ImportTargetRepository, "bulk_insert", original)
+    with pytest.raises(ImportJobStateError):
+        resume_import(job.id, records[:-1], batch_size=2)
+
+    summary = resume_import(job.id, records, batch_size=2)
+
+    assert summary.status == "completed"
+    assert summary.success_count == 5
+    assert [error.code for error in summary.errors] == ["CN-000001"]
+    assert list_import_jobs(page=1, page_size=1).items[0].status == "completed"
+    with pytest.raises(ImportJobStateError):
+        resume_import(job.id, records)
+
+
+def test_cancelled_import_stops_at_a_batch_boundary(monkeypatch) -> None:
+    records = _records(6)
+    original = ImportLogRepository.save_checkpoint
+
+    def cancel_after_first_batch(self, job_id, **kwargs):
+        original(self, job_id, **kwargs)
+        self.request_cancel(job_id)
+
+    monkeypatch.setattr(ImportLogRepository, "save_checkpoint", cancel_after_first_batch)
+    summary = import_coverage_regions(records, batch_size=2)
+    assert summary.status == "cancelled"
+    assert summary.success_count == 2
+    with pytest.raises(ImportJobStateError):
+        cancel_import(summary.job_id)
+
+    monkeypatch.setattr(ImportLogRepository, "save_checkpoint", original)
+    resumed = resume_import(summary.job_id, records, batch_size=2)
+
+    assert resumed.status == "completed"
+    assert resumed.success_count == 6
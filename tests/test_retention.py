@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import datetime
+import gzip
+import json
+
+import pytest
+
+from database import configure_database, initialize_database, read_scope
+from repositories import CoverageRegionCreate
+from services import import_coverage_regions, list_import_jobs
+from services import retention
+from services.retention import RetentionPolicy, auto_vacuum_mode, run_retention_step
+
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    yield
+
+
+def _age_job(job_id: int, completed_at: str) -> None:
+    from writer import run_write
+
+    run_write(
+        lambda connection: connection.execute(
+            "UPDATE import_jobs SET completed_at = ? WHERE id = ?", (completed_at, job_id)
+        )
+    )
+
+
+def test_expired_jobs_are_archived_and_collapsed(tmp_path) -> None:
+    old = import_coverage_regions(
+        [
+            CoverageRegionCreate(code="CN-1", name="北京", row_number=2),
+            CoverageRegionCreate(code="CN-1", name="重复", row_number=3),
+        ],
+        source="old.xlsx",
+    )
+    recent = import_coverage_regions(
+        [CoverageRegionCreate(code="CN-1", name="已存在", row_number=2)],
+        source="recent.xlsx",
+    )
+    _age_job(old.job_id, "2026-01-01 00:00:00")
+
+    archive_dir = tmp_path / "archive"
+    result = run_retention_step(
+        RetentionPolicy(keep_days=30, archive_dir=archive_dir),
+        now=datetime(2026, 3, 1),
+    )
+
+    assert result.archived_jobs == 1
+    with gzip.open(result.archive_file, "rt", encoding="utf-8") as handle:
+        archived = [json.loads(line) for line in handle]
+    assert [job["id"] for job in archived] == [old.job_id]
+    assert archived[0]["errors"] and archived[0]["events"]
+
+    history = {job.id: job for job in list_import_jobs(page=1, page_size=10).items}
+    assert history[old.job_id].success_count == 1
+    assert history[old.job_id].failure_count == 1
+    assert not history[old.job_id].errors
+    assert not history[old.job_id].events
+    assert history[recent.job_id].errors
+
+    with read_scope() as session:
+        archive_file = session.execute(
+            "SELECT archive_file FROM import_jobs WHERE id = ?", (old.job_id,)
+        ).fetchone()[0]
+    assert archive_file == str(result.archive_file)
+
+    again = run_retention_step(RetentionPolicy(keep_days=30, archive_dir=archive_dir), now=datetime(2026, 3, 1))
+    assert again.archived_jobs == 0
+    assert [path.name for path in archive_dir.iterdir()] == [result.archive_file.name]
+
+
+def test_jobs_finished_again_while_archiving_are_kept(monkeypatch, tmp_path) -> None:
+    job = import_coverage_regions([CoverageRegionCreate(code="CN-1", name="北京", row_number=2)])
+    _age_job(job.job_id, "2026-01-01 00:00:00")
+    write_archive = retention._write_archive
+
+    def resumed_meanwhile(directory, jobs):
+        archive = write_archive(directory, jobs)
+        _age_job(job.job_id, "2026-01-02 00:00:00")
+        return archive
+
+    monkeypatch.setattr(retention, "_write_archive", resumed_meanwhile)
+    result = run_retention_step(
+        RetentionPolicy(keep_days=30, archive_dir=tmp_path / "archive"),
+        now=datetime(2026, 3, 1),
+    )
+
+    assert result.archived_jobs == 0
+    assert list_import_jobs(page=1, page_size=1).items[0].events
+
+
+def test_new_databases_use_incremental_vacuum() -> None:
+    assert auto_vacuum_mode() == "incremental"
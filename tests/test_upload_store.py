@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from services.upload_store import SpooledUpload, UploadSpool
+
+
+def _upload(file_id: str, size: int) -> SpooledUpload:
+    return SpooledUpload(file_id=file_id, filename=f"{file_id}.csv", suffix=".csv", content=b"x" * size)
+
+
+def test_spool_reports_oldest_entries_as_overflow():
+    spool = UploadSpool(capacity_bytes=100)
+    spool.put(_upload("a", 40))
+    spool.put(_upload("b", 40))
+
+    assert spool.overflow(20) == []
+    victims = spool.overflow(30)
+    assert [victim.file_id for victim in victims] == ["a"]
+    # Overflowing entries stay readable until they are discarded.
+    assert spool.get("a") is not None
+
+    spool.discard("a")
+    spool.put(_upload("c", 30))
+    assert spool.get("a") is None
+    assert spool.size == 70
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from concurrent.futures import wait
+
+import pytest
+
+from database import configure_database, initialize_database, session_scope
+from writer import GroupCommitWriter
+
+
+@pytest.fixture()
+def group_writer(tmp_path):
+    configure_database(f"sqlite:///{tmp_path / 'test.db'}")
+    initialize_database()
+    writer = GroupCommitWriter(max_delay=0.05)
+    yield writer
+    writer.close()
+
+
+def _insert(code: str):
+    def operation(connection):
+        connection.execute("INSERT INTO coverage_regions (code, name) VALUES (?, ?)", (code, code))
+        return code
+
+    return operation
+
+
+def test_failed_operation_does_not_roll_back_its_batch(group_writer) -> None:
+    futures = [
+        group_writer.submit(_insert("CN-1")),
+        group_writer.submit(_insert("CN-1")),  # violates the UNIQUE constraint
+        group_writer.submit(_insert("CN-2")),
+    ]
+    wait(futures)
+
+    assert futures[0].result() == "CN-1"
+    assert "UNIQUE" in str(futures[1].exception())
+    assert futures[2].result() == "CN-2"
+    assert group_writer.batches_committed == 1
+
+    with session_scope() as session:
+        codes = [row[0] for row in session.execute("SELECT code FROM coverage_regions ORDER BY code")]
+    assert codes == ["CN-1", "CN-2"]
@@ -0,0 +1,203 @@
+"""Single in-process writer that group-commits work from concurrent jobs.
+
+SQLite allows one writer at a time.  Instead of every import fighting for the
+write lock with its own short transactions, write operations are queued to a
+dedicated thread that owns the only write connection.  The thread drains the
+queue into batches and runs each batch inside one ``BEGIN IMMEDIATE`` ...
+``COMMIT``; every operation gets its own savepoint, so a failing operation
+is rolled back and reported to its submitter alone while the rest of the
+batch still commits.
+"""
+from __future__ import annotations
+
+from concurrent.futures import Future
+from contextlib import contextmanager
+import cProfile
+from dataclasses import dataclass
+import functools
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterator, TypeVar
+
+from database import commit_with_retry, connect, get_database_url, session_scope
+
+T = TypeVar("T")
+Operation = Callable[[sqlite3.Connection], T]
+
+GROUP_COMMIT_ENABLED = os.getenv("IMPORT_GROUP_COMMIT", "1") != "0"
+_MAX_BATCH_OPERATIONS = 256
+_MAX_BATCH_DELAY_SECONDS = 0.002
+
+
+@dataclass(slots=True)
+class _Pending:
+    operation: Operation
+    future: Future
+
+
+class GroupCommitWriter:
+    """Serialises write operations onto one connection and commits in groups."""
+
+    def __init__(
+        self,
+        *,
+        max_batch: int = _MAX_BATCH_OPERATIONS,
+        max_delay: float = _MAX_BATCH_DELAY_SECONDS,
+    ):
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._queue: queue.SimpleQueue[_Pending | None] = queue.SimpleQueue()
+        self._connection: sqlite3.Connection | None = None
+        self._connection_url: str | None = None
+        self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+        self._thread.start()
+        self.batches_committed = 0
+
+    def submit(self, operation: Operation[T]) -> "Future[T]":
+        """Queue *operation* and return a future for its result."""
+
+        future: Future = Future()
+        self._queue.put(_Pending(operation, future))
+        return future
+
+    def execute(self, operation: Operation[T]) -> T:
+        """Run *operation* in the next group commit and wait for its result."""
+
+        return self.submit(operation).result()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _writer_connection(self) -> sqlite3.Connection:
+        url = get_database_url()
+        if self._connection is None or self._connection_url != url:
+            if self._connection is not None:
+                self._connection.close()
+            self._connection = connect(isolation_level=None, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection_url = url
+        return self._connection
+
+    def _collect(self, first: _Pending) -> tuple[list[_Pending], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self._max_delay
+        while len(batch) < self._max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+            self._commit_batch(batch)
+            if stop:
+                break
+        if self._connection is not None:
+            self._connection.close()
+
+    def _commit_batch(self, batch: list[_Pending]) -> None:
+        live = [item for item in batch if item.future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        results: list[tuple[_Pending, object, BaseException | None]] = []
+        try:
+            connection = self._writer_connection()
+            connection.execute("BEGIN IMMEDIATE")
+        except BaseException as exc:  # noqa: BLE001 - reported to every submitter
+            for item in live:
+                item.future.set_exception(exc)
+            return
+
+        try:
+            for index, item in enumerate(live):
+                savepoint = f"op_{index}"
+                connection.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    result = item.operation(connection)
+                except BaseException as exc:  # noqa: BLE001 - attributed to this job only
+                    connection.execute(f"ROLLBACK TO {savepoint}")
+                    connection.execute(f"RELEASE {savepoint}")
+                    results.append((item, None, exc))
+                else:
+                    connection.execute(f"RELEASE {savepoint}")
+                    results.append((item, result, None))
+            commit_with_retry(connection, "COMMIT")
+        except BaseException as exc:  # noqa: BLE001 - the whole group failed
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            for item in live:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+
+        self.batches_committed += 1
+        for item, result, error in results:
+            if error is not None:
+                item.future.set_exception(error)
+            else:
+                item.future.set_result(result)
+
+
+_WRITER: GroupCommitWriter | None = None
+_WRITER_LOCK = threading.Lock()
+_SUBMITTER = threading.local()
+
+
+def get_writer() -> GroupCommitWriter:
+    """Return the process-wide writer, starting it on first use."""
+
+    global _WRITER
+    if _WRITER is None:
+        with _WRITER_LOCK:
+            if _WRITER is None:
+                _WRITER = GroupCommitWriter()
+    return _WRITER
+
+
+def run_write(operation: Operation[T]) -> T:
+    """Run *operation* through the group-commit writer.
+
+    With ``IMPORT_GROUP_COMMIT=0`` the operation runs in its own
+    ``session_scope`` transaction instead, as before the writer existed.
+    """
+
+    if GROUP_COMMIT_ENABLED:
+        profiler = getattr(_SUBMITTER, "profiler", None)
+        if profiler is not None:
+            operation = functools.partial(profiler.runcall, operation)
+        return get_writer().execute(operation)
+
+    with session_scope() as session:
+        return operation(session)
+
+
+@contextmanager
+def profile_writes(profiler: cProfile.Profile) -> Iterator[None]:
+    """Run the operations this thread submits under *profiler*.
+
+    They execute on the writer thread, which a profiler enabled by the
+    submitting thread does not see.  Without group commit they already run
+    on the submitting thread and are left alone.
+    """
+
+    previous = getattr(_SUBMITTER, "profiler", None)
+    _SUBMITTER.profiler = profiler
+    try:
+        yield
+    finally:
+        _SUBMITTER.profiler = previous